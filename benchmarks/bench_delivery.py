@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Digest delivery throughput against a local stand-in SMTP server.
+
+Starts an aiosmtpd sink on localhost, queues N copies of a rendered digest
+in a temporary outbox and measures messages per second. It compares a new
+connection per message (the old EmailSender._send_email behaviour) with
+SmtpDelivery at several connection counts. A small per-command delay on the
+server stands in for network round trips.
+
+Requires aiosmtpd (pip install aiosmtpd).
+Usage: python benchmarks/bench_delivery.py [--messages 500] [--latency-ms 2]
+"""
+
+import argparse
+import asyncio
+import os
+import smtplib
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import SMTP as SMTPServer
+except ImportError:
+    sys.exit("bench_delivery needs aiosmtpd: pip install aiosmtpd")
+
+from delivery import Outbox, SmtpDelivery  # noqa: E402
+from email_sender import EmailSender  # noqa: E402
+from posting import Posting  # noqa: E402
+
+HOST = '127.0.0.1'
+
+
+class SinkHandler:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.latency)
+        self.received += 1
+        return '250 OK'
+
+
+class SlowSMTP(SMTPServer):
+    """Adds a fixed delay to every command, like a remote server would"""
+
+    latency = 0.0
+
+    async def push(self, status):
+        await asyncio.sleep(self.latency)
+        return await super().push(status)
+
+
+class SlowController(Controller):
+    def factory(self):
+        server = SlowSMTP(self.handler)
+        server.latency = self.handler.latency
+        return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def sample_messages(count: int):
+    sender = EmailSender(HOST, 0, 'digest@example.com', '')
+    postings = [
+        Posting.create('RBC', f'Co-op Analyst {i}', 'Toronto, ON', f'https://jobs.rbc.com/ca/en/job/{i}')
+        for i in range(25)
+    ]
+    subject = sender._digest_subject()
+    html_body, text_body = sender._digest_body(postings, [])
+    return [
+        ('digest@example.com', f'subscriber{i}@example.com',
+         sender._build_message(f'subscriber{i}@example.com', subject, html_body, text_body).as_string())
+        for i in range(count)
+    ]
+
+
+def bench_connection_per_message(port: int, messages) -> float:
+    start = time.perf_counter()
+    for sender, recipient, message in messages:
+        with smtplib.SMTP(HOST, port) as server:
+            server.sendmail(sender, [recipient], message)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def bench_pooled(port: int, messages, connections: int, tmp: str) -> float:
+    outbox = Outbox(os.path.join(tmp, f'outbox_{connections}.db'))
+    outbox.enqueue_many(messages)
+    delivery = SmtpDelivery(HOST, port, connections=connections, use_tls=False)
+    report = delivery.deliver(outbox)
+    outbox.close()
+    if report.sent != len(messages):
+        print(f"  warning: {report.sent}/{len(messages)} sent, {report.failed} failed")
+    return report.messages_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.latency_ms / 1000)
+    port = free_port()
+    controller = SlowController(handler, hostname=HOST, port=port)
+    controller.start()
+    try:
+        messages = sample_messages(args.messages)
+        print(f"{args.messages} messages, {args.latency_ms} ms per SMTP command")
+        rate = bench_connection_per_message(port, messages)
+        print(f"  new connection per message   {rate:8.1f} msg/s")
+        with tempfile.TemporaryDirectory() as tmp:
+            for connections in args.connections:
+                rate = bench_pooled(port, messages, connections, tmp)
+                print(f"  SmtpDelivery x{connections:<3}           {rate:8.1f} msg/s")
+    finally:
+        controller.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Ingest benchmark for InternshipDB.
+
+Times the batched add_internships path on a fresh database (all rows new)
+and again on the same postings (all rows existing), at each size given.
+The per-row add_internship path is timed at the smallest size for comparison.
+
+Usage: python benchmarks/bench_ingest.py [--sizes 10000 100000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import InternshipDB  # noqa: E402
+from posting import Posting  # noqa: E402
+
+COMPANIES = ['Nvidia', 'AMD', 'Google', 'RBC', 'TD Bank', 'BMO', 'Scotiabank', 'CIBC']
+
+
+def make_postings(count: int):
+    return [
+        Posting.create(
+            COMPANIES[i % len(COMPANIES)],
+            f'Software Engineering Intern {i}',
+            'Toronto, ON',
+            f'https://careers.example.com/job/{i}',
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            postings = make_postings(size)
+            db = InternshipDB(os.path.join(tmp, f'bulk_{size}.db'))
+            first, new = timed(lambda: db.add_internships(postings))
+            second, again = timed(lambda: db.add_internships(postings))
+            db.close()
+            print(f"add_internships  {size:>8} rows  all new: {first:7.2f}s ({len(new)} new)"
+                  f"  all existing: {second:7.2f}s ({len(again)} new)")
+
+        size = min(args.sizes)
+        postings = make_postings(size)
+        db = InternshipDB(os.path.join(tmp, 'per_row.db'))
+        per_row, _ = timed(lambda: [
+            db.add_internship(*p) for p in postings
+        ])
+        print(f"add_internship   {size:>8} rows  all new: {per_row:7.2f}s (one transaction per row)")
+
+
+if __name__ == '__main__':
+    main()
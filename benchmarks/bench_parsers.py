@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Parser backend micro-benchmark.
+
+For each site, parses a saved fixture page (benchmarks/fixtures/<site>.html)
+or, if none has been saved, a synthetic page of the same shape, with every
+available backend, full-document and scoped to the job list.
+Reports the best-of-N parse time and the peak Python heap while parsing.
+tracemalloc only sees Python allocations, so for lxml-native and selectolax
+(whose trees live in C memory) the peak understates their real footprint.
+
+Usage: python benchmarks/bench_parsers.py [--repeat 20] [--items 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import available_backends, get_backend  # noqa: E402
+from synthetic import ITEM_SELECTORS, synthetic_page  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_page(site: str, items: int) -> bytes:
+    path = os.path.join(FIXTURE_DIR, f'{site}.html')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return synthetic_page(site, items)
+
+
+def measure(backend_name: str, page: bytes, selector: str, scoped: bool, repeat: int):
+    backend = get_backend(backend_name)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        nodes = backend.select(page, selector, scoped=scoped)
+        for node in nodes:
+            node.text()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    backend.select(page, selector, scoped=scoped)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--items', type=int, default=20,
+                        help='job items per synthetic page (ignored for saved fixtures)')
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"{'site':<12}{'backend':<14}{'mode':<8}{'items':>6}{'ms':>10}{'peak KiB':>11}")
+    for site, selector in ITEM_SELECTORS.items():
+        page = load_page(site, args.items)
+        for name in backends:
+            modes = (False, True) if name in ('html.parser', 'lxml') else (False,)
+            for scoped in modes:
+                seconds, peak, count = measure(name, page, selector, scoped, args.repeat)
+                mode = 'scoped' if scoped else 'full'
+                print(f"{site:<12}{name:<14}{mode:<8}{count:>6}{seconds * 1000:>10.2f}{peak / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
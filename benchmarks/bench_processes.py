@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Scrape throughput for long site lists: threads in one process vs sites
+sharded across 1..N worker processes (InternshipScraper(processes=N)).
+
+Clones each synthetic HTML site (see synthetic.py) into `--sites` copies,
+each on its own host so they spread over the shards, and serves them all
+from a local ReplayServer with no added latency. Parsing then dominates,
+which is what the process pool is for. Rate limiting is off.
+
+Each configuration runs scrape_all() against a fresh scraper and reports
+postings/s and the speedup over the threaded baseline. Process runs
+include starting the workers, as a single scheduled run would.
+
+Usage: python benchmarks/bench_processes.py [--sites 200] [--postings 100] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+from functools import partial
+from urllib.parse import urlsplit, urlunsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sites as site_registry  # noqa: E402
+from ratelimit import HostRateLimiter  # noqa: E402
+from replay import ReplayHttpClient, ReplayServer, exchange  # noqa: E402
+from scrapers import DEFAULT_HEADERS, InternshipScraper  # noqa: E402
+from synthetic import ITEM_TEMPLATES, synthetic_page  # noqa: E402
+
+
+def _replay_client(origin: str) -> ReplayHttpClient:
+    """One HTTP client per process; module-level so worker processes can unpickle it"""
+    return ReplayHttpClient(origin, headers=DEFAULT_HEADERS, rate_limiter=HostRateLimiter(rate=1e9, burst=1e9))
+
+
+def clone_sites(count: int, postings: int):
+    """Register `count` copies of the synthetic sites; returns their names and exchanges"""
+    names, exchanges = [], []
+    bases = sorted(ITEM_TEMPLATES)
+    pages = {base: synthetic_page(base, postings) for base in bases}
+    for i in range(count):
+        base = bases[i % len(bases)]
+        config = dict(site_registry.get_site(base))
+        config.pop('limit', None)
+        parts = urlsplit(config['url'])
+        config['url'] = urlunsplit(parts._replace(netloc=f'shard{i}.{parts.netloc}'))
+        if config['type'] == 'browser':
+            config['type'] = 'html'
+        name = f'{base}-{i}'
+        site_registry.register_site(name, config)
+        names.append(name)
+        exchanges.append(exchange('GET', config['url'], None, 200, 'text/html; charset=utf-8', pages[base]))
+    return names, exchanges
+
+
+def timed_run(origin: str, names, processes=None):
+    scraper = InternshipScraper(http_client=_replay_client(origin), site_names=names, processes=processes,
+                                http_factory=partial(_replay_client, origin))
+    start = time.perf_counter()
+    try:
+        postings = scraper.scrape_all('processes' if processes else 'concurrent')
+    finally:
+        scraper.close()
+        scraper.http.close()
+    return len(postings), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sites', type=int, default=200, help='cloned sites to scrape')
+    parser.add_argument('--postings', type=int, default=100, help='postings per site')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help='worker process counts')
+    args = parser.parse_args()
+
+    names, exchanges = clone_sites(args.sites, args.postings)
+    print(f"{len(names)} sites x {args.postings} postings, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<14}{'postings':>10}{'seconds':>10}{'postings/s':>12}{'speedup':>9}")
+    with ReplayServer(exchanges) as server:
+        count, seconds = timed_run(server.origin, names)
+        baseline = count / seconds
+        print(f"{'threads':<14}{count:>10}{seconds:>10.2f}{baseline:>12.0f}{1:>9.2f}")
+        for workers in args.workers:
+            count, seconds = timed_run(server.origin, names, workers)
+            print(f"{f'{workers} process(es)':<14}{count:>10}{seconds:>10.2f}{count / seconds:>12.0f}"
+                  f"{count / seconds / baseline:>9.2f}")
+        if server.misses:
+            print(f"{server.misses} request(s) had no recording")
+
+
+if __name__ == '__main__':
+    main()
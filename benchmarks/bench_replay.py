@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+End-to-end scrape benchmark against replayed responses (see replay.py).
+
+For each scale, serves every site from a local ReplayServer and runs the
+production path in a fresh process: the streaming Pipeline (fetch, parse,
+normalize, ingest into a new database) followed by digest rendering.
+Reports wall time for each, the summed per-stage times from ScrapeMetrics
+(stages overlap, so these add up to more than the wall time), and the
+worker's peak RSS. Running each scale in its own process keeps the RSS
+figures separate and the replay server off the measured process.
+
+Scale 1 replays recorded archives where they exist and 20 synthetic
+postings per site otherwise; scale N serves 20 x N synthetic postings per
+site. Synthetic runs lift each adapter's `limit` so every item is parsed.
+Rate limiting is off unless --polite is given.
+
+Usage: python benchmarks/bench_replay.py [--scales 1 10 100 1000] [--latency-ms 50]
+       [--bandwidth-kbps 0] [--per-site]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sites as site_registry  # noqa: E402
+from database import InternshipDB  # noqa: E402
+from digest_renderer import DigestRenderer  # noqa: E402
+from metrics import ScrapeMetrics  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+from ratelimit import HostRateLimiter  # noqa: E402
+from replay import ReplayHttpClient, ReplayServer, load_archive, synthetic_archive  # noqa: E402
+from scrapers import DEFAULT_HEADERS, InternshipScraper  # noqa: E402
+
+BASE_POSTINGS = 20  # what each adapter fetches from the live sites today
+
+
+def archives_for(sites, scale: int):
+    """All exchanges to serve at `scale`, and the sites that are synthetic"""
+    exchanges, synthetic = [], []
+    for site in sites:
+        recorded = load_archive(site) if scale == 1 else None
+        if recorded is None:
+            recorded = synthetic_archive(site, BASE_POSTINGS * scale)
+            synthetic.append(site)
+        exchanges.extend(recorded)
+    return exchanges, synthetic
+
+
+def run_worker(args):
+    """One measured run; prints its results as JSON on stdout"""
+    for site in args.lift_limits:
+        config = dict(site_registry.get_site(site))
+        config.pop('limit', None)
+        site_registry.register_site(site, config)
+
+    if args.polite:
+        rate_limiter = HostRateLimiter()
+    else:
+        rate_limiter = HostRateLimiter(rate=1e9, burst=1e9)
+    client = ReplayHttpClient(args.origin, headers=DEFAULT_HEADERS, rate_limiter=rate_limiter)
+    metrics = ScrapeMetrics()
+    scraper = InternshipScraper(http_client=client, site_names=args.sites, metrics=metrics)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = InternshipDB(os.path.join(tmp, 'replay.db'))
+        start = time.perf_counter()
+        digest = Pipeline(db, scraper.sites(), max_workers=scraper.max_workers, metrics=metrics).run()
+        pipeline_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        html, text = DigestRenderer().render(digest.new, digest.closed)
+        render_seconds = time.perf_counter() - start
+        db.close()
+    client.close()
+
+    records = metrics.latest.values()
+    print(json.dumps({
+        'pipeline': pipeline_seconds,
+        'render': render_seconds,
+        'fetch': sum(r.fetch_seconds for r in records),
+        'parse': sum(r.parse_seconds for r in records),
+        'ingest': sum(r.ingest_seconds for r in records),
+        'scraped': digest.scraped,
+        'new': len(digest.new),
+        'bytes': sum(r.bytes_received for r in records),
+        'digest_bytes': len(html) + len(text),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'sites': {r.site: r.to_dict() for r in records},
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--sites', nargs='+', default=site_registry.site_names())
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='delay before each response')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0.0,
+                        help='per-connection cap in KiB/s (0: unlimited)')
+    parser.add_argument('--polite', action='store_true', help='keep the production rate limits')
+    parser.add_argument('--per-site', action='store_true', help='also print each site at each scale')
+    # Internal: run one measurement against an already running server
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--origin', help=argparse.SUPPRESS)
+    parser.add_argument('--lift-limits', nargs='*', default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{'scale':>6}{'postings':>10}{'pipeline s':>12}{'render s':>10}{'fetch s':>9}"
+          f"{'parse s':>9}{'ingest s':>10}{'MiB in':>8}{'peak RSS MiB':>14}{'misses':>8}")
+    for scale in args.scales:
+        exchanges, synthetic = archives_for(args.sites, scale)
+        with ReplayServer(exchanges, latency=args.latency_ms / 1000,
+                          bandwidth=args.bandwidth_kbps * 1024) as server:
+            command = [sys.executable, os.path.abspath(__file__), '--worker', '--origin', server.origin,
+                       '--sites', *args.sites, '--lift-limits', *synthetic]
+            if args.polite:
+                command.append('--polite')
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            misses = server.misses
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print(f"{scale:>6}{result['scraped']:>10}{result['pipeline']:>12.2f}{result['render']:>10.2f}"
+              f"{result['fetch']:>9.2f}{result['parse']:>9.2f}{result['ingest']:>10.2f}"
+              f"{result['bytes'] / 2 ** 20:>8.1f}{result['peak_rss_kib'] / 1024:>14.0f}{misses:>8}")
+        if args.per_site:
+            for site, record in result['sites'].items():
+                print(f"{'':>6}  {site:<12}{record['items']:>8} items {record['duration']:>8.2f}s "
+                      f"fetch {record['fetch_seconds']:.2f}s parse {record['parse_seconds']:.2f}s "
+                      f"db {record['ingest_seconds']:.2f}s  {record['status']}")
+
+
+if __name__ == '__main__':
+    main()
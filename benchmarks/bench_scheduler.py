@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Scheduler simulation: fixed daily polling vs the adaptive PollingPolicy.
+
+Each simulated site posts new jobs as a Poisson process at its own rate.
+A poll detects every posting that appeared since the previous poll. Both
+strategies are run over the same postings; the report gives total fetches
+and the time from a posting appearing to its detection.
+
+Usage: python benchmarks/bench_scheduler.py [--days 60] [--seed 1]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import PollingPolicy  # noqa: E402
+
+# Postings per day: a couple of busy sites, a long tail of quiet ones
+SITE_RATES = {
+    'nvidia': 6.0, 'google': 3.0, 'amd': 1.0, 'rbc': 0.5,
+    'td': 0.3, 'bmo': 0.2, 'scotiabank': 0.1, 'cibc': 0.05,
+}
+
+
+def make_postings(days: float, rng: random.Random):
+    """Posting times in hours, per site"""
+    postings = {}
+    for site, per_day in SITE_RATES.items():
+        times, t = [], 0.0
+        while True:
+            t += rng.expovariate(per_day / 24)
+            if t >= days * 24:
+                break
+            times.append(t)
+        postings[site] = times
+    return postings
+
+
+def simulate(postings, days: float, next_poll):
+    """
+    Poll each site at the times produced by next_poll(site, now, changes) -> hours
+    until the next poll. Returns (fetches, detection delays in hours).
+    """
+    fetches, delays = 0, []
+    for site, times in postings.items():
+        now, seen = next_poll(site, None, 0), 0
+        while now < days * 24:
+            fetches += 1
+            found = 0
+            while seen < len(times) and times[seen] <= now:
+                delays.append(now - times[seen])
+                seen += 1
+                found += 1
+            now += next_poll(site, now, found)
+    return fetches, delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--days', type=float, default=60)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    postings = make_postings(args.days, rng)
+    total = sum(len(times) for times in postings.values())
+
+    def daily(site, now, found):
+        return 8.0 if now is None else 24.0  # first run at 08:00, then every day
+
+    policy = PollingPolicy()
+    states = {}
+
+    def adaptive(site, now, found):
+        if now is None:
+            states[site] = policy.initial(site, 0.0)
+            return states[site].next_run_at / 3600
+        state = states[site]
+        policy.observe(state, found, now * 3600)
+        return state.next_run_at / 3600 - now
+
+    random.seed(args.seed)
+    print(f"{len(SITE_RATES)} sites, {total} postings over {args.days:g} days")
+    for name, strategy in (('fixed daily', daily), ('adaptive', adaptive)):
+        fetches, delays = simulate(postings, args.days, strategy)
+        delays.sort()
+        p90 = delays[int(len(delays) * 0.9)] if delays else 0.0
+        print(f"{name:<12} fetches {fetches:5}  time-to-detect median {statistics.median(delays):5.1f}h"
+              f"  p90 {p90:5.1f}h")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Search benchmark for search.py.
+
+Fills a fresh database with synthetic postings (the FTS index is filled by
+the same triggers as in production), then times representative queries,
+including a deep keyset page, against a LIKE scan of the same table.
+
+Usage: python benchmarks/bench_search.py [--rows 1000000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import InternshipDB  # noqa: E402
+from search import InternshipSearch  # noqa: E402
+
+COMPANIES = ['Nvidia', 'AMD', 'Google', 'RBC', 'TD Bank', 'BMO', 'Scotiabank', 'CIBC']
+ROLES = ['Software', 'Data', 'Hardware', 'Machine Learning', 'Quantitative', 'Security',
+         'Product', 'Design', 'Research', 'Infrastructure', 'Embedded', 'Finance', 'Actuarial',
+         'Compiler', 'Graphics', 'Robotics', 'Audit', 'Marketing', 'Risk', 'Cloud']
+KINDS = ['Intern', 'Co-op', 'Summer Student', 'Internship']
+LOCATIONS = ['Toronto, ON', 'Montreal, QC', 'Vancouver, BC', 'Waterloo, ON', 'Ottawa, ON',
+             'Calgary, AB', 'Santa Clara, CA', 'New York, NY', 'Remote']
+
+
+def fill(db: InternshipDB, rows: int, rng: random.Random):
+    start_day = date(2020, 1, 1)
+    conn = db._connection()
+    conn.execute('BEGIN')
+    batch = []
+    for i in range(rows):
+        first = start_day + timedelta(days=i * 2000 // rows)
+        last = first + timedelta(days=rng.randint(0, 60))
+        batch.append((rng.choice(COMPANIES), f'{rng.choice(ROLES)} {rng.choice(KINDS)} {i % 997}',
+                      rng.choice(LOCATIONS), f'https://careers.example.com/job/{i}',
+                      first.isoformat(), last.isoformat(), last.isoformat() if i % 3 else None))
+        if len(batch) == 10000:
+            conn.executemany('INSERT INTO internships (company, title, location, url, first_seen, '
+                             'last_seen, closed_on) VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+            batch = []
+    if batch:
+        conn.executemany('INSERT INTO internships (company, title, location, url, first_seen, '
+                         'last_seen, closed_on) VALUES (?, ?, ?, ?, ?, ?, ?)', batch)
+    conn.execute('COMMIT')
+
+
+def timed(fn, repeat: int):
+    """Best of `repeat` runs, in milliseconds"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = InternshipDB(os.path.join(tmp, 'search.db'))
+        start = time.perf_counter()
+        fill(db, args.rows, random.Random(7))
+        print(f"{args.rows} postings indexed in {time.perf_counter() - start:.1f}s")
+        search = InternshipSearch(db)
+
+        def deep_page():
+            page = search.search('compiler', limit=20)
+            for _ in range(49):
+                page = search.search('compiler', limit=20, cursor=page.cursor)
+            return page
+
+        cases = [
+            ('rare term, by rank', lambda: search.search('compiler 42')),
+            ('uncommon term (5%), by rank', lambda: search.search('compiler')),
+            ('term + company + dates', lambda: search.search(
+                'robotics', company='Nvidia', first_seen_from='2023-01-01', first_seen_to='2023-12-31')),
+            ('location, open only, recent', lambda: search.search(
+                'software', location='waterloo', open_only=True, sort='recent')),
+            ('common term, recent', lambda: search.search('intern', sort='recent')),
+            ('common term, by rank', lambda: search.search('intern')),
+            ('common term, exact rank', lambda: search.search('intern', rank_window=None)),
+            ('prefix, by rank', lambda: search.search('mach* learn*')),
+            ('company only, recent', lambda: search.search(company='CIBC')),
+            ('50 pages of 20, by rank', deep_page),
+        ]
+        for name, fn in cases:
+            ms, page = timed(fn, args.repeat)
+            print(f"{name:<32} {ms:9.2f} ms  ({len(page.results)} results)")
+
+        conn = db._connection()
+        ms, rows = timed(lambda: conn.execute(
+            "SELECT id FROM internships WHERE title LIKE 'compiler %' AND title LIKE '% 42' LIMIT 20").fetchall(), args.repeat)
+        print(f"{'rare term, LIKE scan':<32} {ms:9.2f} ms  ({len(rows)} results)")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
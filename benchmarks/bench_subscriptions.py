@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Subscriber matching benchmark.
+
+Builds a PostingIndex over synthetic new postings and matches every
+synthetic subscriber against it, then times a naive per-subscriber scan
+over all postings on a sample of subscribers and extrapolates. Both
+methods are checked to agree on the sample.
+
+Usage: python benchmarks/bench_subscriptions.py [--subscribers 10000] [--postings 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from posting import Posting  # noqa: E402
+from subscriptions import PostingIndex, Subscriber, tokenize  # noqa: E402
+
+COMPANIES = ['Nvidia', 'AMD', 'Google', 'RBC', 'TD Bank', 'BMO', 'Scotiabank', 'CIBC']
+ROLES = ['Software', 'Data', 'Hardware', 'Machine Learning', 'Quantitative', 'Security',
+         'Product', 'Design', 'Research', 'Infrastructure', 'Embedded', 'Finance']
+KINDS = ['Intern', 'Co-op', 'Summer Student', 'Internship']
+LOCATIONS = ['Toronto, ON', 'Montreal, QC', 'Vancouver, BC', 'Waterloo, ON', 'Ottawa, ON',
+             'Calgary, AB', 'Santa Clara, CA', 'New York, NY', 'Remote']
+
+
+def make_postings(count: int, rng: random.Random):
+    return [
+        Posting.create(
+            rng.choice(COMPANIES),
+            f'{rng.choice(ROLES)} {rng.choice(KINDS)} - Team {i % 97}',
+            rng.choice(LOCATIONS),
+            f'https://careers.example.com/job/{i}',
+        )
+        for i in range(count)
+    ]
+
+
+def make_subscribers(count: int, rng: random.Random):
+    return [
+        Subscriber(
+            email=f'student{i}@example.com',
+            companies=rng.sample(COMPANIES, rng.randint(0, 3)),
+            keywords=rng.sample(ROLES, rng.randint(0, 2)),
+            locations=[loc.split(',')[0] for loc in rng.sample(LOCATIONS, rng.randint(0, 2))],
+            excluded=rng.sample(['Co-op', 'Summer Student', 'Finance'], rng.randint(0, 1)),
+        )
+        for i in range(count)
+    ]
+
+
+def _has_term(tokens, term):
+    return set(tokenize(term)) <= tokens
+
+
+def naive_match(subscriber: Subscriber, postings):
+    """Check every posting against every filter, as a straightforward loop would"""
+    companies = {c.lower() for c in subscriber.companies}
+    matched = []
+    for posting in postings:
+        title = set(tokenize(posting.title))
+        location = set(tokenize(posting.location))
+        if companies and posting.company.lower() not in companies:
+            continue
+        if subscriber.keywords and not any(_has_term(title, k) for k in subscriber.keywords):
+            continue
+        if subscriber.locations and not any(_has_term(location, l) for l in subscriber.locations):
+            continue
+        if any(_has_term(title, e) for e in subscriber.excluded):
+            continue
+        matched.append(posting)
+    return matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--subscribers', type=int, default=10000)
+    parser.add_argument('--postings', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=200, help='subscribers timed with the naive scan')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    postings = make_postings(args.postings, rng)
+    subscribers = make_subscribers(args.subscribers, rng)
+
+    start = time.perf_counter()
+    index = PostingIndex(postings)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total = sum(len(index.match(subscriber)) for subscriber in subscribers)
+    indexed = time.perf_counter() - start
+
+    sample = subscribers[:args.sample]
+    start = time.perf_counter()
+    naive = [naive_match(subscriber, postings) for subscriber in sample]
+    naive_seconds = (time.perf_counter() - start) * len(subscribers) / len(sample)
+    assert naive == [index.match(subscriber) for subscriber in sample], 'index and naive scan disagree'
+
+    print(f"{args.subscribers} subscribers x {args.postings} postings, {total} matches "
+          f"({total / args.subscribers:.0f} per subscriber)")
+    print(f"inverted index  build {build:6.3f}s  match {indexed:7.2f}s")
+    print(f"naive scan                     match {naive_seconds:7.2f}s (extrapolated from {len(sample)})")
+
+
+if __name__ == '__main__':
+    main()
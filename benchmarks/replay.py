@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Record and replay the scrapers' HTTP traffic, so benchmarks run offline.
+
+`record` runs each site's real scraper once through a RecordingHttpClient
+and saves every exchange (method, URL, request body, status, content type
+and body) to benchmarks/fixtures/replay/<site>.json.gz. Workday's JSON POSTs
+are keyed by their payload, so each page offset replays separately.
+
+ReplayServer serves archived exchanges from localhost, with a fixed delay
+before each response and a per-connection bandwidth cap standing in for the
+network. ReplayHttpClient sends every request there through a rerouting
+transport adapter, so rate limiting, per-host sessions and request timings
+still see the original URLs.
+
+For sites without a recording, synthetic_archive() builds one of any size
+from the page shapes in synthetic.py.
+
+Usage: python benchmarks/replay.py record [--sites amd rbc]
+"""
+
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.utils import requote_uri
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sites as site_registry  # noqa: E402
+from http_client import HttpClient, _TimedAdapter  # noqa: E402
+from scrapers import DEFAULT_HEADERS, InternshipScraper  # noqa: E402
+from synthetic import ITEM_TEMPLATES, synthetic_page, synthetic_workday_page  # noqa: E402
+from workday import WorkdayClient  # noqa: E402
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'replay')
+
+
+def body_key(body) -> str:
+    """Digest of a request body; JSON is canonicalized so key order does not matter"""
+    if body is None or body == b'':
+        return ''
+    if isinstance(body, bytes):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return hashlib.sha1(body).hexdigest()
+    return hashlib.sha1(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def exchange(method: str, url: str, body, status: int, content_type: str, content: bytes) -> Dict:
+    return {
+        'method': method.upper(),
+        'url': url,
+        'body_key': body_key(body),
+        'status': status,
+        'content_type': content_type,
+        'content': base64.b64encode(content).decode('ascii'),
+    }
+
+
+def archive_path(site: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f'{site}.json.gz')
+
+
+def save_archive(site: str, exchanges: List[Dict]):
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with gzip.open(archive_path(site), 'wt', encoding='utf-8') as f:
+        json.dump({'site': site, 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'exchanges': exchanges}, f)
+
+
+def load_archive(site: str) -> Optional[List[Dict]]:
+    """The recorded exchanges for `site`, or None if it has not been recorded"""
+    path = archive_path(site)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)['exchanges']
+
+
+def synthetic_archive(site: str, count: int) -> List[Dict]:
+    """Exchanges for `site` serving `count` synthetic postings"""
+    config = site_registry.get_site(site)
+    if config['type'] == 'workday':
+        client = WorkdayClient(None, config['host'], config['tenant'], config['site'])
+        exchanges = []
+        for offset in range(0, max(count, 1), WorkdayClient.PAGE_SIZE):
+            payload = {
+                'appliedFacets': config.get('applied_facets') or {},
+                'limit': WorkdayClient.PAGE_SIZE,
+                'offset': offset,
+                'searchText': config.get('search_text', ''),
+            }
+            exchanges.append(exchange('POST', client.jobs_url, payload, 200, 'application/json',
+                                      synthetic_workday_page(offset, count)))
+        return exchanges
+    if site not in ITEM_TEMPLATES:
+        raise ValueError(f"No synthetic page shape for site {site}")
+    return [exchange('GET', config['url'], None, 200, 'text/html; charset=utf-8',
+                     synthetic_page(site, count))]
+
+
+class RecordingHttpClient(HttpClient):
+    """HttpClient that keeps every exchange it makes, for save_archive()"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.exchanges: List[Dict] = []
+        self._record_lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs):
+        body = kwargs.get('json', kwargs.get('data'))
+        response = super().request(method, url, **kwargs)
+        with self._record_lock:
+            self.exchanges.append(exchange(method, url, body, response.status_code,
+                                           response.headers.get('Content-Type', ''), response.content))
+        return response
+
+
+def _route(url: str) -> str:
+    """Path on the replay server for an original URL: /<scheme>/<host><path>?<query>"""
+    parts = urlsplit(url)
+    return f"/{parts.scheme}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as the real sites allow
+
+    def _replay(self):
+        server: ReplayServer = self.server.replay
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        found = server.responses.get((self.command, self.path, body_key(body)))
+        if found is None:
+            with server.lock:
+                server.misses += 1
+            found = (404, 'text/plain', f'No recording for {self.command} {self.path}'.encode('utf-8'))
+        status, content_type, content = found
+
+        time.sleep(server.latency)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        chunk = 16384
+        for start in range(0, len(content), chunk):
+            piece = content[start:start + chunk]
+            self.wfile.write(piece)
+            if server.bandwidth:
+                time.sleep(len(piece) / server.bandwidth)
+        with server.lock:
+            server.served += 1
+            server.bytes_sent += len(content)
+
+    do_GET = _replay
+    do_POST = _replay
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer:
+    """
+    Serves archived exchanges on localhost from a background thread.
+    `latency` is seconds before each response; `bandwidth` caps each
+    connection in bytes per second (0 for no cap).
+    """
+
+    def __init__(self, exchanges: List[Dict], latency: float = 0.0, bandwidth: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.responses: Dict[Tuple[str, str, str], Tuple[int, str, bytes]] = {}
+        for item in exchanges:
+            # Match the URL as requests will send it, after percent-encoding
+            key = (item['method'], _route(requote_uri(item['url'])), item['body_key'])
+            self.responses[key] = (item['status'], item['content_type'], base64.b64decode(item['content']))
+        self.served = 0
+        self.misses = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.replay = self
+
+    @property
+    def origin(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self) -> 'ReplayServer':
+        threading.Thread(target=self._httpd.serve_forever, name='replay', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class _ReplayAdapter(_TimedAdapter):
+    """Sends each request to the replay server instead of its original host"""
+
+    def __init__(self, origin: str, **kwargs):
+        self.origin = origin
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = self.origin + _route(request.url)
+        return super().send(request, **kwargs)
+
+
+class ReplayHttpClient(HttpClient):
+    """HttpClient whose requests are all answered by the ReplayServer at `origin`"""
+
+    def __init__(self, origin: str, **kwargs):
+        self.origin = origin
+        super().__init__(**kwargs)
+
+    def _adapter(self):
+        return _ReplayAdapter(self.origin, pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize)
+
+
+def record(site_names: List[str]):
+    """Scrape each site live, one at a time, and save what it fetched"""
+    for name in site_names:
+        client = RecordingHttpClient(headers=DEFAULT_HEADERS)
+        scraper = InternshipScraper(http_client=client)
+        postings = list(scraper.scrape_site(name))
+        save_archive(name, client.exchanges)
+        size = sum(len(item['content']) * 3 // 4 for item in client.exchanges)
+        print(f"{name}: {len(client.exchanges)} response(s), {size / 1024:.0f} KiB, "
+              f"{len(postings)} posting(s) -> {archive_path(name)}")
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help='capture live responses for each site')
+    record_parser.add_argument('--sites', nargs='+', default=site_registry.site_names())
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.sites)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Synthetic career pages shaped like each site's real markup, for benchmarks
+that must not hit the live sites. Each page wraps `count` job items in a
+realistic amount of unrelated chrome (navigation, scripts, footer links).
+"""
+
+import json
+
+from sites import SITES
+
+# Markup of a single job item per site; {i} is the item number
+ITEM_TEMPLATES = {
+    'amd': (
+        '<a class="jobs-list-item" href="/careers-home/jobs/{i}">'
+        '<h3>Silicon Design Intern {i}</h3><span class="location">Markham, Canada</span></a>'
+    ),
+    'google': (
+        '<div class="gc-card"><h2>Software Engineering Intern {i}</h2>'
+        '<span class="gc-job-tags__location">Toronto, ON</span>'
+        '<a href="/about/careers/applications/jobs/results/{i}">Learn more</a></div>'
+    ),
+    'rbc': (
+        '<li class="jobs-list-item"><a class="job-title" href="/ca/en/job/{i}">Co-op Analyst {i}</a>'
+        '<span class="job-location">Toronto, Ontario</span></li>'
+    ),
+    'td': (
+        '<tr class="data-row"><td><a class="jobTitle-link" href="/en-CA/job/{i}">Summer Intern {i}</a></td>'
+        '<td><span class="jobLocation">Toronto, ON</span></td></tr>'
+    ),
+    'bmo': (
+        '<li class="jobs-list-item"><a href="/ca/en/job/{i}">Technology Intern {i}</a>'
+        '<span class="job-location">Montreal, Quebec</span></li>'
+    ),
+    'scotiabank': (
+        '<tr class="data-row"><td><a class="jobTitle" href="/job/{i}">Data Science Intern {i}</a></td>'
+        '<td><span class="jobLocation">Toronto, ON</span></td></tr>'
+    ),
+}
+
+# Item selector per site, straight from the adapter registry
+ITEM_SELECTORS = {name: SITES[name]['item'] for name in ITEM_TEMPLATES}
+
+_CHROME_HEAD = (
+    '<!DOCTYPE html><html><head><title>Careers</title>'
+    + ''.join(f'<meta name="m{i}" content="{"x" * 40}">' for i in range(30))
+    + '<script>' + 'var analytics = {"k": "v"};' * 400 + '</script>'
+    + '</head><body><nav>'
+    + ''.join(f'<a class="nav-link" href="/section/{i}">Section {i}</a>' for i in range(150))
+    + '</nav><main>'
+)
+_CHROME_TAIL = (
+    '</main><footer>'
+    + ''.join(f'<div class="footer-col"><p>Footer text block {i}</p><a href="/f/{i}">Link</a></div>'
+              for i in range(200))
+    + '</footer></body></html>'
+)
+
+
+def synthetic_page(site: str, count: int = 20) -> bytes:
+    """A page for `site` containing `count` job items"""
+    items = ''.join(ITEM_TEMPLATES[site].format(i=i) for i in range(count))
+    if ITEM_SELECTORS[site].startswith('tr.'):
+        items = f'<table>{items}</table>'
+    elif ITEM_SELECTORS[site].startswith('li.'):
+        items = f'<ul>{items}</ul>'
+    return (_CHROME_HEAD + items + _CHROME_TAIL).encode('utf-8')
+
+
+def synthetic_workday_page(offset: int, total: int, page_size: int = 20) -> bytes:
+    """One page of a Workday jobs API response, for a search matching `total` postings"""
+    postings = [
+        {
+            'title': f'Hardware Engineering Intern {i}',
+            'locationsText': 'Toronto, ON',
+            'externalPath': f'/job/Toronto/Hardware-Engineering-Intern_JR{i}',
+        }
+        for i in range(offset, min(offset + page_size, total))
+    ]
+    return json.dumps({'total': total, 'jobPostings': postings}).encode('utf-8')
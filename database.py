@@ -1,82 +1,586 @@
+import hashlib
 import sqlite3
+import threading
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple
+
+from normalize import canonicalize_url
+from posting import Posting
+
+# Rows per multi-row upsert statement; 7 parameters each keeps us under
+# SQLite's default 999 bound-variable limit on older builds
+UPSERT_CHUNK_ROWS = 150
+
+# Applied once per connection. WAL lets readers run alongside the writer,
+# synchronous=NORMAL is durable under WAL without an fsync per commit, and a
+# larger page cache plus mmap keep hot pages out of read() syscalls.
+CONNECTION_PRAGMAS = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -32000',  # KiB, i.e. 32 MB
+    'PRAGMA mmap_size = 268435456',  # 256 MB
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA busy_timeout = 5000',
+]
+
+
+def _canonicalize_stored_urls(conn: sqlite3.Connection):
+    """
+    Rewrite stored URLs in canonicalize_url() form, the form scraped URLs
+    are stored in since normalize.py. Rows that turn out to be the same
+    posting are merged into the one first seen: it keeps its id and
+    first_seen, takes the latest title, location and last_seen, and stays
+    open if any of them was open. The FTS index follows via its triggers.
+    """
+    rows = conn.execute('''
+        SELECT id, url, title, location, fingerprint, first_seen, last_seen, closed_on
+        FROM internships
+        ORDER BY first_seen, id
+    ''').fetchall()
+    survivors: Dict[str, list] = {}
+    renamed: Dict[str, str] = {}
+    merged_ids, changed_ids = [], set()
+    for row in rows:
+        url = row[1]
+        canonical = canonicalize_url(url)
+        if canonical != url:
+            renamed[url] = canonical
+        survivor = survivors.get(canonical)
+        if survivor is None:
+            survivors[canonical] = list(row)
+            continue
+        merged_ids.append(row[0])
+        changed_ids.add(survivor[0])
+        if row[6] >= survivor[6]:
+            survivor[2:5] = row[2:5]  # title, location, fingerprint
+            survivor[6] = row[6]
+        survivor[7] = None if survivor[7] is None or row[7] is None else max(survivor[7], row[7])
+
+    # Deletes first: a survivor's canonical URL may still belong to a merged row
+    conn.executemany('DELETE FROM internships WHERE id = ?', [(i,) for i in merged_ids])
+    conn.executemany('''
+        UPDATE internships
+        SET url = ?, title = ?, location = ?, fingerprint = ?, last_seen = ?, closed_on = ?
+        WHERE id = ?
+    ''', [
+        (canonical, survivor[2], survivor[3], survivor[4], survivor[6], survivor[7], survivor[0])
+        for canonical, survivor in survivors.items()
+        if canonical != survivor[1] or survivor[0] in changed_ids
+    ])
+    conn.executemany('UPDATE posting_changes SET url = ? WHERE url = ?',
+                     [(canonical, url) for url, canonical in renamed.items()])
+
+
+# Schema migrations, applied in order. PRAGMA user_version records the last
+# one applied, so each runs exactly once per database file. A migration is a
+# list of SQL statements, and of functions taking the connection for changes
+# SQL cannot express.
+MIGRATIONS = [
+    # 1: initial schema
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS internships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT NOT NULL,
+            title TEXT NOT NULL,
+            location TEXT,
+            url TEXT NOT NULL UNIQUE,
+            first_seen DATE NOT NULL,
+            last_seen DATE NOT NULL
+        )
+        ''',
+    ],
+    # 2: indexes for date and company lookups. first_seen also carries
+    # company and title so the daily digest query is served in index order.
+    [
+        'CREATE INDEX IF NOT EXISTS idx_internships_first_seen ON internships (first_seen, company, title)',
+        'CREATE INDEX IF NOT EXISTS idx_internships_last_seen ON internships (last_seen)',
+        'CREATE INDEX IF NOT EXISTS idx_internships_company ON internships (company)',
+    ],
+    # 3: change tracking. A posting is open while closed_on is NULL; its
+    # fingerprint hashes the fields whose change counts as an update.
+    # Every run and every change it detected is recorded.
+    [
+        'ALTER TABLE internships ADD COLUMN fingerprint TEXT',
+        'ALTER TABLE internships ADD COLUMN closed_on DATE',
+        'CREATE INDEX IF NOT EXISTS idx_internships_open ON internships (company, closed_on)',
+        '''
+        CREATE TABLE IF NOT EXISTS scrape_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            posting_count INTEGER NOT NULL DEFAULT 0,
+            new_count INTEGER NOT NULL DEFAULT 0,
+            updated_count INTEGER NOT NULL DEFAULT 0,
+            reopened_count INTEGER NOT NULL DEFAULT 0,
+            closed_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS posting_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL REFERENCES scrape_runs (id),
+            company TEXT NOT NULL,
+            url TEXT NOT NULL,
+            change TEXT NOT NULL,
+            title TEXT,
+            location TEXT,
+            changed_on DATE NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_posting_changes_day ON posting_changes (change, changed_on)',
+        'CREATE INDEX IF NOT EXISTS idx_posting_changes_run ON posting_changes (run_id)',
+    ],
+    # 4: digest subscribers and their filters (JSON lists, see subscriptions.py)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS subscribers (
+            email TEXT PRIMARY KEY,
+            companies TEXT NOT NULL DEFAULT '[]',
+            keywords TEXT NOT NULL DEFAULT '[]',
+            locations TEXT NOT NULL DEFAULT '[]',
+            excluded TEXT NOT NULL DEFAULT '[]',
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TEXT NOT NULL
+        )
+        ''',
+    ],
+    # 5: adaptive scheduling. Each site's polling interval and estimated
+    # change rate survive restarts; digests record the last posting_changes
+    # row they covered, so each one picks up exactly where the previous ended.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS site_schedule (
+            site TEXT PRIMARY KEY,
+            interval_hours REAL NOT NULL,
+            change_rate REAL NOT NULL,
+            last_run_at REAL,
+            next_run_at REAL NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS digests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sent_at TEXT NOT NULL,
+            last_change_id INTEGER NOT NULL
+        )
+        ''',
+    ],
+    # 6: full-text search (see search.py). An external-content FTS5 index over
+    # title, company and location, kept in step with internships by triggers,
+    # so it stores only the index and no second copy of the text. Title
+    # matches weigh most in the bm25 ranking.
+    [
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS internships_fts USING fts5(
+            title, company, location,
+            content = 'internships', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_insert AFTER INSERT ON internships BEGIN
+            INSERT INTO internships_fts (rowid, title, company, location)
+            VALUES (new.id, new.title, new.company, new.location);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_delete AFTER DELETE ON internships BEGIN
+            INSERT INTO internships_fts (internships_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title, old.company, old.location);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS internships_fts_update
+        AFTER UPDATE OF title, company, location ON internships
+        WHEN old.title IS NOT new.title OR old.company IS NOT new.company
+            OR old.location IS NOT new.location
+        BEGIN
+            INSERT INTO internships_fts (internships_fts, rowid, title, company, location)
+            VALUES ('delete', old.id, old.title, old.company, old.location);
+            INSERT INTO internships_fts (rowid, title, company, location)
+            VALUES (new.id, new.title, new.company, new.location);
+        END
+        ''',
+        "INSERT INTO internships_fts (internships_fts) VALUES ('rebuild')",
+        "INSERT INTO internships_fts (internships_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)')",
+        'CREATE INDEX IF NOT EXISTS idx_internships_company_nocase ON internships (company COLLATE NOCASE)',
+    ],
+    # 7: per-site run metrics (see metrics.py), one row per site per run.
+    # errors is a JSON object of exception class -> count.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS site_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            site TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            status TEXT NOT NULL,
+            duration REAL NOT NULL,
+            fetch_seconds REAL NOT NULL,
+            parse_seconds REAL NOT NULL,
+            ingest_seconds REAL NOT NULL,
+            requests INTEGER NOT NULL,
+            unchanged INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            items INTEGER NOT NULL,
+            new_count INTEGER NOT NULL,
+            closed_count INTEGER NOT NULL,
+            errors TEXT NOT NULL DEFAULT '{}'
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_site_runs_site ON site_runs (site, started_at)',
+    ],
+    # 8: per-site circuit breaker state and result-count baseline (see health.py)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS site_health (
+            site TEXT PRIMARY KEY,
+            state TEXT NOT NULL DEFAULT 'closed',
+            failures INTEGER NOT NULL DEFAULT 0,
+            open_until REAL,
+            typical_items REAL,
+            anomaly INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            updated_at REAL
+        )
+        ''',
+    ],
+    # 9: stored URLs in canonical form, so postings stored before URLs were
+    # canonicalized match their rescrapes instead of closing and reappearing
+    [
+        _canonicalize_stored_urls,
+    ],
+]
+
+def posting_fingerprint(internship: Posting) -> str:
+    """Hash of the fields that make a change to the same URL count as an update"""
+    raw = f"{internship.title}\0{internship.location}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+@dataclass
+class RunDiff:
+    """What one company's scrape changed compared with the postings we had open"""
+    company: str
+    run_id: int
+    new: List[Posting] = field(default_factory=list)
+    updated: List[Posting] = field(default_factory=list)
+    reopened: List[Posting] = field(default_factory=list)
+    closed: List[Posting] = field(default_factory=list)
+    still_open: int = 0
 
 class InternshipDB:
     def __init__(self, db_path='internships.db'):
         self.db_path = db_path
+        self._local = threading.local()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
         self.init_db()
     
-    def init_db(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS internships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                company TEXT NOT NULL,
-                title TEXT NOT NULL,
-                location TEXT,
-                url TEXT NOT NULL UNIQUE,
-                first_seen DATE NOT NULL,
-                last_seen DATE NOT NULL
-            )
-        ''')
-        
-        conn.commit()
+    def _connection(self) -> sqlite3.Connection:
+        """
+        This thread's long-lived connection, opened and tuned on first use.
+        Connections are in autocommit mode; multi-statement writes use explicit transactions.
+        Opening one closes those left behind by threads that have exited, so
+        short-lived stage threads don't pile up connections.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                for thread in [thread for thread in self._connections if not thread.is_alive()]:
+                    self._connections.pop(thread).close()
+                self._connections[threading.current_thread()] = conn
+        return conn
+    
+    def release(self):
+        """Close this thread's connection, if it has one (e.g. as a worker thread finishes)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.current_thread(), None)
         conn.close()
     
+    def close(self):
+        """Close every connection opened by this instance, on any thread"""
+        with self._lock:
+            for conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    def init_db(self):
+        """Bring the database schema up to date"""
+        conn = self._connection()
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                # PRAGMA does not accept bound parameters
+                conn.execute(f'PRAGMA user_version = {number}')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+    
     def add_internship(self, company: str, title: str, location: str, url: str) -> bool:
         """
         Add a new internship to the database.
         Returns True if it's a new posting, False if it already exists.
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        today = datetime.now().date().isoformat()
+        new = self.add_internships([Posting.create(company, title, location, url)])
+        return bool(new)
+    
+    def add_internships(self, internships: Iterable[Posting]) -> List[Posting]:
+        """
+        Store a batch of postings with the same change tracking as a scrape
+        run (see CompanyRun): new ones are inserted, closed ones reopen,
+        changed ones are updated, and each change is recorded for the digest.
+        The batch is not taken as a company's full listing, so nothing is
+        closed. Returns the postings that were new, in input order.
+        """
+        by_url: Dict[str, Posting] = {}
+        for internship in internships:
+            # First copy of a URL wins, as it would with one add_internship call per row
+            by_url.setdefault(internship.url, internship)
+        by_company: Dict[str, List[Posting]] = {}
+        for internship in by_url.values():
+            by_company.setdefault(internship.company, []).append(internship)
         
-        try:
-            cursor.execute('''
-                INSERT INTO internships (company, title, location, url, first_seen, last_seen)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (company, title, location, url, today, today))
-            conn.commit()
-            conn.close()
-            return True  # New internship
-        except sqlite3.IntegrityError:
-            # Already exists, update last_seen
-            cursor.execute('''
-                UPDATE internships
-                SET last_seen = ?
-                WHERE url = ?
-            ''', (today, url))
-            conn.commit()
-            conn.close()
-            return False  # Existing internship
+        new_urls = set()
+        for company, batch in by_company.items():
+            run = self.start_run(company)
+            new_urls.update(internship.url for internship in run.add(batch))
+            run.finish(complete=False)
+        return [internship for url, internship in by_url.items() if url in new_urls]
+    
+    def start_run(self, company: str) -> 'CompanyRun':
+        """Begin an incremental change-tracking run for one company (see CompanyRun)"""
+        return CompanyRun(self, company)
+    
+    def get_digest_changes(self) -> Tuple[List[Posting], List[Posting], int]:
+        """
+        Postings that appeared, and postings that closed, since the last recorded
+        digest (before the first one: since today). Only those still open, or
+        still closed, are returned. Also returns the last change id covered,
+        to pass to record_digest() once the digest is queued.
+        """
+        conn = self._connection()
+        row = conn.execute('SELECT MAX(last_change_id) FROM digests').fetchone()
+        after_id, since = (row[0], '') if row[0] is not None else (0, datetime.now().date().isoformat())
+        last_change_id = conn.execute(
+            'SELECT COALESCE(MAX(id), ?) FROM posting_changes', (after_id,)
+        ).fetchone()[0]
+        
+        def changes(change: str, still: str) -> List[Posting]:
+            rows = conn.execute(f'''
+                SELECT DISTINCT c.company, i.title, i.location, c.url
+                FROM posting_changes c
+                JOIN internships i ON i.url = c.url
+                WHERE c.change = ? AND c.id > ? AND c.id <= ? AND c.changed_on >= ?
+                    AND i.closed_on IS {still}
+                ORDER BY c.company, i.title
+            ''', (change, after_id, last_change_id, since)).fetchall()
+            return [Posting.create(*row) for row in rows]
+        
+        return changes('new', 'NULL'), changes('closed', 'NOT NULL'), last_change_id
+    
+    def record_digest(self, last_change_id: int):
+        """Mark changes up to `last_change_id` as covered by a digest"""
+        self._connection().execute(
+            'INSERT INTO digests (sent_at, last_change_id) VALUES (?, ?)',
+            (datetime.now().isoformat(timespec='seconds'), last_change_id)
+        )
     
-    def get_new_internships_today(self) -> List[Dict]:
+    def get_new_internships_today(self) -> List[Posting]:
         """Get all internships that were first seen today"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         today = datetime.now().date().isoformat()
         
-        cursor.execute('''
+        results = self._connection().execute('''
             SELECT company, title, location, url
             FROM internships
             WHERE first_seen = ?
             ORDER BY company, title
-        ''', (today,))
+        ''', (today,)).fetchall()
         
-        results = cursor.fetchall()
-        conn.close()
+        return [Posting.create(*row) for row in results]
+
+
+class CompanyRun:
+    """
+    Incremental diff of one company's scrape against the database.
+    The company's open postings are loaded once as a url -> fingerprint map;
+    each batch passed to add() is classified against it in memory, and only
+    postings that changed are written. finish() closes whatever was not seen.
+    """
+    
+    def __init__(self, db: InternshipDB, company: str):
+        self.db = db
+        self.company = company
+        self.today = datetime.now().date().isoformat()
+        conn = db._connection()
+        self._unseen: Dict[str, Optional[str]] = dict(conn.execute(
+            'SELECT url, fingerprint FROM internships WHERE company = ? AND closed_on IS NULL',
+            (company,)
+        ).fetchall())
+        self._seen_urls = set()
+        self.run_id = conn.execute(
+            'INSERT INTO scrape_runs (company, started_at) VALUES (?, ?)',
+            (company, datetime.now().isoformat(timespec='seconds'))
+        ).lastrowid
+        self.diff = RunDiff(company=company, run_id=self.run_id)
+        self.posting_count = 0
+    
+    def add(self, internships: Iterable[Posting]) -> List[Posting]:
+        """Classify and store a batch of scraped postings; returns the new ones"""
+        unknown, updated, backfill = [], [], []
+        for internship in internships:
+            url = internship.url
+            if url in self._seen_urls:
+                continue
+            self._seen_urls.add(url)
+            self.posting_count += 1
+            fingerprint = posting_fingerprint(internship)
+            
+            if url not in self._unseen:
+                unknown.append(internship)
+                continue
+            stored = self._unseen.pop(url)
+            if stored is None:
+                # Row predates change tracking; record its fingerprint without an event
+                backfill.append((fingerprint, url))
+            elif stored != fingerprint:
+                updated.append(internship)
+            else:
+                self.diff.still_open += 1
+        
+        conn = self.db._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            new, reopened = self._upsert_unknown(conn, unknown)
+            conn.executemany(
+                'UPDATE internships SET title = ?, location = ?, fingerprint = ?, last_seen = ? WHERE url = ?',
+                [(i.title, i.location, posting_fingerprint(i), self.today, i.url) for i in updated]
+            )
+            conn.executemany('UPDATE internships SET fingerprint = ? WHERE url = ?', backfill)
+            self._record_changes(conn, 'new', new)
+            self._record_changes(conn, 'reopened', reopened)
+            self._record_changes(conn, 'updated', updated)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
         
-        return [
-            {
-                'company': row[0],
-                'title': row[1],
-                'location': row[2],
-                'url': row[3]
-            }
-            for row in results
-        ]
+        self.diff.new.extend(new)
+        self.diff.reopened.extend(reopened)
+        self.diff.updated.extend(updated)
+        return new
+    
+    def _upsert_unknown(self, conn: sqlite3.Connection, internships: List[Posting]):
+        """Insert postings not open in the database; closed ones with the same URL reopen"""
+        if not internships:
+            return [], []
+        previous_max_id = conn.execute('SELECT COALESCE(MAX(id), 0) FROM internships').fetchone()[0]
+        new_urls = set()
+        for start in range(0, len(internships), UPSERT_CHUNK_ROWS):
+            chunk = internships[start:start + UPSERT_CHUNK_ROWS]
+            placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+            params = []
+            for i in chunk:
+                params.extend((self.company, i.title, i.location, i.url,
+                               self.today, self.today, posting_fingerprint(i)))
+            cursor = conn.execute(f'''
+                INSERT INTO internships (company, title, location, url, first_seen, last_seen, fingerprint)
+                VALUES {placeholders}
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    location = excluded.location,
+                    fingerprint = excluded.fingerprint,
+                    last_seen = excluded.last_seen,
+                    closed_on = NULL
+                RETURNING id, url
+            ''', params)
+            new_urls.update(url for row_id, url in cursor.fetchall() if row_id > previous_max_id)
+        new = [i for i in internships if i.url in new_urls]
+        reopened = [i for i in internships if i.url not in new_urls]
+        return new, reopened
+    
+    def _record_changes(self, conn: sqlite3.Connection, change: str, internships: List[Posting]):
+        conn.executemany('''
+            INSERT INTO posting_changes (run_id, company, url, change, title, location, changed_on)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (self.run_id, self.company, i.url, change, i.title, i.location, self.today)
+            for i in internships
+        ])
+    
+    def finish(self, complete: bool = True) -> RunDiff:
+        """
+        Close the open postings this run did not see and record the run.
+        Pass complete=False when the scrape stopped early (an error, a failed
+        page, the run deadline): the postings it saw are kept, but nothing is
+        closed, since the rest were never looked at. A run that saw no
+        postings at all closes nothing either: an empty result far more
+        likely means the scraper broke than that every job closed.
+        """
+        conn = self.db._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if self.posting_count and not complete:
+                seen_urls = list(self._seen_urls)
+                for start in range(0, len(seen_urls), UPSERT_CHUNK_ROWS):
+                    chunk = seen_urls[start:start + UPSERT_CHUNK_ROWS]
+                    placeholders = ', '.join(['?'] * len(chunk))
+                    conn.execute(f'''
+                        UPDATE internships SET last_seen = ?
+                        WHERE url IN ({placeholders}) AND closed_on IS NULL AND last_seen < ?
+                    ''', [self.today] + chunk + [self.today])
+            elif self.posting_count:
+                closed_urls = list(self._unseen)
+                closed = []
+                for start in range(0, len(closed_urls), UPSERT_CHUNK_ROWS):
+                    chunk = closed_urls[start:start + UPSERT_CHUNK_ROWS]
+                    placeholders = ', '.join(['?'] * len(chunk))
+                    closed.extend(
+                        Posting.create(self.company, *row)
+                        for row in conn.execute(f'''
+                            UPDATE internships SET closed_on = ?
+                            WHERE url IN ({placeholders})
+                            RETURNING title, location, url
+                        ''', [self.today] + chunk).fetchall()
+                    )
+                self._record_changes(conn, 'closed', closed)
+                self.diff.closed = closed
+                # Everything still open was seen in this run
+                conn.execute('''
+                    UPDATE internships SET last_seen = ?
+                    WHERE company = ? AND closed_on IS NULL AND last_seen < ?
+                ''', (self.today, self.company, self.today))
+            else:
+                print(f"{self.company}: no postings scraped, leaving open postings untouched")
+            
+            conn.execute('''
+                UPDATE scrape_runs
+                SET finished_at = ?, posting_count = ?, new_count = ?, updated_count = ?,
+                    reopened_count = ?, closed_count = ?
+                WHERE id = ?
+            ''', (datetime.now().isoformat(timespec='seconds'), self.posting_count,
+                  len(self.diff.new), len(self.diff.updated), len(self.diff.reopened),
+                  len(self.diff.closed), self.run_id))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._unseen = {}
+        return self.diff
@@ -0,0 +1,284 @@
+"""
+Digest delivery: a durable outbox plus a pool of reusable SMTP sessions.
+
+Messages are written to an on-disk outbox first, so nothing is lost if the
+process dies mid-send. SmtpDelivery then drains the outbox over a few
+parallel connections, each authenticated once and reused for many messages.
+Transient failures (dropped connections, 4xx replies) are retried later with
+exponential backoff; permanent ones (5xx) are marked failed. A session that
+cannot be opened at all (server down, bad credentials) is no fault of any
+message: the drain stops, everything stays pending, and SmtpDelivery waits
+before it tries to connect again.
+"""
+
+import queue
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+class Outbox:
+    """SQLite-backed queue of outgoing messages"""
+
+    def __init__(self, db_path: str = 'outbox.db'):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._lock = threading.Lock()
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sender TEXT NOT NULL,
+                recipient TEXT NOT NULL,
+                message TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+        ''')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)'
+        )
+
+    def enqueue(self, sender: str, recipient: str, message: str) -> int:
+        """Store a fully rendered message for delivery; returns its id"""
+        now = time.time()
+        with self._lock:
+            return self._conn.execute(
+                'INSERT INTO outbox (sender, recipient, message, next_attempt_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (sender, recipient, message, now, now)
+            ).lastrowid
+
+    def enqueue_many(self, messages: List[tuple]):
+        """Store many (sender, recipient, message) tuples in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT INTO outbox (sender, recipient, message, next_attempt_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(sender, recipient, message, now, now) for sender, recipient, message in messages]
+            )
+            self._conn.execute('COMMIT')
+
+    def due(self, limit: int = 1000) -> List[Dict]:
+        """Pending messages whose next attempt time has passed"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT id, sender, recipient, message, attempts
+                FROM outbox
+                WHERE status = 'pending' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            ''', (time.time(), limit)).fetchall()
+        return [
+            {'id': row[0], 'sender': row[1], 'recipient': row[2], 'message': row[3], 'attempts': row[4]}
+            for row in rows
+        ]
+
+    def mark_sent(self, message_id: int):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1, last_error = NULL WHERE id = ?",
+                (message_id,)
+            )
+
+    def mark_retry(self, message_id: int, error: str, delay: float):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ? WHERE id = ?',
+                (error, time.time() + delay, message_id)
+            )
+
+    def mark_failed(self, message_id: int, error: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                (error, message_id)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT status, COUNT(*) FROM outbox GROUP BY status').fetchall())
+
+    def purge_sent(self, older_than: float = 7 * 24 * 3600):
+        """Delete delivered messages older than `older_than` seconds"""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND created_at < ?",
+                (time.time() - older_than,)
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a send failure is worth retrying later"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # Dropped connections, timeouts, refused connects
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+
+@dataclass
+class DeliveryReport:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    deferred: int = 0  # left pending because no session could be opened
+    error: Optional[str] = None  # why not
+    seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+class SmtpDelivery:
+    """
+    Drains an Outbox over `connections` parallel SMTP sessions.
+    Each session runs STARTTLS and logs in once, then sends up to
+    `messages_per_connection` messages before reconnecting. If connecting
+    or logging in fails, the drain stops and no further connection is
+    tried until a backoff delay (growing with each failure in a row) has
+    passed; messages are never charged an attempt for it.
+    """
+
+    def __init__(self, smtp_server: str, smtp_port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, connections: int = 4, use_tls: bool = True,
+                 messages_per_connection: int = 100, max_attempts: int = 5,
+                 base_delay: float = 30.0, timeout: float = 30.0):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.connections = connections
+        self.use_tls = use_tls
+        self.messages_per_connection = messages_per_connection
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.timeout = timeout
+        self._connect_failures = 0
+        self._connect_after = 0.0  # time.monotonic() before which no session is opened
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username and self.password:
+            server.login(self.username, self.password)
+        return server
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, self.base_delay * (2 ** attempts))
+
+    def _open_session(self, report: DeliveryReport, lock: threading.Lock) -> Optional[smtplib.SMTP]:
+        """Connect and log in; on failure record why and back off, returning None"""
+        try:
+            server = self._connect()
+        except Exception as e:
+            with lock:
+                if report.error is None:
+                    self._connect_failures += 1
+                    self._connect_after = time.monotonic() + self._retry_delay(self._connect_failures)
+                    report.error = f"Could not open an SMTP session: {e}"
+            return None
+        with lock:
+            self._connect_failures = 0
+        return server
+
+    def deliver(self, outbox: Outbox) -> DeliveryReport:
+        """
+        Send every message that is currently due; later retries are left in
+        the outbox, as is everything when no session can be opened.
+        """
+        report = DeliveryReport()
+        lock = threading.Lock()
+        work: queue.Queue = queue.Queue()
+        for message in outbox.due(limit=1_000_000):
+            work.put(message)
+        if work.empty():
+            return report
+        if time.monotonic() < self._connect_after:
+            report.deferred = work.qsize()
+            report.error = "Backing off after failing to open an SMTP session"
+            return report
+
+        start = time.perf_counter()
+        # One session first, so bad credentials cost a single login, not one per worker
+        first = self._open_session(report, lock)
+        if first is None:
+            report.deferred = work.qsize()
+            return report
+        stopped = threading.Event()
+
+        def worker(server: Optional[smtplib.SMTP]):
+            sent_on_connection = 0
+            try:
+                while not stopped.is_set():
+                    try:
+                        message = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    if server is None or sent_on_connection >= self.messages_per_connection:
+                        if server is not None:
+                            _quit(server)
+                        server = self._open_session(report, lock)
+                        if server is None:
+                            # Leave this message and the rest pending for a later drain
+                            work.put(message)
+                            stopped.set()
+                            return
+                        sent_on_connection = 0
+                    try:
+                        server.sendmail(message['sender'], [message['recipient']], message['message'])
+                        sent_on_connection += 1
+                        outbox.mark_sent(message['id'])
+                        with lock:
+                            report.sent += 1
+                    except Exception as e:
+                        if isinstance(e, (smtplib.SMTPServerDisconnected, OSError)):
+                            server = None  # the session is gone; reconnect for the next message
+                        attempts = message['attempts'] + 1
+                        if is_transient(e) and attempts < self.max_attempts:
+                            outbox.mark_retry(message['id'], str(e), self._retry_delay(attempts))
+                            with lock:
+                                report.retried += 1
+                        else:
+                            outbox.mark_failed(message['id'], str(e))
+                            with lock:
+                                report.failed += 1
+                            print(f"Failed to send email to {message['recipient']}: {e}")
+            finally:
+                if server is not None:
+                    _quit(server)
+
+        threads = [threading.Thread(target=worker, args=(first if i == 0 else None,), name=f'smtp-{i}')
+                   for i in range(min(self.connections, work.qsize()))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        report.seconds = time.perf_counter() - start
+        if stopped.is_set():
+            report.deferred = work.qsize()
+        return report
+
+
+def _quit(server: smtplib.SMTP):
+    try:
+        server.quit()
+    except Exception:
+        pass
@@ -0,0 +1,189 @@
+"""
+Digest rendering.
+
+The static parts of each email (styles, header, footer) are built once at
+import time, and the per-posting markup is a pre-split template filled with
+str.format and joined, never concatenated in a loop. Each company section is
+rendered once and cached, so many subscribers receiving the same company's
+postings share the rendered HTML and text instead of re-rendering it.
+"""
+
+from collections import OrderedDict
+from html import escape
+from typing import Dict, List, Tuple
+
+from posting import Posting
+
+_OPPORTUNITIES_HEAD = """
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                h1 { color: #2c3e50; }
+                h2 { color: #3498db; border-bottom: 2px solid #3498db; padding-bottom: 5px; }
+                .job {
+                    background-color: #f8f9fa;
+                    padding: 15px;
+                    margin: 10px 0;
+                    border-left: 4px solid #3498db;
+                    border-radius: 4px;
+                }
+                .job-title { font-weight: bold; font-size: 16px; color: #2c3e50; }
+                .job-location { color: #7f8c8d; font-style: italic; }
+                .job-link { color: #3498db; text-decoration: none; }
+                .job-link:hover { text-decoration: underline; }
+                .summary { background-color: #e8f4f8; padding: 10px; border-radius: 4px; margin-bottom: 20px; }
+            </style>
+        </head>
+        <body>
+            <h1>🎯 New Internship Opportunities</h1>
+"""
+_SUMMARY = """            <div class="summary">
+                <strong>{count} new internship{plural} found today!</strong>
+            </div>
+"""
+_SECTION_HEADER = "<h2>{company} ({count} opening{plural})</h2>"
+_JOB = """
+                <div class="job">
+                    <div class="job-title">{title}</div>
+                    <div class="job-location">📍 {location}</div>
+                    <div><a href="{url}" class="job-link">Apply Here →</a></div>
+                </div>
+"""
+_OPPORTUNITIES_FOOT = """
+            <hr style="margin-top: 30px; border: none; border-top: 1px solid #ddd;">
+            <p style="color: #7f8c8d; font-size: 12px;">
+                This is an automated email from your Internship Scraper.
+                Good luck with your applications! 🚀
+            </p>
+        </body>
+        </html>
+"""
+
+_NO_OPPORTUNITIES_HEAD = """
+        <html>
+        <head>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+                .message {
+                    background-color: #f8f9fa;
+                    padding: 20px;
+                    border-left: 4px solid #95a5a6;
+                    border-radius: 4px;
+                    text-align: center;
+                }
+            </style>
+        </head>
+        <body>
+            <div class="message">
+                <h2>📭 No New Internships Today</h2>
+                <p>No new internship opportunities were found today across the monitored companies.</p>
+                <p>Keep checking back - new opportunities are posted regularly!</p>
+            </div>
+"""
+_NO_OPPORTUNITIES_FOOT = """
+            <hr style="margin-top: 30px; border: none; border-top: 1px solid #ddd;">
+            <p style="color: #7f8c8d; font-size: 12px;">
+                This is an automated email from your Internship Scraper.
+            </p>
+        </body>
+        </html>
+"""
+
+_CLOSED_HEADER = '<h2 style="color: #95a5a6; border-bottom-color: #95a5a6;">No Longer Listed ({count})</h2><ul>'
+_CLOSED_ITEM = '<li style="color: #7f8c8d;">{company}: {title} ({location})</li>'
+
+_TEXT_OPPORTUNITIES_HEAD = "New Internship Opportunities\n{count} new internship{plural} found today!\n"
+_TEXT_NO_OPPORTUNITIES = (
+    "No New Internships Today\n"
+    "No new internship opportunities were found today across the monitored companies.\n"
+    "Keep checking back - new opportunities are posted regularly!\n"
+)
+_TEXT_FOOT = "\n--\nThis is an automated email from your Internship Scraper.\n"
+
+
+def _plural(count: int) -> str:
+    return '' if count == 1 else 's'
+
+
+class DigestRenderer:
+    """Renders digests as (html, text) pairs, caching each company section"""
+
+    def __init__(self, max_cached_sections: int = 4096):
+        self.max_cached_sections = max_cached_sections
+        self._sections: 'OrderedDict[tuple, Tuple[str, str]]' = OrderedDict()
+        self.section_hits = 0
+        self.section_misses = 0
+
+    def render(self, internships: List[Posting], closed: List[Posting] = ()) -> Tuple[str, str]:
+        """HTML and plain-text bodies for a digest of new (and closed) postings"""
+        if not internships:
+            return self._render_empty(closed)
+
+        companies: Dict[str, List[Posting]] = {}
+        for internship in internships:
+            companies.setdefault(internship.company, []).append(internship)
+
+        count = len(internships)
+        html_parts = [_OPPORTUNITIES_HEAD, _SUMMARY.format(count=count, plural=_plural(count))]
+        text_parts = [_TEXT_OPPORTUNITIES_HEAD.format(count=count, plural=_plural(count))]
+        for company, jobs in sorted(companies.items()):
+            section_html, section_text = self.render_section(company, jobs)
+            html_parts.append(section_html)
+            text_parts.append(section_text)
+
+        closed_html, closed_text = self._render_closed(closed)
+        html_parts.extend((closed_html, _OPPORTUNITIES_FOOT))
+        text_parts.extend((closed_text, _TEXT_FOOT))
+        return ''.join(html_parts), ''.join(text_parts)
+
+    def render_section(self, company: str, jobs: List[Posting]) -> Tuple[str, str]:
+        """One company's section; identical sections are rendered only once"""
+        key = (company, tuple((job.title, job.location, job.url) for job in jobs))
+        cached = self._sections.get(key)
+        if cached is not None:
+            self._sections.move_to_end(key)
+            self.section_hits += 1
+            return cached
+
+        self.section_misses += 1
+        count = len(jobs)
+        plural = 's' if count > 1 else ''
+        html_parts = [_SECTION_HEADER.format(company=escape(company), count=count, plural=plural)]
+        text_parts = [f"\n{company} ({count} opening{plural})\n{'-' * (len(company) + 12)}\n"]
+        for job in jobs:
+            html_parts.append(_JOB.format(
+                title=escape(job.title),
+                location=escape(job.location or ''),
+                url=escape(job.url, quote=True)
+            ))
+            text_parts.append(f"* {job.title}\n  {job.location or ''}\n  {job.url}\n")
+
+        rendered = (''.join(html_parts), ''.join(text_parts))
+        self._sections[key] = rendered
+        if len(self._sections) > self.max_cached_sections:
+            self._sections.popitem(last=False)
+        return rendered
+
+    def _render_closed(self, closed: List[Posting]) -> Tuple[str, str]:
+        if not closed:
+            return '', ''
+        jobs = sorted(closed, key=lambda j: (j.company, j.title))
+        html_parts = [_CLOSED_HEADER.format(count=len(jobs))]
+        html_parts.extend(
+            _CLOSED_ITEM.format(company=escape(j.company), title=escape(j.title),
+                                location=escape(j.location or ''))
+            for j in jobs
+        )
+        html_parts.append('</ul>')
+        text = f"\nNo Longer Listed ({len(jobs)})\n" + ''.join(
+            f"* {j.company}: {j.title} ({j.location or ''})\n" for j in jobs
+        )
+        return ''.join(html_parts), text
+
+    def _render_empty(self, closed: List[Posting]) -> Tuple[str, str]:
+        closed_html, closed_text = self._render_closed(closed)
+        return (
+            _NO_OPPORTUNITIES_HEAD + closed_html + _NO_OPPORTUNITIES_FOOT,
+            _TEXT_NO_OPPORTUNITIES + closed_text + _TEXT_FOOT
+        )
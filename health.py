@@ -0,0 +1,122 @@
+"""
+Per-site health: a circuit breaker with exponential backoff, and an anomaly
+flag for sites that suddenly return nothing.
+
+A run fails when the site raised errors and produced no postings. After
+`failure_threshold` consecutive failed runs the site's circuit opens and
+the site is skipped until the backoff expires: `base_backoff_hours`,
+doubling with each further failure up to `max_backoff_hours`, jittered so
+sites don't all come back together. The first run after that is a trial
+(half-open): success closes the circuit, failure reopens it for longer.
+
+A run with no errors and no postings, from a site that normally returns
+some, is flagged as an anomaly (usually a changed page layout breaking the
+selectors) without opening the circuit; the site may really have nothing.
+
+State lives in the site_health table, so it carries across runs.
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from database import InternshipDB
+
+
+@dataclass
+class SiteHealth:
+    site: str
+    state: str = 'closed'  # closed, open or half_open
+    failures: int = 0  # consecutive failed runs
+    open_until: Optional[float] = None
+    typical_items: Optional[float] = None  # smoothed postings per successful run
+    anomaly: bool = False
+    last_error: Optional[str] = None
+    updated_at: Optional[float] = None
+
+
+class HealthTracker:
+    def __init__(self, db: InternshipDB, failure_threshold: int = 3, base_backoff_hours: float = 1.0,
+                 max_backoff_hours: float = 48.0, jitter: float = 0.1, smoothing: float = 0.3,
+                 anomaly_min_items: float = 5.0):
+        self.db = db
+        self.failure_threshold = failure_threshold
+        self.base_backoff_hours = base_backoff_hours
+        self.max_backoff_hours = max_backoff_hours
+        self.jitter = jitter
+        self.smoothing = smoothing
+        self.anomaly_min_items = anomaly_min_items
+        self._lock = threading.Lock()
+        rows = db._connection().execute('''
+            SELECT site, state, failures, open_until, typical_items, anomaly, last_error, updated_at
+            FROM site_health
+        ''').fetchall()
+        self._sites: Dict[str, SiteHealth] = {row[0]: SiteHealth(*row) for row in rows}
+        for health in self._sites.values():
+            health.anomaly = bool(health.anomaly)
+
+    def get(self, site: str) -> SiteHealth:
+        with self._lock:
+            return self._sites.setdefault(site, SiteHealth(site))
+
+    def allow(self, site: str, now: Optional[float] = None) -> bool:
+        """Whether `site` should be scraped now; an expired open circuit becomes a trial run"""
+        now = time.time() if now is None else now
+        health = self.get(site)
+        if health.state != 'open':
+            return True
+        if health.open_until is not None and now < health.open_until:
+            return False
+        health.state = 'half_open'
+        self._save(health, now)
+        return True
+
+    def observe(self, site: str, items: int, errors: Dict[str, int],
+                now: Optional[float] = None) -> SiteHealth:
+        """Fold one finished run of `site` into its health"""
+        now = time.time() if now is None else now
+        health = self.get(site)
+        if errors and not items:
+            health.failures += 1
+            health.last_error = max(errors, key=errors.get)
+            if health.state == 'half_open' or health.failures >= self.failure_threshold:
+                doublings = max(0, health.failures - self.failure_threshold)
+                hours = min(self.max_backoff_hours, self.base_backoff_hours * 2 ** doublings)
+                hours *= 1 + random.uniform(-self.jitter, self.jitter)
+                health.state = 'open'
+                health.open_until = now + hours * 3600
+                print(f"{site}: {health.failures} failed run(s) in a row ({health.last_error}), "
+                      f"skipping it for {hours:.1f}h")
+        else:
+            health.failures = 0
+            health.state = 'closed'
+            health.open_until = None
+            typical = health.typical_items
+            health.anomaly = not items and typical is not None and typical >= self.anomaly_min_items
+            if health.anomaly:
+                print(f"WARNING {site}: no postings found, usually about {typical:.0f}; "
+                      f"check its selectors in sites.py")
+            elif items:
+                health.typical_items = items if typical is None else (
+                    self.smoothing * items + (1 - self.smoothing) * typical)
+        self._save(health, now)
+        return health
+
+    def _save(self, health: SiteHealth, now: float):
+        health.updated_at = now
+        self.db._connection().execute('''
+            INSERT INTO site_health (site, state, failures, open_until, typical_items, anomaly,
+                                     last_error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(site) DO UPDATE SET
+                state = excluded.state,
+                failures = excluded.failures,
+                open_until = excluded.open_until,
+                typical_items = excluded.typical_items,
+                anomaly = excluded.anomaly,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at
+        ''', (health.site, health.state, health.failures, health.open_until, health.typical_items,
+              int(health.anomaly), health.last_error, health.updated_at))
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Columnar posting history, for analytics.
+
+PostingHistory reads the internships table once into NumPy arrays, one per
+column. Company and location are dictionary-encoded: int32 codes into a
+sorted table of their distinct values (location -1 when unknown). Dates are
+datetime64[D], and closed_on is NaT while a posting is still open.
+
+The aggregates work on whole columns with unique/bincount/lexsort, never
+looping over postings in Python:
+
+    weekly_postings()  postings first seen, per company per week (weeks
+                       start on Monday)
+    time_to_close()    days from first seen to closed, per company: how
+                       many closed, mean and median
+
+export() writes the columns to Parquet, with company and location as
+dictionary columns, or to a NumPy .npz archive.
+
+NumPy is needed for all of this and pyarrow only for Parquet. Both are
+optional: PostingHistory raises ImportError without NumPy, and export()
+without pyarrow when asked for Parquet.
+
+Usage:
+    python history.py export history.parquet     # or history.npz
+    python history.py weekly --company RBC
+    python history.py time-to-close
+"""
+
+import argparse
+import importlib
+from typing import Dict, Optional
+
+from database import InternshipDB
+
+
+class PostingHistory:
+    def __init__(self, db: InternshipDB):
+        np = self._np = importlib.import_module('numpy')
+        # NaT in SQL so NumPy parses every date column in one vectorized pass
+        rows = db._connection().execute('''
+            SELECT id, company, title, COALESCE(location, ''), url, first_seen, last_seen,
+                   COALESCE(closed_on, 'NaT')
+            FROM internships
+            ORDER BY id
+        ''').fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 8
+
+        self.ids = np.array(columns[0], dtype=np.int64)
+        self.companies, self.company = self._encode(columns[1])
+        self.title = np.array(columns[2], dtype=object)
+        self.locations, self.location = self._encode(columns[3])
+        self.url = np.array(columns[4], dtype=object)
+        self.first_seen = np.array(columns[5], dtype='datetime64[D]')
+        self.last_seen = np.array(columns[6], dtype='datetime64[D]')
+        self.closed_on = np.array(columns[7], dtype='datetime64[D]')
+        # '' stands for an unknown location; keep it out of the table as -1
+        if len(self.locations) and self.locations[0] == '':
+            self.locations = self.locations[1:]
+            self.location -= 1
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _encode(self, values) -> tuple:
+        """(sorted distinct values, int32 code per row)"""
+        np = self._np
+        categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+        return categories.astype(str), codes.astype(np.int32).reshape(-1)
+
+    def _company_code(self, company: Optional[str]) -> Optional[int]:
+        if company is None:
+            return None
+        found = self._np.flatnonzero(self.companies == company)
+        return int(found[0]) if len(found) else -1
+
+    def weekly_postings(self, company: Optional[str] = None) -> Dict[str, object]:
+        """
+        Postings first seen per company per week, as columns: 'company',
+        'week' (the Monday, datetime64[D]) and 'postings', ordered by company
+        then week. Weeks without postings are left out.
+        """
+        np = self._np
+        days = self.first_seen.astype(np.int64)
+        # 1970-01-01 was a Thursday, three days after a Monday
+        weeks = days - (days + 3) % 7
+        codes = self.company
+        if company is not None:
+            keep = codes == self._company_code(company)
+            codes, weeks = codes[keep], weeks[keep]
+        keys, counts = np.unique(np.stack([codes.astype(np.int64), weeks], axis=1), axis=0,
+                                 return_counts=True)
+        return {
+            'company': self.companies[keys[:, 0]],
+            'week': keys[:, 1].astype('datetime64[D]'),
+            'postings': counts,
+        }
+
+    def time_to_close(self) -> Dict[str, object]:
+        """
+        Days from first seen to closed per company, over postings that have
+        closed, as columns: 'company', 'closed', 'mean_days' and
+        'median_days'. Companies with no closed postings are left out.
+        """
+        np = self._np
+        closed = ~np.isnat(self.closed_on)
+        codes = self.company[closed]
+        days = (self.closed_on[closed] - self.first_seen[closed]).astype(np.int64)
+
+        counts = np.bincount(codes, minlength=len(self.companies))
+        sums = np.bincount(codes, weights=days, minlength=len(self.companies))
+        # Sorting by (company, days) puts each company's durations in one
+        # ordered run; its median sits in the middle of the run
+        ordered = days[np.lexsort((days, codes))]
+        starts = np.cumsum(counts) - counts
+        has_closed = counts > 0
+        lower = ordered[(starts + (counts - 1) // 2)[has_closed]]
+        upper = ordered[(starts + counts // 2)[has_closed]]
+        return {
+            'company': self.companies[has_closed],
+            'closed': counts[has_closed],
+            'mean_days': sums[has_closed] / counts[has_closed],
+            'median_days': (lower + upper) / 2,
+        }
+
+    def export(self, path: str):
+        """Write every column to `path`: Parquet for *.parquet, else a NumPy .npz archive"""
+        if path.endswith('.parquet'):
+            self._export_parquet(path)
+            return
+        self._np.savez_compressed(
+            path, id=self.ids, company=self.company, companies=self.companies,
+            title=self.title.astype(str), location=self.location, locations=self.locations,
+            url=self.url.astype(str), first_seen=self.first_seen, last_seen=self.last_seen,
+            closed_on=self.closed_on,
+        )
+
+    def _export_parquet(self, path: str):
+        pa = importlib.import_module('pyarrow')
+        parquet = importlib.import_module('pyarrow.parquet')
+        location_codes = pa.array(self.location, mask=self.location < 0)
+        table = pa.table({
+            'id': self.ids,
+            'company': pa.DictionaryArray.from_arrays(self.company, pa.array(self.companies)),
+            'title': pa.array(self.title, type=pa.string()),
+            'location': pa.DictionaryArray.from_arrays(location_codes, pa.array(self.locations, pa.string())),
+            'url': pa.array(self.url, type=pa.string()),
+            # from_pandas turns NaT into null
+            'first_seen': pa.array(self.first_seen, from_pandas=True),
+            'last_seen': pa.array(self.last_seen, from_pandas=True),
+            'closed_on': pa.array(self.closed_on, from_pandas=True),
+        })
+        parquet.write_table(table, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Columnar export and aggregates over the posting history')
+    parser.add_argument('--db', default='internships.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help='write the history to Parquet or .npz')
+    export_parser.add_argument('path', help='*.parquet (needs pyarrow) or *.npz')
+    weekly_parser = commands.add_parser('weekly', help='postings per company per week')
+    weekly_parser.add_argument('--company', help='exact company name')
+    commands.add_parser('time-to-close', help='days from first seen to closed, per company')
+    args = parser.parse_args()
+
+    history = PostingHistory(InternshipDB(args.db))
+    if args.command == 'export':
+        history.export(args.path)
+        print(f"Wrote {len(history)} posting(s) to {args.path}")
+    elif args.command == 'weekly':
+        weekly = history.weekly_postings(args.company)
+        print(f"{'company':<24}{'week of':<12}{'postings':>9}")
+        for company, week, count in zip(weekly['company'], weekly['week'], weekly['postings']):
+            print(f"{company:<24}{str(week):<12}{count:>9}")
+    else:
+        closing = history.time_to_close()
+        print(f"{'company':<24}{'closed':>8}{'mean days':>11}{'median days':>13}")
+        for company, closed, mean, median in zip(closing['company'], closing['closed'],
+                                                 closing['mean_days'], closing['median_days']):
+            print(f"{company:<24}{closed:>8}{mean:>11.1f}{median:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
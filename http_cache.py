@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from posting import Posting
+
+
+class HttpCache:
+    """
+    On-disk HTTP cache for career pages.
+    Stores ETag/Last-Modified so requests can be made conditional, and a hash
+    of each body so an unchanged page can reuse the postings extracted from it
+    last time instead of being parsed again. Those postings are only reused
+    by the same extractor (a fingerprint of the adapter config and parser
+    that produced them) and for at most max_age after extraction, however
+    often the page revalidates.
+    Each entry is a <key>.json metadata file next to a <key>.body file.
+    """
+
+    def __init__(self, cache_dir: str = '.http_cache', max_bytes: int = 50 * 1024 * 1024,
+                 max_age: float = 7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str, body=None) -> str:
+        """Cache key for a request; POST bodies are part of the key"""
+        raw = f"{method.upper()} {url}"
+        if body is not None:
+            raw += ' ' + json.dumps(body, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _count(self, url: str, stat: str):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            counters = self.stats.setdefault(
+                host, {'hits': 0, 'misses': 0, 'not_modified': 0, 'parse_skipped': 0}
+            )
+            counters[stat] += 1
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Return the metadata for `key`, or None if missing or too old"""
+        try:
+            with open(self._path(key, '.json'), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry['stored_at'] > self.max_age:
+            self._remove(key)
+            return None
+        return entry
+
+    @staticmethod
+    def validators(entry: Dict) -> Dict[str, str]:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def process(self, key: str, url: str, response: requests.Response,
+                entry: Optional[Dict]) -> requests.Response:
+        """
+        Reconcile a fresh response with the cached entry.
+        A 304 is turned back into a 200 carrying the cached body. Sets
+        `response.cache_key` and `response.unchanged` (True when the body is the
+        same as the one the cached postings were extracted from).
+        """
+        response.cache_key = key
+        response.unchanged = False
+
+        if response.status_code == 304 and entry is not None:
+            try:
+                with open(self._path(key, '.body'), 'rb') as f:
+                    response._content = f.read()
+            except OSError:
+                self._remove(key)
+                return response
+            response.status_code = 200
+            if entry.get('content_type'):
+                response.headers['Content-Type'] = entry['content_type']
+            response.encoding = entry.get('encoding')
+            response.unchanged = True
+            entry['stored_at'] = time.time()
+            self._write_meta(key, entry)
+            self._count(url, 'not_modified')
+            self._count(url, 'hits')
+            return response
+
+        if response.status_code != 200:
+            return response
+
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        unchanged = entry is not None and entry.get('body_sha256') == body_hash
+        response.unchanged = unchanged
+        self._count(url, 'hits' if unchanged else 'misses')
+
+        new_entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+            'encoding': response.encoding,
+            'body_sha256': body_hash,
+            'size': len(body),
+            'stored_at': time.time(),
+            # Postings extracted from the old body are still valid only if it is unchanged
+            'posting_rows': entry.get('posting_rows') if unchanged else None,
+            'posting_extractor': entry.get('posting_extractor') if unchanged else None,
+            'rows_stored_at': entry.get('rows_stored_at') if unchanged else None,
+        }
+        with open(self._path(key, '.body'), 'wb') as f:
+            f.write(body)
+        self._write_meta(key, new_entry)
+        self._evict()
+        return response
+
+    def _rows_valid(self, entry: Optional[Dict], extractor: str) -> bool:
+        """Whether the entry's posting rows came from `extractor` and are not too old"""
+        return (entry is not None and entry.get('posting_rows') is not None
+                and entry.get('posting_extractor') == extractor
+                and time.time() - (entry.get('rows_stored_at') or 0) <= self.max_age)
+
+    def cached_postings(self, response: requests.Response, extractor: str) -> Optional[List[Posting]]:
+        """Postings `extractor` extracted last time from this exact body, if any"""
+        key = getattr(response, 'cache_key', None)
+        if key is None or not getattr(response, 'unchanged', False):
+            return None
+        entry = self.lookup(key)
+        if not self._rows_valid(entry, extractor):
+            return None
+        self._count(entry['url'], 'parse_skipped')
+        return [Posting.create(*row) for row in entry['posting_rows']]
+
+    def remember_postings(self, response: requests.Response, postings: List[Posting], extractor: str):
+        """Attach the postings `extractor` extracted from a response body to its cache entry"""
+        key = getattr(response, 'cache_key', None)
+        if key is None or response.status_code != 200:
+            return
+        entry = self.lookup(key)
+        if entry is not None:
+            # Stored as [company, title, location, url] rows, without repeating the keys
+            entry['posting_rows'] = [list(posting) for posting in postings]
+            entry['posting_extractor'] = extractor
+            entry['rows_stored_at'] = time.time()
+            self._write_meta(key, entry)
+
+    def fresh_render(self, url: str, ttl: float, extractor: str) -> Optional[List[Posting]]:
+        """Postings `extractor` read from a browser render of `url` less than `ttl` seconds old, if any"""
+        entry = self.lookup(self.key('RENDER', url))
+        if not self._rows_valid(entry, extractor) or time.time() - entry['stored_at'] > ttl:
+            return None
+        self._count(url, 'hits')
+        return [Posting.create(*row) for row in entry['posting_rows']]
+
+    def rendered_postings(self, url: str, digest: str, extractor: str) -> Optional[List[Posting]]:
+        """Postings `extractor` read from the last render of `url`, if its content had this digest"""
+        entry = self.lookup(self.key('RENDER', url))
+        if not self._rows_valid(entry, extractor) or entry.get('digest') != digest:
+            return None
+        self._count(url, 'parse_skipped')
+        return [Posting.create(*row) for row in entry['posting_rows']]
+
+    def remember_render(self, url: str, digest: Optional[str], postings: List[Posting], extractor: str):
+        """
+        Store the postings read from a browser render of `url`, with a digest
+        of the content they came from (None when it cannot be compared).
+        Renders have no body file; the entry is metadata only.
+        """
+        self._write_meta(self.key('RENDER', url), {
+            'url': url,
+            'stored_at': time.time(),
+            'digest': digest,
+            'posting_rows': [list(posting) for posting in postings],
+            'posting_extractor': extractor,
+            'rows_stored_at': time.time(),
+        })
+        self._evict()
+
+    def _write_meta(self, key: str, entry: Dict):
+        # Write then rename so a concurrent reader never sees a partial file
+        tmp_path = self._path(key, f'.json.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._path(key, '.json'))
+
+    def _remove(self, key: str):
+        for suffix in ('.json', '.body'):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop expired entries, then the least recently stored until under max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for dir_entry in os.scandir(self.cache_dir):
+                if not dir_entry.name.endswith('.json'):
+                    continue
+                key = dir_entry.name[:-len('.json')]
+                try:
+                    with open(dir_entry.path, 'r', encoding='utf-8') as f:
+                        meta = json.load(f)
+                except (OSError, ValueError):
+                    self._remove(key)
+                    continue
+                if now - meta['stored_at'] > self.max_age:
+                    self._remove(key)
+                else:
+                    entries.append((meta['stored_at'], meta.get('size', 0), key))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(key)
+                total -= size
@@ -0,0 +1,347 @@
+import contextvars
+import random
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+import metrics
+from http_cache import HttpCache
+from posting import Posting
+from ratelimit import HostRateLimiter
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes br responses when this is importable)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        ACCEPT_ENCODING = 'gzip, deflate'
+
+
+# Responses worth retrying: rate limited, or a gateway or server that may recover
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class DeadlineExceeded(requests.Timeout):
+    """The run's time budget ran out before a request could be made"""
+
+
+# When requests made in this context must be done by (time.monotonic()), if ever
+_deadline: contextvars.ContextVar = contextvars.ContextVar('http_deadline', default=None)
+
+
+@contextmanager
+def deadline(at: Optional[float]):
+    """
+    Requests made in the enclosed block (and in contexts copied from it) get
+    their timeouts cut to fit before `at`, and fail fast once it has passed.
+    """
+    token = _deadline.set(at)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """The deadline set by the enclosing deadline() block, if any"""
+    return _deadline.get()
+
+
+@dataclass
+class RequestTiming:
+    """Where the time for one request went, in seconds"""
+    method: str
+    url: str
+    status: int = 0
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    total: float = 0.0
+    bytes_received: int = 0
+    reused_connection: bool = True
+
+
+# The request in flight on this thread; connections report into it
+_current = threading.local()
+
+
+class _TimedConnectionMixin:
+    """Records DNS, TCP connect and TLS handshake time for new connections"""
+
+    def _new_conn(self):
+        timing = getattr(_current, 'timing', None)
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            # Resolve up front so the lookup can be timed on its own
+            infos = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        except OSError:
+            addresses = [host]  # let urllib3 raise its usual error below
+        resolved = time.perf_counter()
+        try:
+            # Every address in turn, as create_connection() would have: the
+            # first one (often IPv6 on a dual-stack host) may be unreachable
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError):
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+        if timing is not None:
+            timing.dns += resolved - start
+            timing.connect += time.perf_counter() - resolved
+            timing.reused_connection = False
+        return sock
+
+    def connect(self):
+        timing = getattr(_current, 'timing', None)
+        before = (timing.dns + timing.connect) if timing is not None else 0.0
+        start = time.perf_counter()
+        super().connect()
+        if timing is not None:
+            elapsed = time.perf_counter() - start
+            timing.tls += max(0.0, elapsed - (timing.dns + timing.connect - before))
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool,
+        }
+
+
+class HttpClient:
+    """
+    Shared transport for the scrapers.
+    Keeps one keep-alive session (and connection pool) per host so handshakes
+    are paid once per host rather than once per request, and records a
+    RequestTiming for every request made.
+    Connection errors, timeouts and RETRY_STATUSES responses are retried up
+    to `retries` times after a random delay of up to `retry_backoff` x 2^attempt
+    seconds (longer if the server sends Retry-After), unless that would run
+    past the deadline.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 15.0,
+                 pool_connections: int = 4, pool_maxsize: int = 8,
+                 max_timings: int = 1000, cache: Optional[HttpCache] = None,
+                 retries: int = 2, retry_backoff: float = 0.5, max_retry_after: float = 30.0):
+        self.headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        self.headers.update(headers or {})
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timings: Deque[RequestTiming] = deque(maxlen=max_timings)
+        self.cache = cache
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.max_retry_after = max_retry_after
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        """Return the pooled session for the host of `url`, creating it on first use"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = self._adapter()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def _adapter(self) -> HTTPAdapter:
+        """Transport adapter mounted on each new session"""
+        return _TimedAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the host's session, once its rate limit allows,
+        retrying transient failures. With a cache configured the request is
+        made conditional on the cached copy, and the response carries
+        `cache_key`/`unchanged` (see HttpCache).
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._attempt(method, url, dict(kwargs))
+            except DeadlineExceeded:
+                raise
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries or not self._wait_to_retry(attempt):
+                    raise
+            else:
+                if (response.status_code not in RETRY_STATUSES or attempt >= self.retries
+                        or not self._wait_to_retry(attempt, response.headers.get('Retry-After'))):
+                    return response
+            attempt += 1
+
+    def _wait_to_retry(self, attempt: int, retry_after: Optional[str] = None) -> bool:
+        """Sleep before the next attempt; False, without sleeping, if the deadline would pass first"""
+        delay = random.uniform(0, self.retry_backoff * 2 ** attempt)
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.max_retry_after))
+        at = _deadline.get()
+        if at is not None and time.monotonic() + delay >= at:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _attempt(self, method: str, url: str, kwargs: Dict) -> requests.Response:
+        self.rate_limiter.wait(url)
+        session = self.session_for(url)
+        timeout = kwargs.get('timeout', self.timeout)
+        at = _deadline.get()
+        if at is not None:
+            remaining = at - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"Deadline passed before {method} {url}")
+            if not isinstance(timeout, tuple):
+                timeout = (timeout, timeout)
+            timeout = tuple(min(part, remaining) for part in timeout)
+        kwargs['timeout'] = timeout
+
+        cache_key, entry = None, None
+        if self.cache is not None:
+            cache_key = self.cache.key(method, url, kwargs.get('json', kwargs.get('data')))
+            entry = self.cache.lookup(cache_key)
+            if entry is not None:
+                headers = dict(kwargs.pop('headers', None) or {})
+                headers.update(self.cache.validators(entry))
+                kwargs['headers'] = headers
+
+        timing = RequestTiming(method=method, url=url)
+        _current.timing = timing
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, stream=True, **kwargs)
+            headers_at = time.perf_counter()
+            body = response.content
+        finally:
+            _current.timing = None
+        end = time.perf_counter()
+
+        timing.status = response.status_code
+        timing.ttfb = max(0.0, headers_at - start - timing.dns - timing.connect - timing.tls)
+        timing.download = end - headers_at
+        timing.total = end - start
+        timing.bytes_received = len(body)
+        self.timings.append(timing)
+
+        if self.cache is not None:
+            response = self.cache.process(cache_key, url, response, entry)
+        record = metrics.current()
+        if record is not None:
+            record.add_request(timing.total, timing.bytes_received, getattr(response, 'unchanged', False))
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def cached_postings(self, response: requests.Response, extractor: str) -> Optional[List[Posting]]:
+        """
+        Postings previously extracted from this response's body, if it is
+        unchanged and `extractor` (see HttpCache) is the one that extracted them
+        """
+        if self.cache is None:
+            return None
+        return self.cache.cached_postings(response, extractor)
+
+    def remember_postings(self, response: requests.Response, postings: List[Posting], extractor: str):
+        """Store the postings extracted from a response so an unchanged body can reuse them"""
+        if self.cache is not None:
+            self.cache.remember_postings(response, postings, extractor)
+
+    def fresh_render(self, url: str, ttl: float, extractor: str) -> Optional[List[Posting]]:
+        """Postings from a browser render of `url` less than `ttl` seconds old, if any"""
+        if self.cache is None:
+            return None
+        return self.cache.fresh_render(url, ttl, extractor)
+
+    def rendered_postings(self, url: str, digest: str, extractor: str) -> Optional[List[Posting]]:
+        """Postings from the last render of `url`, if its content had this digest"""
+        if self.cache is None:
+            return None
+        return self.cache.rendered_postings(url, digest, extractor)
+
+    def remember_render(self, url: str, digest: Optional[str], postings: List[Posting], extractor: str):
+        """Store the postings read from a browser render, keyed by its URL"""
+        if self.cache is not None:
+            self.cache.remember_render(url, digest, postings, extractor)
+
+    def timing_summary(self) -> Dict[str, Dict[str, float]]:
+        """Average timing breakdown per host over the recorded requests"""
+        by_host: Dict[str, List[RequestTiming]] = {}
+        for timing in list(self.timings):
+            by_host.setdefault(urlsplit(timing.url).netloc, []).append(timing)
+
+        summary = {}
+        for host, timings in by_host.items():
+            count = len(timings)
+            summary[host] = {
+                'requests': count,
+                'new_connections': sum(1 for t in timings if not t.reused_connection),
+                'dns': sum(t.dns for t in timings) / count,
+                'connect': sum(t.connect for t in timings) / count,
+                'tls': sum(t.tls for t in timings) / count,
+                'ttfb': sum(t.ttfb for t in timings) / count,
+                'download': sum(t.download for t in timings) / count,
+                'total': sum(t.total for t in timings) / count,
+                'bytes': sum(t.bytes_received for t in timings),
+            }
+        return summary
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -5,57 +5,181 @@ Scrapes internship opportunities and sends daily email digest
 """
 
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from database import InternshipDB
-from scrapers import InternshipScraper
+from scrapers import InternshipScraper, DEFAULT_HEADERS
 from email_sender import EmailSender
+from health import HealthTracker
+from delivery import Outbox, SmtpDelivery
+from http_client import HttpClient
+from http_cache import HttpCache
+from metrics import ScrapeMetrics
+from pipeline import Pipeline
+from renderer import BrowserPool
+from sites import load_sites
+from subscriptions import Subscriber, SubscriptionStore
 
-def main():
-    """Main function to run the scraper"""
-    print("Starting internship scraper...")
-    
-    # Load environment variables
-    load_dotenv('lebron.env')
-    
-    # Get configuration from environment
+def create_http_client() -> HttpClient:
+    """Build the shared HTTP client from environment settings"""
+    return HttpClient(
+        headers=DEFAULT_HEADERS,
+        connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+        read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', '15')),
+        pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', '8')),
+        retries=int(os.getenv('HTTP_RETRIES', '2')),
+        cache=HttpCache(
+            cache_dir=os.getenv('HTTP_CACHE_DIR', '.http_cache'),
+            max_bytes=int(float(os.getenv('HTTP_CACHE_MAX_MB', '50')) * 1024 * 1024),
+            max_age=float(os.getenv('HTTP_CACHE_MAX_AGE_DAYS', '7')) * 24 * 3600,
+        ),
+    )
+
+def create_metrics(db: InternshipDB) -> ScrapeMetrics:
+    """Build the run instrumentation from environment settings; empty paths turn an export off"""
+    return ScrapeMetrics(
+        db=db,
+        log_path=os.getenv('METRICS_LOG', 'metrics.jsonl') or None,
+        prom_path=os.getenv('METRICS_PROM_FILE') or None,
+    )
+
+def create_health(db: InternshipDB) -> HealthTracker:
+    """Build the per-site circuit breaker from environment settings"""
+    return HealthTracker(
+        db,
+        failure_threshold=int(os.getenv('CIRCUIT_FAILURES', '3')),
+        max_backoff_hours=float(os.getenv('CIRCUIT_MAX_BACKOFF_HOURS', '48')),
+    )
+
+def run_deadline() -> Optional[float]:
+    """Time budget in seconds for one scrape run, or None for no limit"""
+    return float(os.getenv('RUN_DEADLINE_SECONDS', '600')) or None
+
+def create_renderer() -> Optional[BrowserPool]:
+    """Headless browsers for JS-heavy sites, if enabled and Selenium is installed"""
+    size = int(os.getenv('RENDER_BROWSERS', '1'))
+    if not size:
+        return None
+    try:
+        return BrowserPool(size=size, page_load_timeout=float(os.getenv('RENDER_TIMEOUT', '20')))
+    except ImportError:
+        print("Selenium is not installed; JS-heavy sites will be scraped without rendering")
+        return None
+
+def create_scraper(http_client: Optional[HttpClient] = None,
+                   metrics: Optional[ScrapeMetrics] = None,
+                   renderer: Optional[BrowserPool] = None) -> InternshipScraper:
+    """
+    Build the scraper from environment settings, loading any extra site adapters.
+    SCRAPE_MODE=processes shards fetch+parse across SCRAPE_PROCESSES worker
+    processes (default one per core), each with its own create_http_client().
+    """
+    if os.getenv('SITES_FILE'):
+        load_sites(os.getenv('SITES_FILE'))
+    site_names = [name.strip() for name in os.getenv('SITES', '').split(',') if name.strip()]
+    processes = int(os.getenv('SCRAPE_PROCESSES', '0')) or None
+    if os.getenv('SCRAPE_MODE') == 'processes' and processes is None:
+        processes = os.cpu_count() or 1
+    return InternshipScraper(
+        http_client=http_client or create_http_client(),
+        parser=os.getenv('PARSER_BACKEND', 'lxml-native'),
+        site_names=site_names or None,
+        metrics=metrics,
+        renderer=renderer,
+        processes=processes,
+        http_factory=create_http_client,
+    )
+
+def send_digest(db: InternshipDB):
+    """
+    Email every subscriber the postings that appeared or closed since the last digest.
+    RECIPIENT_EMAIL addresses get every posting; stored subscribers get their filtered view.
+    """
     smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
     smtp_port = int(os.getenv('SMTP_PORT', '587'))
     sender_email = os.getenv('SENDER_EMAIL')
     sender_password = os.getenv('SENDER_PASSWORD')
-    recipient_email = os.getenv('RECIPIENT_EMAIL')
+    # One address or a comma-separated list
+    recipients = [email.strip() for email in os.getenv('RECIPIENT_EMAIL', '').split(',') if email.strip()]
     
-    if not all([sender_email, sender_password, recipient_email]):
+    subscribers = SubscriptionStore(db).active()
+    subscribed = {subscriber.email for subscriber in subscribers}
+    subscribers.extend(Subscriber(email) for email in recipients if email not in subscribed)
+    if not subscribers:
+        print("ERROR: No recipients.")
+        print("Set RECIPIENT_EMAIL in .env file or add subscribers with subscriptions.py")
+        return
+    
+    new_internships, closed_internships, last_change_id = db.get_digest_changes()
+    print(f"Digest: {len(new_internships)} new, {len(closed_internships)} closed since the last one")
+    
+    # Queue each subscriber's filtered digest, then drain the outbox (including
+    # retries left over from earlier runs) over a few reused SMTP sessions
+    print(f"Sending email digest to {len(subscribers)} subscriber(s)...")
+    email_sender = EmailSender(smtp_server, smtp_port, sender_email, sender_password)
+    outbox = Outbox(os.getenv('OUTBOX_PATH', 'outbox.db'))
+    email_sender.queue_subscriber_digests(outbox, subscribers, new_internships, closed_internships)
+    # Queued messages are durable, so the changes count as delivered from here on
+    db.record_digest(last_change_id)
+    delivery = SmtpDelivery(smtp_server, smtp_port, sender_email, sender_password,
+                            connections=int(os.getenv('SMTP_CONNECTIONS', '4')))
+    report = delivery.deliver(outbox)
+    print(f"Sent {report.sent}, {report.retried} queued for retry, {report.failed} failed")
+    if report.error:
+        print(f"{report.error}; {report.deferred} message(s) left in the outbox for the next run")
+    outbox.purge_sent()
+    outbox.close()
+
+def main(http_client: Optional[HttpClient] = None, renderer: Optional[BrowserPool] = None):
+    """
+    Main function to run the scraper once and send the digest.
+    Pass a long-lived http_client and renderer to reuse pooled connections
+    and warm browsers across runs.
+    """
+    print("Starting internship scraper...")
+    
+    # Load environment variables
+    load_dotenv('lebron.env')
+    
+    if not all([os.getenv('SENDER_EMAIL'), os.getenv('SENDER_PASSWORD')]):
         print("ERROR: Missing required environment variables.")
         print("Please set SENDER_EMAIL, SENDER_PASSWORD, and RECIPIENT_EMAIL in .env file")
         return
     
     # Initialize components
     db = InternshipDB()
-    scraper = InternshipScraper()
-    email_sender = EmailSender(smtp_server, smtp_port, sender_email, sender_password)
+    metrics = create_metrics(db)
+    own_renderer = renderer is None
+    if own_renderer:
+        renderer = create_renderer()
+    scraper = create_scraper(http_client, metrics, renderer)
+    scrape_mode = os.getenv('SCRAPE_MODE', 'concurrent')
     
-    # Scrape all companies
+    # Scrape, normalize, dedupe and store in one streaming pass
     print("Scraping internship opportunities...")
-    all_internships = scraper.scrape_all()
-    print(f"Found {len(all_internships)} total internship postings")
-    
-    # Process and identify new internships
-    new_internships = []
-    for internship in all_internships:
-        is_new = db.add_internship(
-            company=internship['company'],
-            title=internship['title'],
-            location=internship['location'],
-            url=internship['url']
-        )
-        if is_new:
-            new_internships.append(internship)
-    
-    print(f"Identified {len(new_internships)} new internship(s)")
-    
-    # Send email digest
-    print("Sending email digest...")
-    email_sender.send_daily_digest(recipient_email, new_internships)
+    try:
+        pipeline = Pipeline(db, scraper.sites(),
+                            max_workers=1 if scrape_mode == 'serial' else scraper.max_workers,
+                            metrics=metrics, health=create_health(db), deadline=run_deadline())
+        digest = pipeline.run()
+    finally:
+        # Worker processes and headless Chrome outlive the run otherwise
+        scraper.close()
+        if own_renderer and renderer is not None:
+            renderer.close()
+    for record in metrics.latest.values():
+        errors = ', '.join(f"{name} x{count}" for name, count in record.errors.items())
+        print(f"{record.site}: {record.status}, {record.items} posting(s) in {record.duration:.2f}s "
+              f"(fetch {record.fetch_seconds:.2f}s, parse {record.parse_seconds:.2f}s, "
+              f"db {record.ingest_seconds:.2f}s, {record.bytes_received / 1024:.0f} KB)"
+              + (f"; errors: {errors}" if errors else ''))
+    print(f"Found {digest.scraped} total internship postings, {digest.duplicates} duplicate(s) removed")
+    for diff in digest.diffs:
+        print(f"{diff.company}: {len(diff.new)} new, {len(diff.updated)} updated, "
+              f"{len(diff.reopened)} reopened, {len(diff.closed)} closed, {diff.still_open} unchanged")
+    print(f"Identified {len(digest.new)} new internship(s)")
+    
+    send_digest(db)
     
     print("Done!")
 
@@ -0,0 +1,283 @@
+"""
+Scrape-run instrumentation.
+
+Each site's run gets a SiteMetrics record: wall time, HTTP fetch time and
+bytes, parse time, postings yielded, errors by exception class, and the
+time spent writing its postings to the database. While a site is being
+scraped its record is the current one (a context variable, so it follows
+the Workday client's page threads); the HTTP client and parsers add to
+whatever record is current, and do nothing when there is none.
+
+When the Pipeline has stored a site's postings the record is finished:
+
+    - appended as one JSON line to `log_path`
+    - inserted into the site_runs table, for trends across runs
+    - folded into Prometheus-style gauges and counters, written to
+      `prom_path` (for node_exporter's textfile collector) and/or served
+      over HTTP by serve()
+
+Recording is a few counter updates under a per-site lock, so it stays on
+in production.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, Optional
+
+from database import InternshipDB, RunDiff
+
+_current: contextvars.ContextVar = contextvars.ContextVar('site_metrics', default=None)
+
+
+class SiteMetrics:
+    """What one run of one site cost and produced; times in seconds"""
+
+    def __init__(self, site: str):
+        self.site = site
+        self.started_at = time.time()
+        self.duration = 0.0  # from first request to last posting, including queue waits
+        self.fetch_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.ingest_seconds = 0.0
+        self.requests = 0
+        self.unchanged = 0  # responses the HTTP cache found unchanged
+        self.bytes_received = 0
+        self.items = 0
+        self.new = 0
+        self.closed = 0
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_request(self, seconds: float, bytes_received: int, unchanged: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.fetch_seconds += seconds
+            self.bytes_received += bytes_received
+            self.unchanged += unchanged
+
+    def add_parse(self, seconds: float):
+        with self._lock:
+            self.parse_seconds += seconds
+
+    def add_error(self, error: BaseException):
+        name = type(error).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def merge(self, fetch_seconds: float, parse_seconds: float, requests: int, unchanged: int,
+              bytes_received: int, errors: Dict[str, int]):
+        """Add counts measured elsewhere, e.g. by a worker process"""
+        with self._lock:
+            self.fetch_seconds += fetch_seconds
+            self.parse_seconds += parse_seconds
+            self.requests += requests
+            self.unchanged += unchanged
+            self.bytes_received += bytes_received
+            for error, count in errors.items():
+                self.errors[error] = self.errors.get(error, 0) + count
+
+    @property
+    def status(self) -> str:
+        """'error' if anything failed, 'empty' if nothing was found, else 'ok'"""
+        if self.errors:
+            return 'error'
+        return 'ok' if self.items else 'empty'
+
+    def to_dict(self) -> Dict:
+        return {
+            'site': self.site,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+            'status': self.status,
+            'duration': round(self.duration, 4),
+            'fetch_seconds': round(self.fetch_seconds, 4),
+            'parse_seconds': round(self.parse_seconds, 4),
+            'ingest_seconds': round(self.ingest_seconds, 4),
+            'requests': self.requests,
+            'unchanged': self.unchanged,
+            'bytes': self.bytes_received,
+            'items': self.items,
+            'new': self.new,
+            'closed': self.closed,
+            'errors': dict(self.errors),
+        }
+
+
+def current() -> Optional[SiteMetrics]:
+    """The record of the site being scraped in this context, if any"""
+    return _current.get()
+
+
+@contextmanager
+def timed_parse() -> Iterator[None]:
+    """Count the enclosed block as parse time for the current site"""
+    record = _current.get()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record.add_parse(time.perf_counter() - start)
+
+
+class ScrapeMetrics:
+    """
+    Collects SiteMetrics for every site run and exports finished ones.
+    One instance can serve many runs (e.g. for the life of the scheduler);
+    counters in the Prometheus output accumulate across them.
+    """
+
+    def __init__(self, db: Optional[InternshipDB] = None, log_path: Optional[str] = None,
+                 prom_path: Optional[str] = None):
+        self.db = db
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self.latest: Dict[str, SiteMetrics] = {}
+        self._active: Dict[str, SiteMetrics] = {}
+        self._totals: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def _record(self, site: str) -> SiteMetrics:
+        with self._lock:
+            record = self._active.get(site)
+            if record is None:
+                record = self._active[site] = SiteMetrics(site)
+            return record
+
+    @contextmanager
+    def site(self, site: str) -> Iterator[SiteMetrics]:
+        """
+        Make `site`'s record current for the enclosed scrape and time it.
+        Errors escaping the block are left to whoever catches them to record.
+        """
+        record = self._record(site)
+        previous = _current.get()
+        _current.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration += time.perf_counter() - start
+            # set() rather than reset(): a generator may be closed from another context
+            _current.set(previous)
+
+    def record_error(self, site: str, error: BaseException):
+        self._record(site).add_error(error)
+
+    def failed(self, site: str) -> bool:
+        """Whether `site`'s current run has recorded any error"""
+        with self._lock:
+            record = self._active.get(site)
+        return record is not None and bool(record.errors)
+
+    def record_ingest(self, site: str, seconds: float):
+        self._record(site).ingest_seconds += seconds
+
+    def finish_site(self, site: str, diffs: Iterable[RunDiff] = ()) -> SiteMetrics:
+        """Close `site`'s record for this run and export it"""
+        with self._lock:
+            record = self._active.pop(site, None) or SiteMetrics(site)
+        for diff in diffs:
+            record.new += len(diff.new)
+            record.closed += len(diff.closed)
+        data = record.to_dict()
+
+        if self.log_path:
+            line = json.dumps(dict(data, event='site_run'), separators=(',', ':'))
+            with self._lock, open(self.log_path, 'a', encoding='utf-8') as log:
+                log.write(line + '\n')
+        if self.db is not None:
+            self.db._connection().execute('''
+                INSERT INTO site_runs (site, started_at, status, duration, fetch_seconds,
+                    parse_seconds, ingest_seconds, requests, unchanged, bytes, items,
+                    new_count, closed_count, errors)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (site, data['started_at'], data['status'], record.duration, record.fetch_seconds,
+                  record.parse_seconds, record.ingest_seconds, record.requests, record.unchanged,
+                  record.bytes_received, record.items, record.new, record.closed,
+                  json.dumps(record.errors)))
+
+        with self._lock:
+            self.latest[site] = record
+            for name, value in (('requests', record.requests), ('bytes', record.bytes_received),
+                                ('items', record.items), ('runs', 1)):
+                key = (name, site, None)
+                self._totals[key] = self._totals.get(key, 0) + value
+            for error, count in record.errors.items():
+                key = ('errors', site, error)
+                self._totals[key] = self._totals.get(key, 0) + count
+        if self.prom_path:
+            self.write_prometheus(self.prom_path)
+        return record
+
+    def prometheus_text(self) -> str:
+        """Last-run gauges and cumulative counters per site, in Prometheus text format"""
+        gauges = [
+            ('duration_seconds', 'Wall time of the last run', lambda r: r.duration),
+            ('fetch_seconds', 'HTTP time in the last run', lambda r: r.fetch_seconds),
+            ('parse_seconds', 'HTML/JSON parse time in the last run', lambda r: r.parse_seconds),
+            ('ingest_seconds', 'Database write time in the last run', lambda r: r.ingest_seconds),
+            ('bytes', 'Bytes downloaded in the last run', lambda r: r.bytes_received),
+            ('items', 'Postings scraped in the last run', lambda r: r.items),
+            ('new', 'New postings in the last run', lambda r: r.new),
+            ('errors', 'Errors in the last run', lambda r: sum(r.errors.values())),
+            ('timestamp_seconds', 'Start time of the last run', lambda r: r.started_at),
+        ]
+        lines = []
+        with self._lock:
+            latest = sorted(self.latest.items())
+            totals = sorted(self._totals.items(), key=lambda item: tuple(str(k) for k in item[0]))
+        for name, help_text, value in gauges:
+            metric = f'internscrapes_site_last_{name}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} gauge')
+            lines.extend(f'{metric}{{site="{site}"}} {value(record)}' for site, record in latest)
+        for name in ('runs', 'requests', 'bytes', 'items', 'errors'):
+            metric = f'internscrapes_site_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for (total_name, site, error), value in totals:
+                if total_name == name:
+                    labels = f'site="{site}"' + (f',error="{error}"' if error else '')
+                    lines.append(f'{metric}{{{labels}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write prometheus_text() to `path` atomically, so a collector never reads half a file"""
+        # Sites finish concurrently. One writer at a time, so no two share the
+        # tmp file and the last one in writes the newest totals.
+        with self._export_lock:
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = '') -> ThreadingHTTPServer:
+        """Serve prometheus_text() at /metrics from a daemon thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # scrapes every few seconds would drown the scheduler's output
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+        return server
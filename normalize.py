@@ -0,0 +1,174 @@
+"""
+Canonicalization and duplicate detection between the scrapers and InternshipDB.
+
+canonicalize_url() strips tracking parameters and cosmetic URL differences so
+the same job always maps to the same stored URL. DuplicateIndex catches the
+same job listed under genuinely different URLs (locale prefixes, mirrored
+links) by MinHash/LSH over normalized title word shingles, bucketed per company,
+so each lookup only compares against a handful of candidates.
+"""
+
+import hashlib
+import re
+import struct
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from posting import Posting
+
+# Query parameters that only identify where a click came from
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'ref', 'referrer', 'src', 'source',
+    'trk', 'trackingid', 'sessionid', 'jsessionid', '_ga', 'icid', 'cid',
+}
+TRACKING_PREFIXES = ('utm_', 'mkt_', 'hsa_')
+
+# Leading locale segments: /en-US/, /en_ca/, /ca/en/, /fr/
+_LOCALE_PREFIX = re.compile(r'^/(?:[a-z]{2}[-_][a-z]{2}|[a-z]{2}/[a-z]{2}|[a-z]{2})(?=/)', re.IGNORECASE)
+_TOKEN = re.compile(r'[a-z0-9]+')
+# URL path/query tokens with a digit in them: job and requisition IDs
+_ID_TOKEN = re.compile(r'[a-z0-9]*[0-9][a-z0-9]*')
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Strip tracking parameters, fragments, default ports, duplicate slashes and a
+    trailing slash; lowercase the scheme and host; sort the remaining query.
+    The result is still a working link to the same page.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        # A malformed port in a scraped href; keep the netloc as it was
+        host, port = parts.netloc, None
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_identity(url: str) -> str:
+    """
+    Key under which two URLs are the same posting. Locale prefixes are
+    dropped and the path lowercased, so /ca/en/job/1 and /en-CA/job/1 match.
+    Not a usable link; use canonicalize_url() for that.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    path = _LOCALE_PREFIX.sub('', parts.path).lower()
+    return f"{parts.netloc}{path}?{parts.query}"
+
+
+def url_job_ids(url: str) -> FrozenSet[str]:
+    """
+    The identifying tokens of a posting URL: words of its path and query
+    that contain a digit (job and requisition IDs such as 12345 or JR1).
+    The host and locale prefix are left out, so a mirror on another host
+    with the same ID has the same tokens.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    path = _LOCALE_PREFIX.sub('', parts.path).lower()
+    return frozenset(_ID_TOKEN.findall(f"{path}?{parts.query.lower()}"))
+
+
+def normalize_title(title: str) -> str:
+    return ' '.join(_TOKEN.findall(title.lower()))
+
+
+def _shingles(text: str) -> Set[str]:
+    """Word unigrams and bigrams of the normalized text"""
+    words = text.split()
+    shingles = set(words)
+    shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return shingles or {''}
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate index over postings, per company.
+    A posting's title word shingles are MinHashed into `bands` x `rows` values;
+    postings sharing any band land in the same bucket and become candidates,
+    which are then confirmed by exact Jaccard similarity, matching
+    location and URLs that do not carry different job IDs (see
+    url_job_ids). Several requisitions with the same title and location,
+    common on Workday, therefore stay separate postings. Lookups cost
+    O(bands) bucket probes, not O(postings).
+    """
+
+    def __init__(self, bands: int = 8, rows: int = 6, threshold: float = 0.9):
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        self._seeds = [
+            struct.unpack('<Q', hashlib.blake2b(str(i).encode(), digest_size=8).digest())[0]
+            for i in range(bands * rows)
+        ]
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+        self._entries: List[Tuple[str, Set[str], FrozenSet[str]]] = []
+        self._identities: Set[str] = set()
+
+    def _signature(self, shingles: Set[str]) -> List[int]:
+        hashes = [
+            struct.unpack('<Q', hashlib.blake2b(s.encode(), digest_size=8).digest())[0]
+            for s in shingles
+        ]
+        return [min(h ^ seed for h in hashes) for seed in self._seeds]
+
+    def add(self, internship: Posting) -> bool:
+        """Index a posting; returns False (and indexes nothing) if it duplicates one already seen"""
+        identity = url_identity(internship.url)
+        if identity in self._identities:
+            return False
+
+        company = internship.company
+        location = normalize_title(internship.location or '')
+        shingles = _shingles(normalize_title(internship.title))
+        job_ids = url_job_ids(internship.url)
+        signature = self._signature(shingles)
+        keys = [
+            (company, band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+        candidates = set()
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+        for candidate in candidates:
+            other_location, other_shingles, other_job_ids = self._entries[candidate]
+            if other_location != location:
+                continue
+            # Different IDs are different requisitions, however alike their titles
+            if job_ids and other_job_ids and job_ids != other_job_ids:
+                continue
+            similarity = len(shingles & other_shingles) / len(shingles | other_shingles)
+            if similarity >= self.threshold:
+                return False
+
+        entry_id = len(self._entries)
+        self._entries.append((location, shingles, job_ids))
+        self._identities.add(identity)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(entry_id)
+        return True
+
+
+def canonicalize(internships: Iterable[Posting], index: DuplicateIndex = None) -> Iterator[Posting]:
+    """
+    Canonicalize posting URLs and drop duplicates, preserving order.
+    Pass a shared `index` to dedupe across several calls (e.g. a whole run).
+    """
+    index = index if index is not None else DuplicateIndex()
+    for internship in internships:
+        internship = internship._replace(url=canonicalize_url(internship.url))
+        if index.add(internship):
+            yield internship
@@ -0,0 +1,189 @@
+"""
+Pluggable HTML parser backends for the scrapers.
+
+Every backend takes a page and an item selector and returns the matching
+elements wrapped in a small common Node interface (find/text/get), so a
+scraper's extraction code does not care which parser built the tree.
+Selectors are deliberately simple: `tag`, `tag.class` or `.class`.
+
+Backends:
+    html.parser  - BeautifulSoup with the stdlib parser (the original behaviour)
+    lxml         - BeautifulSoup with the lxml parser
+    lxml-native  - lxml.html directly, no BeautifulSoup tree at all
+    selectolax   - selectolax's Lexbor/Modest parser, if installed
+
+The BeautifulSoup backends can be `scoped`: a SoupStrainer limits the tree
+to the item elements and their children instead of the whole document.
+"""
+
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+_backends: Dict[str, 'ParserBackend'] = {}
+
+
+def parse_selector(selector: str) -> Tuple[Optional[str], Optional[str]]:
+    """Split 'tag.class' into (tag, class); either part may be None"""
+    tag, _, cls = selector.partition('.')
+    return (tag or None), (cls or None)
+
+
+class Node:
+    """An element from any backend"""
+
+    def find(self, selector: str) -> Optional['Node']:
+        raise NotImplementedError
+
+    def text(self) -> str:
+        raise NotImplementedError
+
+    def get(self, attr: str, default: str = '') -> str:
+        raise NotImplementedError
+
+
+class ParserBackend:
+    name = ''
+
+    def select(self, content: bytes, item_selector: str, limit: Optional[int] = None,
+               scoped: bool = True) -> List[Node]:
+        """Parse `content` and return up to `limit` elements matching `item_selector`"""
+        raise NotImplementedError
+
+
+class _SoupNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def find(self, selector):
+        tag, cls = parse_selector(selector)
+        kwargs = {'class_': cls} if cls else {}
+        found = self.element.find(tag, **kwargs)
+        return _SoupNode(found) if found is not None else None
+
+    def text(self):
+        return self.element.get_text(strip=True)
+
+    def get(self, attr, default=''):
+        value = self.element.get(attr, default)
+        return ' '.join(value) if isinstance(value, list) else value
+
+
+class SoupBackend(ParserBackend):
+    def __init__(self, features: str):
+        self.name = features
+        self.features = features
+        bs4 = importlib.import_module('bs4')
+        self._soup = bs4.BeautifulSoup
+        self._strainer = bs4.SoupStrainer
+
+    def select(self, content, item_selector, limit=None, scoped=True):
+        tag, cls = parse_selector(item_selector)
+        kwargs = {'class_': cls} if cls else {}
+        parse_only = self._strainer(tag, **kwargs) if scoped else None
+        soup = self._soup(content, self.features, parse_only=parse_only)
+        return [_SoupNode(el) for el in soup.find_all(tag, limit=limit, **kwargs)]
+
+
+def _class_xpath(tag: Optional[str], cls: Optional[str]) -> str:
+    xpath = f".//{tag or '*'}"
+    if cls:
+        xpath += f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+    return xpath
+
+
+class _LxmlNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def find(self, selector):
+        found = self.element.xpath(_class_xpath(*parse_selector(selector)))
+        return _LxmlNode(found[0]) if found else None
+
+    def text(self):
+        return ''.join(s.strip() for s in self.element.itertext())
+
+    def get(self, attr, default=''):
+        return self.element.get(attr, default)
+
+
+class LxmlBackend(ParserBackend):
+    name = 'lxml-native'
+
+    def __init__(self):
+        self._html = importlib.import_module('lxml.html')
+
+    def select(self, content, item_selector, limit=None, scoped=True):
+        if not content:
+            return []
+        root = self._html.fromstring(content)
+        elements = root.xpath(_class_xpath(*parse_selector(item_selector)))
+        return [_LxmlNode(el) for el in elements[:limit]]
+
+
+class _SelectolaxNode(Node):
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def find(self, selector):
+        found = self.element.css_first(selector)
+        return _SelectolaxNode(found) if found is not None else None
+
+    def text(self):
+        return self.element.text(deep=True, separator='', strip=True)
+
+    def get(self, attr, default=''):
+        value = self.element.attributes.get(attr)
+        return default if value is None else value
+
+
+class SelectolaxBackend(ParserBackend):
+    name = 'selectolax'
+
+    def __init__(self):
+        self._parser = importlib.import_module('selectolax.parser').HTMLParser
+
+    def select(self, content, item_selector, limit=None, scoped=True):
+        elements = self._parser(content).css(item_selector)
+        return [_SelectolaxNode(el) for el in elements[:limit]]
+
+
+_factories = {
+    'html.parser': lambda: SoupBackend('html.parser'),
+    'lxml': lambda: SoupBackend('lxml'),
+    'lxml-native': LxmlBackend,
+    'selectolax': SelectolaxBackend,
+}
+
+BACKENDS = tuple(_factories)
+
+
+def get_backend(name: str) -> ParserBackend:
+    """
+    Return the named backend, importing its parser library on first use.
+    Raises ValueError for an unknown name and ImportError if the library is missing.
+    """
+    backend = _backends.get(name)
+    if backend is None:
+        if name not in _factories:
+            raise ValueError(f"Unknown parser backend: {name}")
+        backend = _factories[name]()
+        _backends[name] = backend
+    return backend
+
+
+def available_backends() -> List[str]:
+    """Backends whose parser library can be imported here"""
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
@@ -0,0 +1,219 @@
+"""
+Streaming scrape pipeline:
+
+    fetch+parse (one thread per site) -> normalize+dedupe -> persist -> digest
+
+Stages are threads joined by bounded queues, so postings flow through as
+each site's scraper yields them: persistence starts as soon as the first
+site responds, and a fast producer blocks instead of buffering a whole
+run in memory.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+from database import CompanyRun, InternshipDB, RunDiff
+from health import HealthTracker
+from http_client import deadline
+from metrics import ScrapeMetrics
+from normalize import DuplicateIndex, canonicalize_url
+from posting import Posting
+
+# Marks the end of the stream on a queue
+_STOP = object()
+
+
+@dataclass
+class _SiteDone:
+    """Queued after a site's last posting"""
+    site: str
+    skipped: bool = False  # the site was not scraped at all
+    complete: bool = True  # False if the scrape stopped early; nothing is then closed
+
+
+@dataclass
+class DigestAccumulator:
+    """Collects what the digest needs as runs finish"""
+    new: List[Posting] = field(default_factory=list)
+    closed: List[Posting] = field(default_factory=list)
+    diffs: List[RunDiff] = field(default_factory=list)
+    scraped: int = 0
+    duplicates: int = 0
+
+    def add_diff(self, diff: RunDiff):
+        self.diffs.append(diff)
+        self.closed.extend(diff.closed)
+
+
+class Pipeline:
+    """
+    Runs site scrapers through normalize, dedupe and persist stages.
+    `sites` maps a site name to a generator function yielding its postings,
+    as returned by InternshipScraper.sites(). With `metrics`, each site's
+    database time is recorded and its record is finished once stored.
+    With `health` (which needs `metrics`), sites whose circuit is open are
+    skipped and every finished run is reported to it. `deadline` is the
+    run's budget in seconds: requests are cut short to fit it, and sites
+    not started by then are skipped.
+    A site whose scrape raises or records an error partway, or one of whose
+    postings fails to normalize, still has its postings stored, but closes
+    nothing: the postings it never reached stay open. Errors inside the
+    stages are recorded against the site and never stop the run.
+    """
+
+    def __init__(self, db: InternshipDB, sites: Dict[str, Callable[[], Iterator[Posting]]],
+                 max_workers: int = 8, queue_size: int = 256, batch_size: int = 100,
+                 metrics: Optional[ScrapeMetrics] = None, health: Optional[HealthTracker] = None,
+                 deadline: Optional[float] = None):
+        if health is not None and metrics is None:
+            raise ValueError("Pipeline health tracking needs metrics")
+        self.db = db
+        self.sites = sites
+        self.metrics = metrics
+        self.health = health
+        self.deadline = deadline
+        self._deadline_at: Optional[float] = None
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._parsed: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._normalized: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.digest = DigestAccumulator()
+
+    def run(self) -> DigestAccumulator:
+        """Run every site through all stages and return the digest contents"""
+        stages = [
+            threading.Thread(target=self._normalize_stage, name='normalize'),
+            threading.Thread(target=self._persist_stage, name='persist'),
+        ]
+        for stage in stages:
+            stage.start()
+
+        if self.deadline:
+            self._deadline_at = time.monotonic() + self.deadline
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            list(pool.map(self._fetch_stage, self.sites.keys()))
+        self._parsed.put(_STOP)
+
+        for stage in stages:
+            stage.join()
+        return self.digest
+
+    def _fetch_stage(self, site: str):
+        """Drive one site's scraper generator, queueing postings as they are parsed"""
+        if self._deadline_at is not None and time.monotonic() >= self._deadline_at:
+            print(f"Skipping {site}: run deadline reached")
+            self._parsed.put(_SiteDone(site, skipped=True))
+            return
+        if self.health is not None and not self.health.allow(site):
+            print(f"Skipping {site}: circuit open until "
+                  f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(self.health.get(site).open_until))}")
+            self._parsed.put(_SiteDone(site, skipped=True))
+            return
+        complete = True
+        try:
+            with deadline(self._deadline_at):
+                for internship in self.sites[site]():
+                    self._parsed.put((site, internship))
+        except Exception as e:
+            complete = False
+            print(f"Error in {site} scraper: {e}")
+            if self.metrics is not None:
+                self.metrics.record_error(site, e)
+        finally:
+            if self.metrics is not None and self.metrics.failed(site):
+                complete = False
+            self._parsed.put(_SiteDone(site, complete=complete))
+
+    def _normalize_stage(self):
+        index = DuplicateIndex()
+        failed: Set[str] = set()  # sites with a posting dropped here
+        while True:
+            item = self._parsed.get()
+            if item is _STOP:
+                self._normalized.put(_STOP)
+                return
+            if isinstance(item, _SiteDone):
+                if item.site in failed:
+                    failed.discard(item.site)
+                    item = replace(item, complete=False)
+                self._normalized.put(item)
+                continue
+
+            site, internship = item
+            self.digest.scraped += 1
+            try:
+                internship = internship._replace(url=canonicalize_url(internship.url))
+                unique = index.add(internship)
+            except Exception as e:
+                # Drop the posting, not the stage: a dead stage would never pass _STOP on
+                print(f"Error normalizing a {site} posting: {e}")
+                failed.add(site)
+                if self.metrics is not None:
+                    self.metrics.record_error(site, e)
+                continue
+            if unique:
+                self._normalized.put((site, internship))
+            else:
+                self.digest.duplicates += 1
+
+    def _persist_stage(self):
+        try:
+            self._persist()
+        finally:
+            # The stage thread ends with the run; don't leave its connection open
+            self.db.release()
+
+    def _persist(self):
+        runs: Dict[str, CompanyRun] = {}
+        batches: Dict[str, List[Posting]] = {}
+        companies_by_site: Dict[str, Set[str]] = {}
+
+        def flush(company: str):
+            batch = batches.pop(company, None)
+            if batch:
+                self.digest.new.extend(runs[company].add(batch))
+
+        while True:
+            item = self._normalized.get()
+            if item is _STOP:
+                break
+            done = isinstance(item, _SiteDone)
+            site = item.site if done else item[0]
+            diffs = []
+            start = time.perf_counter()
+            try:
+                if done:
+                    if not item.complete and site in companies_by_site:
+                        print(f"{site}: scrape incomplete, leaving postings it did not reach open")
+                    for company in companies_by_site.pop(site, ()):
+                        flush(company)
+                        diffs.append(runs.pop(company).finish(complete=item.complete))
+                        self.digest.add_diff(diffs[-1])
+                else:
+                    internship = item[1]
+                    company = internship.company
+                    companies_by_site.setdefault(site, set()).add(company)
+                    if company not in runs:
+                        runs[company] = self.db.start_run(company)
+                    batch = batches.setdefault(company, [])
+                    batch.append(internship)
+                    if len(batch) >= self.batch_size:
+                        flush(company)
+            except Exception as e:
+                print(f"Error persisting postings: {e}")
+                if self.metrics is not None:
+                    self.metrics.record_error(site, e)
+            if self.metrics is not None and not (done and item.skipped):
+                try:
+                    self.metrics.record_ingest(site, time.perf_counter() - start)
+                    if done:
+                        record = self.metrics.finish_site(site, diffs)
+                        if self.health is not None:
+                            self.health.observe(site, record.items, record.errors)
+                except Exception as e:
+                    # Keep draining: the fetch threads block once the queues fill
+                    print(f"Error recording the {site} run: {e}")
@@ -0,0 +1,32 @@
+"""
+The record every scraped posting travels in, from the site adapters through
+the pipeline and database to the digest.
+
+A Posting is a named tuple: no per-instance dict, so a few hundred thousand
+of them cost a fraction of the equivalent dicts, and they pickle as plain
+tuples between processes. Postings built with Posting.create() share one
+interned string per company and per location, which repeat across nearly
+every posting a site returns.
+"""
+
+import sys
+from typing import Mapping, NamedTuple, Optional, Union
+
+
+class Posting(NamedTuple):
+    company: str
+    title: str
+    location: Optional[str]
+    url: str
+
+    @classmethod
+    def create(cls, company: str, title: str, location: Optional[str], url: str) -> 'Posting':
+        """A Posting with its company and location interned"""
+        return cls(sys.intern(company), title, sys.intern(location) if location else location, url)
+
+
+def as_posting(item: Union[Posting, Mapping]) -> Posting:
+    """A Posting from a Posting, or from a dict with company/title/location/url keys"""
+    if isinstance(item, Posting):
+        return item
+    return Posting.create(item['company'], item['title'], item.get('location'), item['url'])
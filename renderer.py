@@ -0,0 +1,214 @@
+"""
+Headless-browser rendering for career sites that build their listings in
+JavaScript (adapter type 'browser' in sites.py).
+
+BrowserPool keeps up to `size` headless Chrome instances (via Selenium)
+warm between pages and runs: one is started only when every existing one
+is busy, and a browser is only thrown away if it stops responding. Images,
+fonts, media and analytics requests are blocked through the DevTools
+protocol, so a page costs its HTML, scripts and data calls.
+
+render() loads a page, waits until the job items appear or a response
+whose URL contains `capture` arrives, and returns the rendered HTML along
+with the bodies of the captured responses. Sites whose listings come from
+an XHR/fetch JSON call can be read from that JSON instead of the DOM.
+
+Selenium is optional: BrowserPool raises ImportError without it, and
+RendererUnavailable if no browser can be started (tried again after
+`retry_after` seconds) or none comes free in time, in which case the
+scrapers fall back to the static page.
+"""
+
+import base64
+import importlib
+import json
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+import metrics
+
+# Requests a rendered listing never needs (Network.setBlockedURLs patterns)
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.mp4', '*.webm',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*optimizely.com*', '*segment.io*',
+]
+
+
+class RendererUnavailable(RuntimeError):
+    """No browser could be started, or none came free in time"""
+
+
+@dataclass
+class RenderedPage:
+    url: str
+    html: bytes
+    captured: List[Tuple[str, bytes]] = field(default_factory=list)  # (response URL, body)
+
+
+class BrowserPool:
+    def __init__(self, size: int = 2, page_load_timeout: float = 20.0, wait_timeout: float = 10.0,
+                 blocked_urls: Optional[List[str]] = None, retry_after: float = 300.0,
+                 acquire_timeout: Optional[float] = None):
+        self._webdriver = importlib.import_module('selenium.webdriver')
+        self._exceptions = importlib.import_module('selenium.common.exceptions')
+        self.size = size
+        self.page_load_timeout = page_load_timeout
+        self.wait_timeout = wait_timeout
+        self.blocked_urls = BLOCKED_URLS if blocked_urls is None else blocked_urls
+        self.retry_after = retry_after
+        # Default: long enough for a busy browser to finish a couple of pages
+        if acquire_timeout is None:
+            acquire_timeout = 2 * (page_load_timeout + wait_timeout)
+        self.acquire_timeout = acquire_timeout
+        self.started = 0  # browsers launched over the pool's life, including replacements
+        self._idle: queue.Queue = queue.Queue()
+        self._live = 0
+        self._unavailable: Optional[str] = None
+        self._unavailable_until = 0.0
+        self._lock = threading.Lock()
+
+    def _start(self):
+        options = self._webdriver.ChromeOptions()
+        for argument in ('--headless=new', '--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage',
+                         '--disable-extensions', '--blink-settings=imagesEnabled=false'):
+            options.add_argument(argument)
+        # The performance log carries DevTools network events, for capturing responses
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        driver = self._webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        self.started += 1
+        return driver
+
+    @contextmanager
+    def _browser(self) -> Iterator:
+        """
+        Borrow an idle browser, starting one if none is idle and the pool is
+        not full. After a failed start no browser is tried for retry_after
+        seconds. Waiting for a busy one gives up after acquire_timeout.
+        """
+        give_up = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._lock:
+                if time.monotonic() < self._unavailable_until:
+                    raise RendererUnavailable(self._unavailable)
+            try:
+                driver = self._idle.get_nowait()
+                break
+            except queue.Empty:
+                pass
+            with self._lock:
+                start = self._live < self.size
+                if start:
+                    self._live += 1
+            if start:
+                try:
+                    driver = self._start()
+                except Exception as e:
+                    with self._lock:
+                        self._live -= 1
+                        self._unavailable = f"Could not start a browser: {e}"
+                        self._unavailable_until = time.monotonic() + self.retry_after
+                    raise RendererUnavailable(self._unavailable) from e
+                break
+            # Wake up now and then: a browser discarded meanwhile frees a slot
+            # to start another, and is never put back on the idle queue
+            remaining = give_up - time.monotonic()
+            if remaining <= 0:
+                raise RendererUnavailable(f"No browser came free within {self.acquire_timeout:g}s")
+            try:
+                driver = self._idle.get(timeout=min(remaining, 1.0))
+                break
+            except queue.Empty:
+                pass
+
+        try:
+            yield driver
+        except Exception:
+            try:
+                driver.current_url  # still responding?
+            except Exception:
+                self._discard(driver)
+                raise
+            self._idle.put(driver)
+            raise
+        self._idle.put(driver)
+
+    def _discard(self, driver):
+        with self._lock:
+            self._live -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def render(self, url: str, wait_for: Optional[str] = None, capture: Optional[str] = None) -> RenderedPage:
+        """
+        Load `url` and return its rendered HTML once the `wait_for` CSS selector
+        matches or a response whose URL contains `capture` has arrived (or
+        after wait_timeout). Bodies of those responses are in `captured`.
+        """
+        start = time.perf_counter()
+        with self._browser() as driver:
+            driver.get_log('performance')  # drop events left over from the previous page
+            try:
+                driver.get(url)
+            except self._exceptions.TimeoutException:
+                pass  # use whatever has loaded so far
+
+            events = []
+            wait_until = time.monotonic() + self.wait_timeout
+            while True:
+                events.extend(json.loads(entry['message'])['message'] for entry in driver.get_log('performance'))
+                if capture and _finished_requests(events, capture):
+                    break
+                if wait_for and driver.find_elements('css selector', wait_for):
+                    break
+                if (not capture and not wait_for) or time.monotonic() >= wait_until:
+                    break
+                time.sleep(0.1)
+
+            captured = []
+            for request_id, response_url in _finished_requests(events, capture) if capture else ():
+                try:
+                    body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                except self._exceptions.WebDriverException:
+                    continue  # evicted or never finished
+                data = body['body']
+                captured.append((response_url, base64.b64decode(data) if body.get('base64Encoded')
+                                 else data.encode('utf-8')))
+            html = driver.page_source.encode('utf-8')
+
+        record = metrics.current()
+        if record is not None:
+            record.add_request(time.perf_counter() - start, len(html) + sum(len(b) for _, b in captured))
+        return RenderedPage(url, html, captured)
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(driver)
+
+
+def _finished_requests(events: List[dict], capture: str) -> List[Tuple[str, str]]:
+    """(request id, URL) of fully loaded responses whose URL contains `capture`"""
+    matching = {}
+    finished = set()
+    for event in events:
+        method = event.get('method')
+        params = event.get('params', {})
+        if method == 'Network.responseReceived' and capture in params['response']['url']:
+            matching[params['requestId']] = params['response']['url']
+        elif method == 'Network.loadingFinished':
+            finished.add(params['requestId'])
+    return [(request_id, url) for request_id, url in matching.items() if request_id in finished]
@@ -1,32 +1,271 @@
 #!/usr/bin/env python3
 """
-Scheduler script to run the scraper daily at a specified time
+Adaptive scheduler: polls each site on its own interval and sends digests on a separate cadence.
+
+Every site keeps an estimate of how many changes (new, updated, reopened and
+closed postings) it sees per hour. After each run the estimate is updated
+and the next check is scheduled so that about `target_changes` changes
+accumulate between polls: busy sites are checked often, quiet ones rarely.
+Intervals are clamped to [min, max] hours and jittered so sites drift apart
+instead of firing together. State lives in the site_schedule table, so a
+restart resumes where the last process left off.
+
+Due jobs come off a heap ordered by run time and run on a thread pool. A
+site is only put back on the heap once its run finishes, so two runs of the
+same site never overlap. The digest is a job on the same heap with a fixed
+cadence; it covers every change since the previous digest.
 """
 
-import schedule
+import heapq
+import os
+import random
+import threading
 import time
-from main import main
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+from database import InternshipDB
+from health import HealthTracker
+from main import (create_health, create_http_client, create_metrics, create_renderer, create_scraper,
+                  run_deadline, send_digest)
+from metrics import ScrapeMetrics
+from pipeline import Pipeline
+from posting import Posting
+
+# Heap key for the digest job; not a valid site name
+DIGEST = '<digest>'
+
+
+@dataclass
+class SiteSchedule:
+    site: str
+    interval_hours: float
+    change_rate: float  # estimated changes per hour
+    last_run_at: Optional[float]
+    next_run_at: float
+
+
+class PollingPolicy:
+    """Turns observed changes into a change-rate estimate and the next polling interval"""
+
+    def __init__(self, min_interval_hours: float = 1.0, max_interval_hours: float = 72.0,
+                 initial_interval_hours: float = 24.0, target_changes: float = 2.0,
+                 smoothing: float = 0.3, jitter: float = 0.1):
+        self.min_interval_hours = min_interval_hours
+        self.max_interval_hours = max_interval_hours
+        self.initial_interval_hours = initial_interval_hours
+        self.target_changes = target_changes
+        self.smoothing = smoothing
+        self.jitter = jitter
+
+    def initial(self, site: str, now: float) -> SiteSchedule:
+        """A site seen for the first time starts at the initial interval, first run spread over a minute"""
+        return SiteSchedule(site, self.initial_interval_hours,
+                            self.target_changes / self.initial_interval_hours,
+                            None, now + random.uniform(0, 60))
+
+    def observe(self, state: SiteSchedule, changes: int, now: float):
+        """Fold one run's change count into the estimate and schedule the next run"""
+        elapsed = (now - state.last_run_at) / 3600 if state.last_run_at else state.interval_hours
+        observed = changes / max(elapsed, 1 / 60)
+        state.change_rate = self.smoothing * observed + (1 - self.smoothing) * state.change_rate
+        if state.change_rate > 0:
+            interval = self.target_changes / state.change_rate
+        else:
+            interval = self.max_interval_hours
+        state.interval_hours = min(self.max_interval_hours, max(self.min_interval_hours, interval))
+        state.last_run_at = now
+        spread = random.uniform(-self.jitter, self.jitter)
+        state.next_run_at = now + state.interval_hours * 3600 * (1 + spread)
+
+
+class AdaptiveScheduler:
+    """
+    Runs each site through the Pipeline on its own adaptive schedule,
+    at most `max_workers` at a time, and `digest_job` every
+    `digest_interval_hours` starting at the next `digest_at` (HH:MM).
+    """
+
+    def __init__(self, db: InternshipDB, sites: Dict[str, Callable[[], Iterator[Posting]]],
+                 policy: Optional[PollingPolicy] = None, max_workers: int = 4,
+                 digest_job: Optional[Callable[[], None]] = None,
+                 digest_interval_hours: float = 24.0, digest_at: Optional[str] = '08:00',
+                 metrics: Optional[ScrapeMetrics] = None, health: Optional[HealthTracker] = None,
+                 deadline: Optional[float] = None):
+        self.db = db
+        self.sites = sites
+        self.metrics = metrics
+        self.health = health
+        self.deadline = deadline
+        self.policy = policy or PollingPolicy()
+        self.max_workers = max_workers
+        self.digest_job = digest_job
+        self.digest_interval_hours = digest_interval_hours
+        self.digest_at = digest_at
+        self.fetches: Dict[str, int] = {site: 0 for site in sites}
+        self._states = self._load_states()
+        self._heap = []
+        self._seq = 0
+        self._running = set()
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def _load_states(self) -> Dict[str, SiteSchedule]:
+        rows = self.db._connection().execute(
+            'SELECT site, interval_hours, change_rate, last_run_at, next_run_at FROM site_schedule'
+        ).fetchall()
+        stored = {row[0]: SiteSchedule(*row) for row in rows}
+        now = time.time()
+        states = {}
+        for site in self.sites:
+            state = stored.get(site) or self.policy.initial(site, now)
+            if state.next_run_at < now:
+                # Overdue after downtime: catch up, but not all at the same instant
+                state.next_run_at = now + random.uniform(0, 60)
+            states[site] = state
+        return states
+
+    def _save_state(self, state: SiteSchedule):
+        self.db._connection().execute('''
+            INSERT INTO site_schedule (site, interval_hours, change_rate, last_run_at, next_run_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(site) DO UPDATE SET
+                interval_hours = excluded.interval_hours,
+                change_rate = excluded.change_rate,
+                last_run_at = excluded.last_run_at,
+                next_run_at = excluded.next_run_at
+        ''', (state.site, state.interval_hours, state.change_rate, state.last_run_at, state.next_run_at))
+
+    def _push(self, when: float, name: str):
+        """Schedule a job; the caller holds self._cond"""
+        self._seq += 1
+        heapq.heappush(self._heap, (when, self._seq, name))
+        self._cond.notify()
+
+    def _first_digest_at(self, now: float) -> float:
+        if not self.digest_at:
+            return now + self.digest_interval_hours * 3600
+        hour, minute = (int(part) for part in self.digest_at.split(':'))
+        first = datetime.fromtimestamp(now).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if first.timestamp() <= now:
+            first += timedelta(days=1)
+        return first.timestamp()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run_forever(self):
+        """Dispatch due jobs until stop() is called"""
+        now = time.time()
+        with self._cond:
+            for state in self._states.values():
+                self._push(state.next_run_at, state.site)
+            if self.digest_job:
+                self._push(self._first_digest_at(now), DIGEST)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with self._cond:
+                    while not self._stopped:
+                        if self._heap:
+                            delay = self._heap[0][0] - time.time()
+                            if delay <= 0:
+                                break
+                            self._cond.wait(delay)
+                        else:
+                            self._cond.wait()
+                    if self._stopped:
+                        return
+                    _, _, name = heapq.heappop(self._heap)
+                    if name in self._running:
+                        continue  # never overlap runs of the same job
+                    self._running.add(name)
+                pool.submit(self._run_job, name)
+
+    def _run_job(self, name: str):
+        try:
+            if name == DIGEST:
+                self._run_digest()
+            else:
+                self._run_site(name)
+        except Exception as e:
+            print(f"Scheduled job {name} failed: {e}")
+            with self._cond:
+                # Retry on the job's usual cadence rather than spinning
+                if name == DIGEST:
+                    next_run = time.time() + self.digest_interval_hours * 3600
+                else:
+                    next_run = time.time() + self._states[name].interval_hours * 3600
+                self._running.discard(name)
+                self._push(next_run, name)
+
+    def _run_digest(self):
+        print(f"Sending digest at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.digest_job()
+        with self._cond:
+            self._running.discard(DIGEST)
+            self._push(time.time() + self.digest_interval_hours * 3600, DIGEST)
+
+    def _run_site(self, site: str):
+        digest = Pipeline(self.db, {site: self.sites[site]}, max_workers=1, metrics=self.metrics,
+                          health=self.health, deadline=self.deadline).run()
+        changes = sum(len(d.new) + len(d.updated) + len(d.reopened) + len(d.closed) for d in digest.diffs)
+        state = self._states[site]
+        self.policy.observe(state, changes, time.time())
+        if self.health is not None:
+            open_until = self.health.get(site).open_until
+            if open_until is not None and open_until > state.next_run_at:
+                # No point waking up while the site's circuit is open
+                state.next_run_at = open_until
+        self._save_state(state)
+        self.fetches[site] += 1
+        print(f"{site}: {len(digest.new)} new, {changes} change(s) in total; "
+              f"next check in {state.interval_hours:.1f}h")
+        with self._cond:
+            self._running.discard(site)
+            self._push(state.next_run_at, site)
 
-def job():
-    """Job to be scheduled"""
-    print(f"\n{'='*50}")
-    print(f"Running scheduled job at {time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*50}\n")
-    main()
 
 if __name__ == "__main__":
-    # Schedule the job to run every day at 8:00 AM
-    schedule.every().day.at("08:00").do(job)
-    
+    load_dotenv('lebron.env')
+    db = InternshipDB()
+    metrics = create_metrics(db)
+    if os.getenv('METRICS_PORT'):
+        metrics.serve(int(os.getenv('METRICS_PORT')))
+    # One client and browser pool for the life of the process, so keep-alive
+    # connections and warm browsers survive between scheduled runs
+    renderer = create_renderer()
+    scraper = create_scraper(create_http_client(), metrics, renderer)
+    scheduler = AdaptiveScheduler(
+        db, scraper.sites(),
+        policy=PollingPolicy(
+            min_interval_hours=float(os.getenv('SCHEDULE_MIN_HOURS', '1')),
+            max_interval_hours=float(os.getenv('SCHEDULE_MAX_HOURS', '72')),
+        ),
+        max_workers=int(os.getenv('SCHEDULE_WORKERS', '4')),
+        digest_job=lambda: send_digest(db),
+        digest_interval_hours=float(os.getenv('DIGEST_INTERVAL_HOURS', '24')),
+        digest_at=os.getenv('DIGEST_AT', '08:00') or None,
+        metrics=metrics,
+        health=create_health(db),
+        deadline=run_deadline(),
+    )
+
     print("Internship Scraper Scheduler Started")
-    print("Will run daily at 8:00 AM")
+    print("Each site is checked on its own schedule; digests go out "
+          f"every {scheduler.digest_interval_hours:g}h from {scheduler.digest_at or 'now'}")
     print("Press Ctrl+C to stop\n")
-    
-    # Run once immediately on startup (optional - comment out if not desired)
-    print("Running initial scan...")
-    job()
-    
-    # Keep the script running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    finally:
+        scraper.close()
+        if renderer is not None:
+            renderer.close()
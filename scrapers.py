@@ -1,250 +1,410 @@
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import threading
+import zlib
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
-import time
+from contextlib import nullcontext
+from functools import partial
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from urllib.parse import urlencode, urljoin, urlsplit, urlunsplit, parse_qsl
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from ratelimit import HostRateLimiter
+from http_client import HttpClient, current_deadline, deadline
+from parsers import Node, get_backend
+from metrics import ScrapeMetrics, timed_parse
+from posting import Posting, as_posting
+from renderer import BrowserPool, RendererUnavailable
+import sites as site_registry
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+# Seconds a browser render's postings are reused before the page is rendered again
+RENDER_TTL = 30 * 60
 
 class InternshipScraper:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+    def __init__(self, rate_limiter: Optional[HostRateLimiter] = None, max_workers: int = 8,
+                 http_client: Optional[HttpClient] = None, parser: str = 'lxml-native',
+                 parser_overrides: Optional[Dict[str, str]] = None, scoped_parsing: bool = True,
+                 site_names: Optional[List[str]] = None, metrics: Optional[ScrapeMetrics] = None,
+                 renderer: Optional[BrowserPool] = None, processes: Optional[int] = None,
+                 http_factory: Optional[Callable[[], HttpClient]] = None):
+        self.headers = dict(DEFAULT_HEADERS)
+        self.http = http_client or HttpClient(headers=self.headers, rate_limiter=rate_limiter)
+        self.max_workers = max_workers
+        # Parser backend per company (see parsers.py); anything not listed uses `parser`
+        self.parser = parser
+        self.parser_overrides = parser_overrides or {}
+        self.scoped_parsing = scoped_parsing
+        # Which registered sites (see sites.py) this scraper runs; default is all of them
+        self.site_names = site_names
+        # Per-site timings, bytes, counts and errors (see metrics.py); off when None
+        self.metrics = metrics
+        # Headless browsers for 'browser' adapters (see renderer.py); without one they fetch statically
+        self.renderer = renderer
+        # With `processes`, fetch+parse runs in that many worker processes (see _scrape_in_process).
+        # http_factory must be picklable; it builds each worker's HttpClient
+        self.processes = processes
+        self.http_factory = http_factory
+        self._shards: Dict[int, List[ProcessPoolExecutor]] = {}  # by process count
+        self._shards_lock = threading.Lock()
+    
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET `url` through the shared, rate-limited HTTP client"""
+        return self.http.get(url, **kwargs)
+    
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """POST to `url` through the shared, rate-limited HTTP client"""
+        return self.http.post(url, **kwargs)
+    
+    def _select(self, company: str, content: bytes, item_selector: str,
+                limit: Optional[int] = None) -> List[Node]:
+        """Parse a page with the company's parser backend and return the job item elements"""
+        backend = get_backend(self.parser_overrides.get(company, self.parser))
+        with timed_parse():
+            return backend.select(content, item_selector, limit=limit, scoped=self.scoped_parsing)
+    
+    def _extractor(self, config: Dict) -> str:
+        """
+        Fingerprint of how postings are extracted for an adapter: its whole
+        config and its parser backend. Cached postings from a different one
+        (e.g. before a selector fix) are not reused.
+        """
+        backend = self.parser_overrides.get(config['company'], self.parser)
+        raw = json.dumps([config, backend, self.scoped_parsing], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    
+    def sites(self, processes: Optional[int] = None) -> Dict[str, Callable[[], Iterator[Posting]]]:
+        """
+        Site name -> generator function yielding that site's postings as they
+        are parsed. They fetch and parse in `processes` worker processes
+        (default: the count given to the constructor; 0 for this process).
+        """
+        names = self.site_names or site_registry.site_names()
+        processes = self.processes if processes is None else processes
+        if not processes:
+            return {name: partial(self.scrape_site, name) for name in names}
+        # Browser rendering is I/O-bound and its pool lives here, so those sites stay in-process
+        return {
+            name: partial(self.scrape_site, name) if self.renderer is not None
+            and site_registry.get_site(name)['type'] == 'browser'
+            else partial(self._scrape_in_process, name, processes)
+            for name in names
         }
     
-    def scrape_all(self) -> List[Dict]:
-        """Scrape all companies and return list of internships"""
-        all_internships = []
+    def scrape_all(self, mode: str = 'concurrent') -> List[Posting]:
+        """
+        Scrape all companies and return list of internships.
+        For streaming, iterate the generators from sites() instead (see pipeline.py).
+        mode is 'concurrent' (all sites in parallel), 'serial' (one after another)
+        or 'processes' (sharded across the constructor's `processes` worker
+        processes, default one per core); only 'processes' uses workers.
+        Politeness is enforced per host by the rate limiter in every mode.
+        """
+        processes = (self.processes or os.cpu_count() or 1) if mode == 'processes' else 0
+        scrapers = self.sites(processes)
+        
+        if mode == 'serial':
+            results = [self._collect(name, scraper) for name, scraper in scrapers.items()]
+        elif mode in ('concurrent', 'processes'):
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(self._collect, scrapers.keys(), scrapers.values()))
+        else:
+            raise ValueError(f"Unknown scrape mode: {mode}")
         
-        scrapers = [
-            self.scrape_nvidia,
-            self.scrape_amd,
-            self.scrape_google,
-            self.scrape_rbc,
-            self.scrape_td,
-            self.scrape_bmo,
-            self.scrape_scotiabank,
-            self.scrape_cibc
-        ]
+        # Flatten in site order so output is stable across modes
+        all_internships = []
+        for internships in results:
+            all_internships.extend(internships)
         
-        for scraper in scrapers:
-            try:
-                internships = scraper()
-                all_internships.extend(internships)
-                time.sleep(2)  # Be polite, avoid rate limiting
-            except Exception as e:
-                print(f"Error in {scraper.__name__}: {e}")
+        if self.metrics is not None:
+            for name in self.site_names or site_registry.site_names():
+                self.metrics.finish_site(name)
         
         return all_internships
     
-    def scrape_nvidia(self) -> List[Dict]:
-        """Scrape Nvidia careers page"""
+    def _collect(self, name: str, scraper: Callable[[], Iterator[Posting]]) -> List[Posting]:
+        """A site's postings up to any error, which is printed and recorded"""
         internships = []
         try:
-            # Nvidia uses a careers API
-            url = "https://nvidia.wd5.myworkdayjobs.com/wday/cxs/nvidia/NVIDIAExternalCareerSite/jobs"
-            payload = {
-                "appliedFacets": {"locationCountry": ["bc33aa3152ec42d4995f4791a106ed09"]},
-                "searchText": "intern"
-            }
-            response = requests.post(url, json=payload, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                for job in data.get('jobPostings', [])[:20]:  # Limit to 20 results
-                    internships.append({
-                        'company': 'Nvidia',
-                        'title': job.get('title', 'N/A'),
-                        'location': job.get('locationsText', 'N/A'),
-                        'url': f"https://nvidia.wd5.myworkdayjobs.com/en-US/NVIDIAExternalCareerSite{job.get('externalPath', '')}"
-                    })
+            internships.extend(scraper())
         except Exception as e:
-            print(f"Nvidia scraping error: {e}")
-        
+            print(f"Error in {name} scraper: {e}")
+            if self.metrics is not None:
+                self.metrics.record_error(name, e)
         return internships
     
-    def scrape_amd(self) -> List[Dict]:
-        """Scrape AMD careers page"""
-        internships = []
-        try:
-            url = "https://careers.amd.com/careers-home/jobs?tags3=Intern%2FCo-op"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # AMD's structure varies, this is a generic approach
-            job_cards = soup.find_all('a', class_='jobs-list-item')[:20]
-            
-            for card in job_cards:
-                title = card.find('h3')
-                location = card.find('span', class_='location')
-                
-                if title:
-                    internships.append({
-                        'company': 'AMD',
-                        'title': title.get_text(strip=True),
-                        'location': location.get_text(strip=True) if location else 'N/A',
-                        'url': 'https://careers.amd.com' + card.get('href', '')
-                    })
-        except Exception as e:
-            print(f"AMD scraping error: {e}")
-        
-        return internships
+    def _shard_pools(self, processes: int) -> List[ProcessPoolExecutor]:
+        """
+        `processes` single-process pools, one per shard, started on first use
+        with a snapshot of the registry
+        """
+        with self._shards_lock:
+            if processes not in self._shards:
+                settings = {'parser': self.parser, 'parser_overrides': self.parser_overrides,
+                            'scoped_parsing': self.scoped_parsing}
+                # spawn, not fork: the parent has pipeline and HTTP threads running
+                context = multiprocessing.get_context('spawn')
+                self._shards[processes] = [
+                    ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=_init_worker,
+                                        initargs=(settings, dict(site_registry.SITES), self.http_factory))
+                    for _ in range(processes)
+                ]
+            return self._shards[processes]
     
-    def scrape_google(self) -> List[Dict]:
-        """Scrape Google careers page"""
-        internships = []
-        try:
-            # Google's careers are on a dynamic site, this is a simplified version
-            url = "https://www.google.com/about/careers/applications/jobs/results/?q=intern"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            # Note: Google's site is heavily JS-based, may need Selenium for full functionality
-            # This is a placeholder structure
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Generic extraction - may need adjustment based on actual structure
-            job_elements = soup.find_all('div', class_='gc-card')[:20]
-            
-            for job in job_elements:
-                title_elem = job.find('h2')
-                location_elem = job.find('span', class_='gc-job-tags__location')
-                link_elem = job.find('a')
-                
-                if title_elem:
-                    internships.append({
-                        'company': 'Google',
-                        'title': title_elem.get_text(strip=True),
-                        'location': location_elem.get_text(strip=True) if location_elem else 'N/A',
-                        'url': 'https://www.google.com' + link_elem.get('href', '') if link_elem else url
-                    })
-        except Exception as e:
-            print(f"Google scraping error: {e}")
-        
-        return internships
+    def _scrape_in_process(self, name: str, processes: int) -> Iterator[Posting]:
+        """
+        Scrape one site in a worker process and yield its postings here.
+        Sites are sharded by host, so each host is only ever fetched from one
+        process and its rate limit holds. Workers send back the postings and
+        their metrics, which are merged into this site's record. An error
+        in the worker is raised here after its postings have been yielded.
+        """
+        shards = self._shard_pools(processes)
+        shard = shards[zlib.crc32(_site_host(site_registry.get_site(name)).encode('utf-8')) % len(shards)]
+        with self.metrics.site(name) if self.metrics is not None else nullcontext() as record:
+            rows, stats, error = shard.submit(_scrape_compact, name, current_deadline()).result()
+            if record is not None:
+                record.merge(*stats)
+                record.items += len(rows)
+            yield from rows
+            if error is not None:
+                raise error
     
-    def scrape_rbc(self) -> List[Dict]:
-        """Scrape RBC careers page"""
-        internships = []
-        try:
-            url = "https://jobs.rbc.com/ca/en/search-results?keywords=intern"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_items = soup.find_all('li', class_='jobs-list-item')[:20]
-            
-            for item in job_items:
-                title_elem = item.find('a', class_='job-title')
-                location_elem = item.find('span', class_='job-location')
-                
-                if title_elem:
-                    internships.append({
-                        'company': 'RBC',
-                        'title': title_elem.get_text(strip=True),
-                        'location': location_elem.get_text(strip=True) if location_elem else 'N/A',
-                        'url': 'https://jobs.rbc.com' + title_elem.get('href', '')
-                    })
-        except Exception as e:
-            print(f"RBC scraping error: {e}")
-        
-        return internships
+    def close(self):
+        """Shut down worker processes, if any were started"""
+        with self._shards_lock:
+            for pools in self._shards.values():
+                for pool in pools:
+                    pool.shutdown()
+            self._shards = {}
     
-    def scrape_td(self) -> List[Dict]:
-        """Scrape TD Bank careers page"""
-        internships = []
-        try:
-            url = "https://jobs.td.com/en-CA/search/?searchby=keyword&createNewAlert=false&q=intern"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_results = soup.find_all('tr', class_='data-row')[:20]
-            
-            for job in job_results:
-                title_elem = job.find('a', class_='jobTitle-link')
-                location_elem = job.find('span', class_='jobLocation')
-                
-                if title_elem:
-                    internships.append({
-                        'company': 'TD Bank',
-                        'title': title_elem.get_text(strip=True),
-                        'location': location_elem.get_text(strip=True) if location_elem else 'N/A',
-                        'url': 'https://jobs.td.com' + title_elem.get('href', '')
-                    })
-        except Exception as e:
-            print(f"TD scraping error: {e}")
-        
-        return internships
+    def scrape_site(self, name: str) -> Iterator[Posting]:
+        """
+        Scrape one registered site, yielding postings as they are parsed.
+        Errors are raised after whatever was yielded, so callers can tell a
+        partial scrape from a complete one.
+        """
+        config = site_registry.get_site(name)
+        extract = {
+            'html': self._scrape_html,
+            'workday': self._scrape_workday,
+            'browser': self._scrape_browser,
+            'custom': self._scrape_custom,
+        }[config['type']]
+        with self.metrics.site(name) if self.metrics is not None else nullcontext() as record:
+            for internship in extract(config):
+                if record is not None:
+                    record.items += 1
+                yield internship
     
-    def scrape_bmo(self) -> List[Dict]:
-        """Scrape BMO careers page"""
-        internships = []
-        try:
-            url = "https://jobs.bmo.com/ca/en/search-results?keywords=intern"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_cards = soup.find_all('li', class_='jobs-list-item')[:20]
-            
-            for card in job_cards:
-                title_elem = card.find('a')
-                location_elem = card.find('span', class_='job-location')
-                
-                if title_elem:
-                    internships.append({
-                        'company': 'BMO',
-                        'title': title_elem.get_text(strip=True),
-                        'location': location_elem.get_text(strip=True) if location_elem else 'N/A',
-                        'url': 'https://jobs.bmo.com' + title_elem.get('href', '')
-                    })
-        except Exception as e:
-            print(f"BMO scraping error: {e}")
+    def _scrape_workday(self, config: Dict) -> Iterator[Posting]:
+        workday = importlib.import_module('workday')
+        client = workday.WorkdayClient(self.http, config['host'], config['tenant'], config['site'])
+        yield from client.iter_internships(
+            config['company'],
+            search_text=config.get('search_text', ''),
+            applied_facets=config.get('applied_facets'),
+            max_results=config.get('max_results')
+        )
+    
+    def _scrape_custom(self, config: Dict) -> Iterator[Posting]:
+        module_name, _, function_name = config['handler'].partition(':')
+        handler = getattr(importlib.import_module(module_name), function_name)
+        # Handlers may still yield plain dicts
+        for internship in handler(self, config):
+            yield as_posting(internship)
+    
+    def _scrape_html(self, config: Dict) -> Iterator[Posting]:
+        pagination = config.get('pagination')
+        if not pagination:
+            yield from self._scrape_html_page(config, config['url'])
+            return
         
-        return internships
+        for page in range(pagination.get('max_pages', 10)):
+            url = _with_query_param(config['url'], pagination['param'],
+                                    page * pagination['page_size'])
+            found = 0
+            for internship in self._scrape_html_page(config, url):
+                found += 1
+                yield internship
+            if not found:
+                break
     
-    def scrape_scotiabank(self) -> List[Dict]:
-        """Scrape Scotiabank careers page"""
+    def _scrape_html_page(self, config: Dict, url: str) -> Iterator[Posting]:
+        """Fetch one page and extract postings, reusing last run's if the page is unchanged"""
+        if config.get('method', 'GET').upper() == 'POST':
+            response = self._post(url, json=config.get('payload'))
+        else:
+            response = self._get(url)
+        # An error page has no postings; fail loudly instead of yielding none (see health.py)
+        response.raise_for_status()
+        extractor = self._extractor(config)
+        cached = self.http.cached_postings(response, extractor)
+        if cached is not None:
+            yield from cached
+            return
+        
         internships = []
+        for internship in self._extract_items(config, response.content, url):
+            internships.append(internship)
+            yield internship
+        self.http.remember_postings(response, internships, extractor)
+    
+    def _extract_items(self, config: Dict, content: bytes, url: str) -> Iterator[Posting]:
+        """Postings from the `item` elements of an html or browser adapter's page"""
+        for item in self._select(config['company'], content, config['item'], limit=config.get('limit')):
+            values = {name: _extract_field(item, selector) for name, selector in config['fields'].items()}
+            internship = _posting(config, values, url)
+            if internship is not None:
+                yield internship
+    
+    def _scrape_browser(self, config: Dict) -> Iterator[Posting]:
+        """
+        Render a JS-built page in the browser pool and read postings from the
+        captured JSON (`xhr`) or the rendered DOM. A render less than
+        `render_ttl` seconds old (default RENDER_TTL) is reused without a
+        browser; a render whose captured JSON is byte-for-byte the last one's
+        reuses that render's postings instead of extracting them again.
+        Without a pool, or if no browser can start, this is a plain html
+        adapter.
+        """
+        if self.renderer is None:
+            yield from self._scrape_html(config)
+            return
+        url = config['url']
+        extractor = self._extractor(config)
+        cached = self.http.fresh_render(url, config.get('render_ttl', RENDER_TTL), extractor)
+        if cached is not None:
+            yield from cached
+            return
+        
+        xhr = config.get('xhr')
         try:
-            url = "https://jobs.scotiabank.com/search/?q=intern"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            job_rows = soup.find_all('tr', class_='data-row')[:20]
-            
-            for row in job_rows:
-                title_elem = row.find('a', class_='jobTitle')
-                location_elem = row.find('span', class_='jobLocation')
-                
-                if title_elem:
-                    internships.append({
-                        'company': 'Scotiabank',
-                        'title': title_elem.get_text(strip=True),
-                        'location': location_elem.get_text(strip=True) if location_elem else 'N/A',
-                        'url': 'https://jobs.scotiabank.com' + title_elem.get('href', '')
-                    })
-        except Exception as e:
-            print(f"Scotiabank scraping error: {e}")
+            page = self.renderer.render(url, wait_for=config['item'], capture=xhr and xhr['match'])
+        except RendererUnavailable as e:
+            print(f"{config['company']}: {e}; using the static page")
+            yield from self._scrape_html(config)
+            return
         
-        return internships
-    
-    def scrape_cibc(self) -> List[Dict]:
-        """Scrape CIBC careers page"""
-        internships = []
+        # Compare what the listings were read from, not the static HTML shell,
+        # which stays the same while the data behind it changes. Rendered DOM
+        # has to be parsed to find the items anyway, so it is not compared.
+        digest = None
+        if xhr and page.captured:
+            digest = hashlib.sha256(b'\0'.join(sorted(body for _, body in page.captured))).hexdigest()
+        internships = self.http.rendered_postings(url, digest, extractor) if digest else None
+        if internships is None:
+            internships = []
+            if xhr:
+                with timed_parse():
+                    for _, body in page.captured:
+                        internships.extend(_extract_json(config, body, url))
+            if not internships:
+                internships = list(self._extract_items(config, page.html, url))
+            if config.get('limit'):
+                internships = internships[:config['limit']]
+        self.http.remember_render(url, digest, internships, extractor)
+        yield from internships
+
+
+# The scraper inside each worker process (see InternshipScraper._scrape_in_process)
+_worker_scraper: Optional[InternshipScraper] = None
+
+
+def _init_worker(settings: Dict, configs: Dict[str, Dict], http_factory: Optional[Callable[[], HttpClient]]):
+    global _worker_scraper
+    for name, config in configs.items():
+        site_registry.register_site(name, config)
+    http = http_factory() if http_factory is not None else None
+    _worker_scraper = InternshipScraper(http_client=http, metrics=ScrapeMetrics(), **settings)
+
+
+def _scrape_compact(name: str, at: Optional[float] = None) -> Tuple[List[Posting], Tuple, Optional[Exception]]:
+    """
+    Scrape `name` in this worker, by the parent's deadline `at` (monotonic
+    clocks are shared between processes). Postings pickle as tuples, far
+    smaller than dicts: no repeated keys, and pickle writes each interned
+    company and location string once. An error ends the scrape and is
+    returned with the postings found before it, for the parent to raise.
+    """
+    rows, error = [], None
+    with deadline(at):
         try:
-            url = "https://cibc.wd3.myworkdayjobs.com/campus"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # CIBC uses Workday, may need API approach similar to Nvidia
-            job_links = soup.find_all('a', href=True)[:20]
-            
-            for link in job_links:
-                if 'job' in link.get('href', '').lower():
-                    title_text = link.get_text(strip=True)
-                    if title_text and len(title_text) > 5:
-                        internships.append({
-                            'company': 'CIBC',
-                            'title': title_text,
-                            'location': 'Various',
-                            'url': 'https://cibc.wd3.myworkdayjobs.com' + link.get('href', '')
-                        })
+            rows.extend(_worker_scraper.scrape_site(name))
         except Exception as e:
-            print(f"CIBC scraping error: {e}")
-        
-        return internships
+            error = e
+    record = _worker_scraper.metrics.finish_site(name)
+    stats = (record.fetch_seconds, record.parse_seconds, record.requests, record.unchanged,
+             record.bytes_received, record.errors)
+    return rows, stats, error
+
+
+def _site_host(config: Dict) -> str:
+    """The host a site adapter fetches from, for sharding"""
+    if config['type'] == 'workday':
+        return config['host']
+    if 'url' in config:
+        return urlsplit(config['url']).netloc.lower()
+    return config.get('handler', '')
+
+
+def _posting(config: Dict, values: Dict[str, str], url: str) -> Optional[Posting]:
+    """A posting from extracted field values, or None without a title"""
+    if not values.get('title'):
+        return None
+    defaults = {'location': 'N/A'}
+    defaults.update(config.get('defaults', {}))
+    base_url = config.get('base_url', url)
+    return Posting.create(
+        config['company'],
+        values['title'],
+        values.get('location') or defaults['location'],
+        urljoin(base_url, values['url']) if values.get('url') else defaults.get('url', url),
+    )
+
+
+def _json_path(value, path: str):
+    """Follow a dotted path ('jobs', 'locations.0.display') into decoded JSON; None if absent"""
+    for key in path.split('.') if path else ():
+        if isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        elif isinstance(value, dict):
+            value = value.get(key)
+        else:
+            return None
+    return value
+
+
+def _extract_json(config: Dict, body: bytes, url: str) -> Iterator[Posting]:
+    """Postings from a captured JSON response, per the adapter's `xhr` items path and fields"""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return
+    xhr = config['xhr']
+    items = _json_path(data, xhr.get('items', ''))
+    for item in items if isinstance(items, list) else ():
+        values = {name: _json_path(item, path) for name, path in xhr['fields'].items()}
+        internship = _posting(config, {k: str(v).strip() for k, v in values.items() if v}, url)
+        if internship is not None:
+            yield internship
+
+
+def _extract_field(item: Node, selector: str) -> str:
+    """Apply a field selector ('tag.class', 'tag.class@attr' or '@attr') to a job item"""
+    element_selector, _, attr = selector.partition('@')
+    element = item.find(element_selector) if element_selector else item
+    if element is None:
+        return ''
+    return element.get(attr, '') if attr else element.text()
+
+
+def _with_query_param(url: str, name: str, value) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != name]
+    query.append((name, str(value)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Full-text search over every posting ever scraped.
+
+Queries run against the internships_fts index (migration 6 in database.py)
+and are ranked by bm25, with title matches weighted above company and
+location. Results come back a page at a time. Each page carries an opaque
+cursor holding the sort key of its last row, and the next page starts
+strictly after that key. No OFFSET is used, so deep pages cost no more than
+the first.
+
+Sort orders:
+
+    rank    best bm25 match first (needs a query). bm25 has to score every
+            candidate, so by default only the newest `rank_window` matches
+            are ranked; that keeps broad queries ("intern") to a few
+            milliseconds on millions of rows. Pages from such a search
+            have `truncated` set, and paging through them ends after those
+            matches; rank_window=None ranks all.
+    recent  newest posting first; with a query this walks the index
+            backwards by rowid and stops after one page, so it stays fast
+            even when the query matches most of the table
+
+Usage:
+    python search.py "software intern" --company RBC --location toronto
+    python search.py data --first-seen-from 2025-09-01 --open --sort recent
+    python search.py "machine learning" --cursor <cursor from the previous page>
+"""
+
+import argparse
+import base64
+import json
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from database import InternshipDB
+
+_WORD = re.compile(r'\w+\*?')
+# Newest matches ranked by default with sort='rank'
+RANK_WINDOW = 2000
+
+
+@dataclass
+class SearchResult:
+    id: int
+    company: str
+    title: str
+    location: Optional[str]
+    url: str
+    first_seen: str
+    last_seen: str
+    closed_on: Optional[str]
+    score: Optional[float] = None
+
+
+@dataclass
+class SearchPage:
+    results: List[SearchResult]
+    cursor: Optional[str]  # pass back for the next page; None on the last page
+    truncated: bool = False  # more matches than rank_window; only the newest were ranked
+
+
+def match_expression(query: str, location: Optional[str] = None) -> str:
+    """
+    FTS5 MATCH expression for free text: every word must match, 'word*' is a
+    prefix search. Words are quoted, so FTS5 operators in the input are inert.
+    """
+    terms = []
+    for word in _WORD.findall(query or ''):
+        prefix = word.endswith('*')
+        word = word.rstrip('*')
+        terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    if location:
+        phrase = ' '.join(_WORD.findall(location.replace('*', '')))
+        if phrase:
+            terms.append(f'location : "{phrase}"')
+    return ' '.join(terms)
+
+
+def _encode_cursor(key: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}") from None
+
+
+class InternshipSearch:
+    """Query API over the internships_fts index"""
+
+    def __init__(self, db: InternshipDB):
+        self.db = db
+
+    def search(self, query: str = '', company: Optional[str] = None, location: Optional[str] = None,
+               first_seen_from: Optional[str] = None, first_seen_to: Optional[str] = None,
+               last_seen_from: Optional[str] = None, last_seen_to: Optional[str] = None,
+               open_only: bool = False, sort: str = 'rank', limit: int = 20,
+               cursor: Optional[str] = None, rank_window: Optional[int] = RANK_WINDOW) -> SearchPage:
+        """
+        One page of postings matching `query`, filtered by company (exact,
+        case-insensitive), location words and inclusive ISO date ranges.
+        """
+        if sort not in ('rank', 'recent'):
+            raise ValueError(f"Unknown sort: {sort}")
+        expression = match_expression(query, location)
+        if not expression and sort == 'rank':
+            sort = 'recent'  # nothing to rank by
+
+        where, params = [], []
+        truncated = False
+        if expression:
+            where.append('internships_fts MATCH ?')
+            params.append(expression)
+        for clause, value in (('i.company = ? COLLATE NOCASE', company),
+                              ('i.first_seen >= ?', first_seen_from),
+                              ('i.first_seen <= ?', first_seen_to),
+                              ('i.last_seen >= ?', last_seen_from),
+                              ('i.last_seen <= ?', last_seen_to)):
+            if value:
+                where.append(clause)
+                params.append(value)
+        if open_only:
+            where.append('i.closed_on IS NULL')
+
+        if expression:
+            source = 'internships_fts JOIN internships i ON i.id = internships_fts.rowid'
+        else:
+            source = 'internships i'
+        if sort == 'rank':
+            score, order = 'internships_fts.rank', 'internships_fts.rank, i.id'
+            after = []
+            if cursor:
+                last_score, last_id = _decode_cursor(cursor)
+                after = [last_score, last_score, last_id]
+            if rank_window:
+                # Same walk as the window below, one row further and without
+                # bm25: are there matches the window leaves out?
+                truncated = self.db._connection().execute(f'''
+                    SELECT COUNT(*) FROM (
+                        SELECT 1 FROM {source}
+                        WHERE {' AND '.join(where)}
+                        ORDER BY internships_fts.rowid DESC
+                        LIMIT {int(rank_window) + 1}
+                    )
+                ''', params).fetchone()[0] > rank_window
+                # Filter and take the newest matches by rowid, then rank just those
+                source = f'''(
+                    SELECT internships_fts.rowid AS id, internships_fts.rank AS rank
+                    FROM {source}
+                    WHERE {' AND '.join(where)}
+                    ORDER BY internships_fts.rowid DESC
+                    LIMIT {int(rank_window)}
+                ) w JOIN internships i ON i.id = w.id'''
+                score, order, where = 'w.rank', 'w.rank, i.id', []
+            if after:
+                where.append(f'({score} > ? OR ({score} = ? AND i.id > ?))')
+                params.extend(after)
+        else:
+            # Ordering on the FTS rowid lets FTS5 walk its doclists newest-first
+            # and stop at LIMIT instead of collecting every match
+            key = 'internships_fts.rowid' if expression else 'i.id'
+            score, order = 'NULL', f'{key} DESC'
+            if cursor:
+                where.append(f'{key} < ?')
+                params.append(_decode_cursor(cursor)[1])
+
+        sql = f'''
+            SELECT i.id, i.company, i.title, i.location, i.url, i.first_seen, i.last_seen,
+                   i.closed_on, {score}
+            FROM {source}
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY {order}
+            LIMIT ?
+        '''
+        rows = self.db._connection().execute(sql, params + [limit + 1]).fetchall()
+
+        results = [SearchResult(*row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = results[-1]
+            next_cursor = _encode_cursor([last.score, last.id])
+        return SearchPage(results, next_cursor, truncated)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search every internship posting seen so far')
+    parser.add_argument('query', nargs='?', default='', help="words to match; 'word*' for a prefix")
+    parser.add_argument('--company', help='exact company name')
+    parser.add_argument('--location', help='words that must appear in the location')
+    parser.add_argument('--first-seen-from', metavar='YYYY-MM-DD')
+    parser.add_argument('--first-seen-to', metavar='YYYY-MM-DD')
+    parser.add_argument('--last-seen-from', metavar='YYYY-MM-DD')
+    parser.add_argument('--last-seen-to', metavar='YYYY-MM-DD')
+    parser.add_argument('--open', action='store_true', help='only postings still listed')
+    parser.add_argument('--sort', choices=('rank', 'recent'), default='rank')
+    parser.add_argument('--exact-rank', action='store_true',
+                        help=f'rank every match, not just the newest {RANK_WINDOW} (slower for broad queries)')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--cursor', help='continue from a previous page')
+    parser.add_argument('--db', default='internships.db')
+    args = parser.parse_args()
+
+    page = InternshipSearch(InternshipDB(args.db)).search(
+        args.query, company=args.company, location=args.location,
+        first_seen_from=args.first_seen_from, first_seen_to=args.first_seen_to,
+        last_seen_from=args.last_seen_from, last_seen_to=args.last_seen_to,
+        open_only=args.open, sort=args.sort, limit=args.limit, cursor=args.cursor,
+        rank_window=None if args.exact_rank else RANK_WINDOW,
+    )
+    for result in page.results:
+        status = f"closed {result.closed_on}" if result.closed_on else "open"
+        print(f"{result.company}: {result.title} ({result.location or ''})")
+        print(f"    {result.url}")
+        print(f"    first seen {result.first_seen}, last seen {result.last_seen}, {status}")
+    if not page.results:
+        print("No matching postings")
+    if page.cursor:
+        print(f"\nMore results: --cursor {page.cursor}")
+    if page.truncated:
+        print(f"\nOnly the newest {RANK_WINDOW} matches were ranked; --exact-rank ranks them all")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Site adapter registry.
+
+Each career site is plain configuration, run by the generic extraction
+engine in InternshipScraper.scrape_site(). Adding a company means adding an
+entry here (or to a JSON file passed to load_sites()), not writing code.
+
+Adapter types:
+
+    html     - fetch `url` (GET, or POST with `payload`), select `item`
+               elements and pull `fields` out of each one
+    workday  - page through a Workday tenant's jobs API (see workday.py)
+    browser  - an html adapter whose page is rendered in a headless browser
+               (see renderer.py); optional `xhr` reads postings from a JSON
+               response captured during rendering instead of the DOM:
+               {'match': URL substring, 'items': dotted path to the list,
+               'fields': {'title': dotted path, ...}}. `render_ttl` is how
+               many seconds a render's postings are reused before the page
+               is rendered again (default scrapers.RENDER_TTL). Falls back to
+               the static page when no browser is available.
+    custom   - call `handler`, a 'module:function' path imported on first
+               use, as handler(scraper, config) -> iterator of postings
+               (posting.Posting records, or dicts with the same keys)
+
+Field selectors for html adapters:
+
+    'h3'                text of the first matching element in the item
+    'a.job-title@href'  attribute of the first matching element
+    '@href'             attribute of the item element itself
+
+`url` values are resolved against `base_url`. `defaults` gives a field's
+value when its selector finds nothing; a posting without a title is skipped.
+Optional `pagination` ({'param', 'page_size', 'max_pages'}) requests further
+pages by offset until one comes back empty.
+"""
+
+import json
+from typing import Dict, List
+
+SITES: Dict[str, Dict] = {
+    'nvidia': {
+        'company': 'Nvidia',
+        'type': 'workday',
+        'host': 'nvidia.wd5.myworkdayjobs.com',
+        'tenant': 'nvidia',
+        'site': 'NVIDIAExternalCareerSite',
+        'search_text': 'intern',
+        'applied_facets': {'locationCountry': ['bc33aa3152ec42d4995f4791a106ed09']},
+    },
+    'amd': {
+        'company': 'AMD',
+        'type': 'html',
+        'url': 'https://careers.amd.com/careers-home/jobs?tags3=Intern%2FCo-op',
+        'item': 'a.jobs-list-item',
+        'limit': 20,
+        'fields': {'title': 'h3', 'location': 'span.location', 'url': '@href'},
+        'base_url': 'https://careers.amd.com',
+    },
+    'google': {
+        # Listings are built by JavaScript; the static HTML rarely contains them.
+        # Read from the rendered DOM on purpose: the results page fills itself
+        # from data embedded in the page and Google's internal RPCs, with no
+        # stable JSON jobs call to point an `xhr` capture at.
+        'company': 'Google',
+        'type': 'browser',
+        'url': 'https://www.google.com/about/careers/applications/jobs/results/?q=intern',
+        'item': 'div.gc-card',
+        'limit': 20,
+        'fields': {'title': 'h2', 'location': 'span.gc-job-tags__location', 'url': 'a@href'},
+        'base_url': 'https://www.google.com',
+        'defaults': {'url': 'https://www.google.com/about/careers/applications/jobs/results/?q=intern'},
+    },
+    'rbc': {
+        'company': 'RBC',
+        'type': 'html',
+        'url': 'https://jobs.rbc.com/ca/en/search-results?keywords=intern',
+        'item': 'li.jobs-list-item',
+        'limit': 20,
+        'fields': {'title': 'a.job-title', 'location': 'span.job-location', 'url': 'a.job-title@href'},
+        'base_url': 'https://jobs.rbc.com',
+    },
+    'td': {
+        'company': 'TD Bank',
+        'type': 'html',
+        'url': 'https://jobs.td.com/en-CA/search/?searchby=keyword&createNewAlert=false&q=intern',
+        'item': 'tr.data-row',
+        'limit': 20,
+        'fields': {'title': 'a.jobTitle-link', 'location': 'span.jobLocation', 'url': 'a.jobTitle-link@href'},
+        'base_url': 'https://jobs.td.com',
+    },
+    'bmo': {
+        'company': 'BMO',
+        'type': 'html',
+        'url': 'https://jobs.bmo.com/ca/en/search-results?keywords=intern',
+        'item': 'li.jobs-list-item',
+        'limit': 20,
+        'fields': {'title': 'a', 'location': 'span.job-location', 'url': 'a@href'},
+        'base_url': 'https://jobs.bmo.com',
+    },
+    'scotiabank': {
+        'company': 'Scotiabank',
+        'type': 'html',
+        'url': 'https://jobs.scotiabank.com/search/?q=intern',
+        'item': 'tr.data-row',
+        'limit': 20,
+        'fields': {'title': 'a.jobTitle', 'location': 'span.jobLocation', 'url': 'a.jobTitle@href'},
+        'base_url': 'https://jobs.scotiabank.com',
+    },
+    'cibc': {
+        'company': 'CIBC',
+        'type': 'workday',
+        'host': 'cibc.wd3.myworkdayjobs.com',
+        'tenant': 'cibc',
+        'site': 'campus',
+    },
+}
+
+_REQUIRED = {
+    'html': ('company', 'url', 'item', 'fields'),
+    'browser': ('company', 'url', 'item', 'fields'),
+    'workday': ('company', 'host', 'tenant', 'site'),
+    'custom': ('company', 'handler'),
+}
+
+
+def register_site(name: str, config: Dict):
+    """Add or replace a site adapter, validating its required keys"""
+    site_type = config.get('type')
+    if site_type not in _REQUIRED:
+        raise ValueError(f"Site {name}: unknown type {site_type!r}")
+    missing = [key for key in _REQUIRED[site_type] if key not in config]
+    if missing:
+        raise ValueError(f"Site {name}: missing {', '.join(missing)}")
+    SITES[name] = config
+
+
+def load_sites(path: str):
+    """Register every adapter in a JSON file of {name: config}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for name, config in json.load(f).items():
+            register_site(name, config)
+
+
+def site_names() -> List[str]:
+    return list(SITES)
+
+
+def get_site(name: str) -> Dict:
+    try:
+        return SITES[name]
+    except KeyError:
+        raise ValueError(f"Unknown site: {name}") from None
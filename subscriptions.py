@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Digest subscribers and per-subscriber filtering.
+
+Each subscriber can narrow their digest by company, title keywords and
+location, and exclude postings mentioning given terms. Matching is done
+against a PostingIndex, an inverted index from company, location token and
+title token to posting ids, so a subscriber's matches come from a few set
+intersections rather than a scan over every posting.
+
+Keywords, locations and exclusions match whole words, case-insensitively;
+a multi-word term ("data science") needs every word present.
+
+Usage:
+    python subscriptions.py add you@example.com --companies RBC,TD --keywords software,data
+    python subscriptions.py remove you@example.com
+    python subscriptions.py list
+"""
+
+import argparse
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from database import InternshipDB
+from posting import Posting
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall((text or '').lower())
+
+
+@dataclass
+class Subscriber:
+    email: str
+    companies: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    locations: List[str] = field(default_factory=list)
+    excluded: List[str] = field(default_factory=list)
+
+
+class SubscriptionStore:
+    """Subscribers stored in the internships database"""
+
+    def __init__(self, db: InternshipDB):
+        self.db = db
+
+    def save(self, subscriber: Subscriber):
+        """Add a subscriber, or replace their filters if they already exist"""
+        self.db._connection().execute('''
+            INSERT INTO subscribers (email, companies, keywords, locations, excluded, active, created_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT(email) DO UPDATE SET
+                companies = excluded.companies,
+                keywords = excluded.keywords,
+                locations = excluded.locations,
+                excluded = excluded.excluded,
+                active = 1
+        ''', (subscriber.email, json.dumps(subscriber.companies), json.dumps(subscriber.keywords),
+              json.dumps(subscriber.locations), json.dumps(subscriber.excluded),
+              datetime.now().isoformat(timespec='seconds')))
+
+    def save_many(self, subscribers: Iterable[Subscriber]):
+        conn = self.db._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for subscriber in subscribers:
+                self.save(subscriber)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def remove(self, email: str):
+        """Unsubscribe; the row is kept but no longer receives digests"""
+        self.db._connection().execute('UPDATE subscribers SET active = 0 WHERE email = ?', (email,))
+
+    def active(self) -> List[Subscriber]:
+        rows = self.db._connection().execute('''
+            SELECT email, companies, keywords, locations, excluded
+            FROM subscribers WHERE active = 1 ORDER BY email
+        ''').fetchall()
+        return [
+            Subscriber(email=row[0], companies=json.loads(row[1]), keywords=json.loads(row[2]),
+                       locations=json.loads(row[3]), excluded=json.loads(row[4]))
+            for row in rows
+        ]
+
+
+class PostingIndex:
+    """Inverted index over a batch of postings, keyed by company, location token and title token"""
+
+    def __init__(self, internships: List[Posting]):
+        self.internships = internships
+        self.all_ids: Set[int] = set(range(len(internships)))
+        self.by_company: Dict[str, Set[int]] = {}
+        self.by_location: Dict[str, Set[int]] = {}
+        self.by_title: Dict[str, Set[int]] = {}
+        for posting_id, internship in enumerate(internships):
+            self.by_company.setdefault(internship.company.lower(), set()).add(posting_id)
+            for token in tokenize(internship.location):
+                self.by_location.setdefault(token, set()).add(posting_id)
+            for token in tokenize(internship.title):
+                self.by_title.setdefault(token, set()).add(posting_id)
+
+    @staticmethod
+    def _term_ids(index: Dict[str, Set[int]], term: str) -> Set[int]:
+        """Postings containing every word of `term`"""
+        tokens = tokenize(term)
+        if not tokens:
+            return set()
+        postings = [index.get(token, set()) for token in tokens]
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+        return result
+
+    def _any_term(self, index: Dict[str, Set[int]], terms: List[str]) -> Set[int]:
+        result: Set[int] = set()
+        for term in terms:
+            result |= self._term_ids(index, term)
+        return result
+
+    def match_ids(self, subscriber: Subscriber) -> Set[int]:
+        filters = []
+        if subscriber.companies:
+            ids: Set[int] = set()
+            for company in subscriber.companies:
+                ids |= self.by_company.get(company.lower(), set())
+            filters.append(ids)
+        if subscriber.keywords:
+            filters.append(self._any_term(self.by_title, subscriber.keywords))
+        if subscriber.locations:
+            filters.append(self._any_term(self.by_location, subscriber.locations))
+
+        if filters:
+            # Intersect smallest first so the working set only shrinks
+            filters.sort(key=len)
+            result = set(filters[0])
+            for ids in filters[1:]:
+                if not result:
+                    break
+                result &= ids
+        else:
+            result = set(self.all_ids)
+
+        if subscriber.excluded and result:
+            result -= self._any_term(self.by_title, subscriber.excluded)
+        return result
+
+    def match(self, subscriber: Subscriber) -> List[Posting]:
+        """The subscriber's postings, in their original order"""
+        return [self.internships[i] for i in sorted(self.match_ids(subscriber))]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage digest subscribers')
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help='add or update a subscriber')
+    add.add_argument('email')
+    add.add_argument('--companies', help='comma-separated company names')
+    add.add_argument('--keywords', help='comma-separated title keywords')
+    add.add_argument('--locations', help='comma-separated locations')
+    add.add_argument('--exclude', help='comma-separated terms to exclude')
+    remove = commands.add_parser('remove', help='unsubscribe')
+    remove.add_argument('email')
+    commands.add_parser('list', help='show active subscribers')
+    args = parser.parse_args()
+
+    store = SubscriptionStore(InternshipDB())
+    if args.command == 'add':
+        store.save(Subscriber(args.email, _split(args.companies), _split(args.keywords),
+                              _split(args.locations), _split(args.exclude)))
+        print(f"Subscribed {args.email}")
+    elif args.command == 'remove':
+        store.remove(args.email)
+        print(f"Unsubscribed {args.email}")
+    else:
+        for subscriber in store.active():
+            print(f"{subscriber.email}: companies={subscriber.companies} keywords={subscriber.keywords} "
+                  f"locations={subscriber.locations} excluded={subscriber.excluded}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database  # noqa: E402
+from database import InternshipDB  # noqa: E402
+from posting import Posting  # noqa: E402
+
+
+def database_at_version(path, version):
+    """A database file migrated only up to `version`"""
+    conn = sqlite3.connect(path, isolation_level=None)
+    for statements in database.MIGRATIONS[:version]:
+        for statement in statements:
+            statement(conn) if callable(statement) else conn.execute(statement)
+    conn.execute(f'PRAGMA user_version = {version}')
+    return conn
+
+
+def test_upgrade_canonicalizes_stored_urls(tmp_path):
+    path = str(tmp_path / 'internships.db')
+    conn = database_at_version(path, 8)
+    rows = [
+        ('TD', 'Analyst Intern', 'Toronto', 'https://jobs.td.com/job/123456/', '2025-01-05', '2025-02-01', None),
+        ('TD', 'Analyst Intern', 'Toronto', 'https://jobs.td.com/job/123456?utm_source=x', '2025-01-20',
+         '2025-03-01', None),
+        ('TD', 'Developer Intern', 'Toronto', 'https://jobs.td.com/job/777/', '2025-01-01', '2025-01-10',
+         '2025-01-11'),
+    ]
+    conn.executemany('INSERT INTO internships (company, title, location, url, first_seen, last_seen, closed_on) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+    conn.close()
+
+    db = InternshipDB(path)
+    stored = db._connection().execute(
+        'SELECT url, first_seen, last_seen, closed_on FROM internships ORDER BY url').fetchall()
+    assert stored == [
+        ('https://jobs.td.com/job/123456', '2025-01-05', '2025-03-01', None),
+        ('https://jobs.td.com/job/777', '2025-01-01', '2025-01-10', '2025-01-11'),
+    ]
+    # FTS stays in step with the merged rows
+    assert db._connection().execute(
+        "SELECT COUNT(*) FROM internships_fts WHERE internships_fts MATCH 'analyst'").fetchone()[0] == 1
+
+    run = db.start_run('TD')
+    new = run.add([Posting.create('TD', 'Analyst Intern', 'Toronto', 'https://jobs.td.com/job/123456')])
+    diff = run.finish()
+    assert new == [] and diff.closed == []
+
+
+def test_add_internships_tracks_changes_like_a_run(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    first = Posting.create('RBC', 'Analyst Intern', 'Toronto', 'https://jobs.rbc.com/job/1')
+    other = Posting.create('RBC', 'Developer Intern', 'Toronto', 'https://jobs.rbc.com/job/2')
+    assert db.add_internships([first, other, first]) == [first, other]
+    assert db.add_internship(*first) is False
+
+    run = db.start_run('RBC')
+    run.add([other])
+    assert run.finish().closed == [first]
+
+    # Seen again through the ingest API: reopened and updated, never closing the rest
+    renamed = first._replace(title='Senior Analyst Intern')
+    assert db.add_internships([renamed]) == []
+    conn = db._connection()
+    assert conn.execute('SELECT title, closed_on FROM internships WHERE url = ?',
+                        (first.url,)).fetchone() == ('Senior Analyst Intern', None)
+    assert conn.execute('SELECT COUNT(*) FROM internships WHERE closed_on IS NULL').fetchone()[0] == 2
+    assert [row[0] for row in conn.execute(
+        'SELECT change FROM posting_changes WHERE url = ? ORDER BY id', (first.url,))] == ['new', 'closed', 'reopened']
+
+    new, closed, _ = db.get_digest_changes()
+    assert {p.url for p in new} == {first.url, other.url}
+    assert closed == []
+
+
+def test_add_internships_spans_upsert_chunks(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    count = database.UPSERT_CHUNK_ROWS * 2 + 7
+    batch = [Posting.create('RBC' if i % 2 else 'TD', f'Intern {i}', 'Toronto', f'https://jobs.example.com/job/{i}')
+             for i in range(count)]
+    assert db.add_internships(batch[:10]) == batch[:10]
+    # Input order is kept across companies and chunks; only unseen URLs are new
+    assert db.add_internships(reversed(batch)) == list(reversed(batch[10:]))
+    assert db.add_internships(batch) == []
+    assert db._connection().execute('SELECT COUNT(*) FROM internships').fetchone()[0] == count
@@ -0,0 +1,65 @@
+import os
+import smtplib
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delivery import Outbox, SmtpDelivery  # noqa: E402
+
+
+class FakeServer:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def sendmail(self, sender, recipients, message):
+        self.sent.extend(recipients)
+
+    def quit(self):
+        pass
+
+
+def outbox_with(tmp_path, count):
+    outbox = Outbox(str(tmp_path / 'outbox.db'))
+    outbox.enqueue_many([('digest@example.com', f'user{i}@example.com', 'hello') for i in range(count)])
+    return outbox
+
+
+def test_login_failure_leaves_every_message_pending(tmp_path):
+    outbox = outbox_with(tmp_path, 20)
+    delivery = SmtpDelivery('smtp.example.com', 587, 'digest@example.com', 'wrong')
+    logins = []
+
+    def connect():
+        logins.append(1)
+        raise smtplib.SMTPAuthenticationError(535, b'bad credentials')
+
+    delivery._connect = connect
+    report = delivery.deliver(outbox)
+    assert len(logins) == 1
+    assert (report.sent, report.retried, report.failed, report.deferred) == (0, 0, 0, 20)
+    assert outbox.counts() == {'pending': 20}
+    assert all(message['attempts'] == 0 for message in outbox.due())
+
+    # Backing off: the next drain does not try to log in at all
+    report = delivery.deliver(outbox)
+    assert len(logins) == 1
+    assert report.deferred == 20
+
+
+def test_reconnect_failure_stops_the_drain(tmp_path):
+    outbox = outbox_with(tmp_path, 10)
+    delivery = SmtpDelivery('smtp.example.com', 587, connections=1, messages_per_connection=4)
+    sent = []
+    sessions = iter([FakeServer(sent)])
+
+    def connect():
+        try:
+            return next(sessions)
+        except StopIteration:
+            raise ConnectionRefusedError('connection refused') from None
+
+    delivery._connect = connect
+    report = delivery.deliver(outbox)
+    assert (report.sent, report.deferred, report.failed) == (4, 6, 0)
+    assert report.error
+    assert outbox.counts() == {'sent': 4, 'pending': 6}
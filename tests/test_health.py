@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import InternshipDB  # noqa: E402
+from health import HealthTracker  # noqa: E402
+
+HOUR = 3600
+FAILED = {'ConnectionError': 1}
+
+
+def tracker(tmp_path, **kwargs):
+    kwargs = dict({'failure_threshold': 3, 'base_backoff_hours': 1.0, 'max_backoff_hours': 4.0,
+                   'jitter': 0.0}, **kwargs)
+    return HealthTracker(InternshipDB(str(tmp_path / 'internships.db')), **kwargs)
+
+
+def test_circuit_opens_after_threshold_failures(tmp_path):
+    health = tracker(tmp_path)
+    for now in (0, 10):
+        assert health.observe('rbc', 0, FAILED, now=now).state == 'closed'
+    opened = health.observe('rbc', 0, FAILED, now=20)
+    assert (opened.state, opened.failures, opened.open_until) == ('open', 3, 20 + HOUR)
+    assert opened.last_error == 'ConnectionError'
+
+    assert not health.allow('rbc', now=20 + HOUR - 1)
+    assert health.get('rbc').state == 'open'
+
+
+def test_failed_trial_reopens_with_doubled_backoff_up_to_the_cap(tmp_path):
+    health = tracker(tmp_path)
+    now = 0
+    for _ in range(3):
+        health.observe('rbc', 0, FAILED, now=now)
+    backoffs = []
+    for _ in range(4):
+        now = health.get('rbc').open_until
+        assert health.allow('rbc', now=now)
+        assert health.get('rbc').state == 'half_open'
+        reopened = health.observe('rbc', 0, FAILED, now=now)
+        assert reopened.state == 'open'
+        backoffs.append((reopened.open_until - now) / HOUR)
+    assert backoffs == [2.0, 4.0, 4.0, 4.0]
+
+
+def test_successful_trial_closes_the_circuit(tmp_path):
+    health = tracker(tmp_path)
+    for now in range(3):
+        health.observe('rbc', 0, FAILED, now=now)
+    assert health.allow('rbc', now=2 + HOUR)
+    closed = health.observe('rbc', 12, {}, now=2 + HOUR)
+    assert (closed.state, closed.failures, closed.open_until) == ('closed', 0, None)
+    assert health.allow('rbc', now=2 + HOUR)
+
+
+def test_postings_despite_errors_do_not_count_as_failure(tmp_path):
+    health = tracker(tmp_path)
+    for now in range(5):
+        assert health.observe('rbc', 7, FAILED, now=now).state == 'closed'
+    assert health.get('rbc').failures == 0
+
+
+def test_empty_run_from_a_productive_site_is_an_anomaly(tmp_path):
+    health = tracker(tmp_path, smoothing=0.5)
+    health.observe('rbc', 20, {}, now=0)
+    health.observe('rbc', 10, {}, now=1)
+    assert health.get('rbc').typical_items == 15
+
+    flagged = health.observe('rbc', 0, {}, now=2)
+    assert flagged.anomaly and flagged.state == 'closed'
+    assert flagged.typical_items == 15  # an empty run does not drag the baseline down
+    assert not health.observe('rbc', 14, {}, now=3).anomaly
+
+
+def test_quiet_site_with_nothing_is_not_an_anomaly(tmp_path):
+    health = tracker(tmp_path, anomaly_min_items=5)
+    health.observe('tiny', 2, {}, now=0)
+    assert not health.observe('tiny', 0, {}, now=1).anomaly
+
+
+def test_state_survives_a_restart(tmp_path):
+    health = tracker(tmp_path)
+    for now in range(3):
+        health.observe('rbc', 0, FAILED, now=now)
+    restarted = tracker(tmp_path)
+    assert restarted.get('rbc').state == 'open'
+    assert not restarted.allow('rbc', now=3)
@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sites  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from posting import Posting  # noqa: E402
+from scrapers import InternshipScraper  # noqa: E402
+
+PAGE = b'''<html><body><ul>
+<li class="jobs-list-item"><a class="job-title" href="/job/1">Analyst Intern</a><span class="job-location">Toronto</span></li>
+<li class="jobs-list-item"><a class="job-title" href="/job/2">Developer Intern</a><span class="job-location">Toronto</span></li>
+</ul></body></html>'''
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve():
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_selector_fix_is_not_masked_by_cached_postings(tmp_path):
+    server = serve()
+    host = f'127.0.0.1:{server.server_address[1]}'
+    origin = f'http://{host}'
+    config = {
+        'company': 'RBC', 'type': 'html', 'url': f'{origin}/search', 'base_url': origin,
+        'item': 'li.job-card',  # broken
+        'fields': {'title': 'a.job-title', 'location': 'span.job-location', 'url': 'a.job-title@href'},
+    }
+    http = HttpClient(cache=HttpCache(str(tmp_path / 'cache')))
+    scraper = InternshipScraper(http_client=http, site_names=['rbc-test'])
+    try:
+        sites.register_site('rbc-test', config)
+        assert list(scraper.scrape_site('rbc-test')) == []
+
+        sites.register_site('rbc-test', dict(config, item='li.jobs-list-item'))
+        fixed = list(scraper.scrape_site('rbc-test'))
+        # The page revalidated with a 304 and was extracted again anyway
+        assert [p.title for p in fixed] == ['Analyst Intern', 'Developer Intern']
+        assert http.cache.stats[host]['not_modified'] == 1
+
+        # Unchanged page and config: the rows are reused
+        assert list(scraper.scrape_site('rbc-test')) == fixed
+        assert http.cache.stats[host]['parse_skipped'] == 1
+    finally:
+        http.close()
+        server.shutdown()
+
+
+def test_rows_expire_although_revalidation_keeps_the_body(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'), max_age=60)
+    url = 'https://jobs.example.com/search'
+    key = cache.key('GET', url)
+
+    def fetched(status):
+        response = requests.Response()
+        response.status_code = status
+        response._content = PAGE if status == 200 else b''
+        response.headers['ETag'] = '"v1"'
+        return cache.process(key, url, response, cache.lookup(key))
+
+    cache.remember_postings(fetched(200), [Posting('RBC', 'Analyst Intern', 'Toronto', url)], 'x')
+    assert cache.cached_postings(fetched(304), 'x') is not None
+    assert cache.cached_postings(fetched(304), 'other extractor') is None
+
+    entry = cache.lookup(key)
+    entry['rows_stored_at'] -= 120
+    cache._write_meta(key, entry)
+    assert cache.cached_postings(fetched(304), 'x') is None
+
+
+def cached_response(cache, url, body, etag=None):
+    key = cache.key('GET', url)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    if etag:
+        response.headers['ETag'] = etag
+    return cache.process(key, url, response, cache.lookup(key))
+
+
+def test_changed_body_drops_the_rows(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'))
+    url = 'https://jobs.example.com/search'
+    cache.remember_postings(cached_response(cache, url, PAGE), [Posting('RBC', 'Intern', None, url)], 'x')
+
+    unchanged = cached_response(cache, url, PAGE)
+    assert unchanged.unchanged
+    assert cache.cached_postings(unchanged, 'x') == [Posting('RBC', 'Intern', None, url)]
+
+    changed = cached_response(cache, url, PAGE + b'<!-- new -->')
+    assert not changed.unchanged
+    assert cache.cached_postings(changed, 'x') is None
+    assert cache.lookup(cache.key('GET', url))['posting_rows'] is None
+    assert cache.stats['jobs.example.com'] == {'hits': 1, 'misses': 2, 'not_modified': 0, 'parse_skipped': 1}
+
+
+def test_validators_and_eviction(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache'), max_bytes=len(PAGE) * 2)
+    urls = [f'https://jobs.example.com/page/{i}' for i in range(3)]
+    cached_response(cache, urls[0], PAGE, etag='"v1"')
+    first = cache.lookup(cache.key('GET', urls[0]))
+    assert cache.validators(first) == {'If-None-Match': '"v1"'}
+    first['stored_at'] -= 10
+    cache._write_meta(cache.key('GET', urls[0]), first)
+
+    for url in urls[1:]:
+        cached_response(cache, url, PAGE)
+    # Over max_bytes: the entry stored first goes
+    assert cache.lookup(cache.key('GET', urls[0])) is None
+    assert all(cache.lookup(cache.key('GET', url)) is not None for url in urls[1:])
@@ -0,0 +1,45 @@
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_client import HttpClient  # noqa: E402
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'ok'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_connect_falls_back_to_the_next_address(monkeypatch):
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    real_getaddrinfo = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host != 'dual-stack.test':
+            return real_getaddrinfo(host, *args, **kwargs)
+        # Nothing listens on 127.0.0.2, as with an unreachable first IPv6 address
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port))
+                for address in ('127.0.0.2', '127.0.0.1')]
+
+    monkeypatch.setattr(socket, 'getaddrinfo', getaddrinfo)
+    http = HttpClient()
+    try:
+        response = http.get(f'http://dual-stack.test:{port}/')
+    finally:
+        http.close()
+        server.shutdown()
+    assert response.text == 'ok'
+    assert http.timings[-1].reused_connection is False
@@ -0,0 +1,34 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import ScrapeMetrics  # noqa: E402
+
+
+def test_concurrent_site_finishes_export_every_site(tmp_path):
+    prom_path = str(tmp_path / 'scraper.prom')
+    metrics = ScrapeMetrics(prom_path=prom_path)
+    errors = []
+
+    def finish(site):
+        try:
+            for _ in range(20):
+                with metrics.site(site) as record:
+                    record.items += 1
+                metrics.finish_site(site)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=finish, args=(f'site{i}',)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with open(prom_path, encoding='utf-8') as f:
+        text = f.read()
+    assert all(f'site="site{i}"' in text for i in range(8))
+    assert os.listdir(tmp_path) == ['scraper.prom']
@@ -0,0 +1,33 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalize import canonicalize, canonicalize_url  # noqa: E402
+from posting import Posting  # noqa: E402
+
+WORKDAY = 'https://rbc.wd3.myworkdayjobs.com/en-US/RBCGLOBAL1/job/Toronto-ON/Software-Engineering-Intern_{}'
+
+
+def urls(postings):
+    return [posting.url for posting in canonicalize(postings)]
+
+
+def test_same_title_different_requisitions_are_kept():
+    jr1 = Posting.create('RBC', 'Software Engineering Intern', 'Toronto, ON', WORKDAY.format('JR1'))
+    jr2 = Posting.create('RBC', 'Software Engineering Intern', 'Toronto, ON', WORKDAY.format('JR2'))
+    assert len(urls([jr1, jr2])) == 2
+    assert sorted(urls([jr2, jr1])) == sorted(urls([jr1, jr2]))
+
+
+def test_same_job_under_locale_and_mirror_urls_is_one_posting():
+    first = Posting.create('RBC', 'Software Engineering Intern', 'Toronto, ON',
+                           'https://jobs.rbc.com/ca/en/job/R-12345/software-engineering-intern')
+    mirror = Posting.create('RBC', 'Software Engineering Intern', 'Toronto, ON',
+                            'https://careers.rbc.com/en-CA/job/R-12345/software-engineering-intern?utm_source=x')
+    assert urls([first, mirror]) == [first.url]
+
+
+def test_malformed_port_keeps_the_netloc():
+    assert canonicalize_url('https://jobs.example.com:abc/job/1/?utm_source=x') == 'https://jobs.example.com:abc/job/1'
+    assert canonicalize_url('HTTPS://Jobs.Example.com:443/job/1') == 'https://jobs.example.com/job/1'
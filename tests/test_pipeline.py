@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import InternshipDB  # noqa: E402
+from metrics import ScrapeMetrics  # noqa: E402
+import pipeline  # noqa: E402
+from pipeline import Pipeline  # noqa: E402
+from posting import Posting  # noqa: E402
+
+
+def postings(count):
+    return [Posting.create('Example', f'Intern {i}', 'Toronto, ON', f'https://jobs.example.com/job/{i}')
+            for i in range(count)]
+
+
+def failing_after(items, error):
+    def scrape():
+        yield from items
+        raise error
+    return scrape
+
+
+def open_urls(db):
+    return {row[0] for row in db._connection().execute(
+        'SELECT url FROM internships WHERE closed_on IS NULL')}
+
+
+def test_partial_failure_closes_nothing(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    everything = postings(40)
+    Pipeline(db, {'example': lambda: iter(everything)}).run()
+
+    metrics = ScrapeMetrics()
+    digest = Pipeline(db, {'example': failing_after(everything[:20], ConnectionError('reset'))},
+                      metrics=metrics).run()
+
+    assert digest.closed == []
+    assert open_urls(db) == {p.url for p in everything}
+    assert metrics.latest['example'].status == 'error'
+
+
+def test_error_recorded_without_raising_closes_nothing(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    everything = postings(10)
+    Pipeline(db, {'example': lambda: iter(everything)}).run()
+
+    metrics = ScrapeMetrics()
+
+    def scrape():
+        yield from everything[:5]
+        metrics.record_error('example', TimeoutError('page 2'))
+
+    digest = Pipeline(db, {'example': scrape}, metrics=metrics).run()
+    assert digest.closed == []
+    assert len(open_urls(db)) == 10
+
+
+def test_complete_run_closes_missing_postings(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    everything = postings(10)
+    Pipeline(db, {'example': lambda: iter(everything)}).run()
+
+    digest = Pipeline(db, {'example': lambda: iter(everything[:6])}).run()
+    assert {p.url for p in digest.closed} == {p.url for p in everything[6:]}
+    assert open_urls(db) == {p.url for p in everything[:6]}
+
+
+def run_with_timeout(pipeline, seconds=10):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(pipeline.run()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert result, 'Pipeline.run() hung'
+    return result[0]
+
+
+def test_normalize_error_drops_the_posting_and_run_returns(tmp_path, monkeypatch):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    everything = postings(10)
+    Pipeline(db, {'example': lambda: iter(everything)}).run()
+
+    real_canonicalize = pipeline.canonicalize_url
+
+    def canonicalize(url):
+        if url.endswith('/3'):
+            raise ValueError('Port could not be cast to integer value')
+        return real_canonicalize(url)
+
+    monkeypatch.setattr(pipeline, 'canonicalize_url', canonicalize)
+    metrics = ScrapeMetrics()
+    digest = run_with_timeout(Pipeline(db, {'example': lambda: iter(everything[:6])}, metrics=metrics))
+
+    assert digest.closed == []  # a dropped posting makes the run incomplete
+    assert metrics.latest['example'].errors == {'ValueError': 1}
+
+
+def test_failing_health_observe_does_not_stall_the_run(tmp_path):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+
+    class BrokenHealth:
+        def allow(self, site):
+            return True
+
+        def observe(self, site, items, errors):
+            raise sqlite3.OperationalError('database is locked')
+
+    sites = {f'site{i}': (lambda i=i: iter(postings(5)[i:i + 1])) for i in range(5)}
+    digest = run_with_timeout(Pipeline(db, sites, queue_size=1, metrics=ScrapeMetrics(), health=BrokenHealth()))
+    assert len(digest.new) == 5
@@ -0,0 +1,67 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratelimit  # noqa: E402
+from ratelimit import HostRateLimiter, TokenBucket  # noqa: E402
+
+
+class FakeClock:
+    """time.monotonic/time.sleep stand-ins; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(ratelimit.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_burst_then_steady_rate(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    bucket = TokenBucket(rate=2.0, capacity=4.0)
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.slept == 0
+
+    for _ in range(4):
+        bucket.acquire()
+    assert clock.slept == 2.0  # four more tokens at two per second
+
+
+def test_idle_time_refills_only_up_to_capacity(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    bucket = TokenBucket(rate=1.0, capacity=3.0)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 60
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.slept == 0
+    bucket.acquire()
+    assert clock.slept == 1.0
+
+
+def test_hosts_have_separate_buckets_and_overrides(monkeypatch):
+    clock = fake_clock(monkeypatch)
+    limiter = HostRateLimiter(rate=1.0, burst=1.0, overrides={'slow.example.com': (0.5, 1.0)})
+    limiter.wait('https://a.example.com/jobs')
+    limiter.wait('https://B.example.com/jobs')  # a different host, so no wait
+    assert clock.slept == 0
+    assert limiter.bucket_for('b.example.com') is limiter.bucket_for('b.example.com')
+
+    limiter.wait('https://slow.example.com/1')
+    limiter.wait('https://slow.example.com/2')
+    assert clock.slept == 2.0
@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sites  # noqa: E402
+from http_cache import HttpCache  # noqa: E402
+from http_client import HttpClient  # noqa: E402
+from posting import Posting  # noqa: E402
+from renderer import RenderedPage  # noqa: E402
+from scrapers import InternshipScraper  # noqa: E402
+
+
+def example_postings(scraper, config):
+    yield Posting.create(config['company'], 'Analyst Intern', 'Toronto', 'https://jobs.example.com/job/1')
+
+
+def test_mode_alone_picks_in_process_or_worker_scraping():
+    sites.register_site('custom-test', {'company': 'Example', 'type': 'custom',
+                                        'handler': 'test_scrapers:example_postings'})
+    scraper = InternshipScraper(site_names=['custom-test'], processes=2)
+    try:
+        for mode in ('concurrent', 'serial'):
+            assert [p.title for p in scraper.scrape_all(mode)] == ['Analyst Intern']
+        assert scraper._shards == {}  # no worker was started
+        assert scraper.processes == 2
+
+        in_workers = scraper.sites(3)['custom-test']
+        assert isinstance(in_workers, partial) and in_workers.args == ('custom-test', 3)
+        assert scraper.sites(0)['custom-test'].func == scraper.scrape_site
+    finally:
+        scraper.close()
+
+
+class StubRenderer:
+    """Stands in for BrowserPool: every render captures the same JSON response"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.renders = 0
+
+    def render(self, url, wait_for=None, capture=None):
+        self.renders += 1
+        captured = [('https://careers.example.com/api/jobs?page=1', self.body)] if capture else []
+        return RenderedPage(url, b'<html><body></body></html>', captured)
+
+
+def test_browser_adapter_reads_postings_from_captured_json(tmp_path):
+    body = json.dumps({'data': {'jobs': [
+        {'title': 'Analyst Intern', 'location': {'name': 'Toronto'}, 'path': '/jobs/1'},
+        {'title': 'Developer Intern', 'location': {'name': 'Waterloo'}, 'path': '/jobs/2'},
+        {'location': {'name': 'Nowhere'}},  # no title: skipped
+    ]}}).encode('utf-8')
+    sites.register_site('xhr-test', {
+        'company': 'Example', 'type': 'browser', 'url': 'https://careers.example.com/jobs',
+        'base_url': 'https://careers.example.com', 'item': 'div.job', 'fields': {'title': 'h2'},
+        'xhr': {'match': '/api/jobs', 'items': 'data.jobs',
+                'fields': {'title': 'title', 'location': 'location.name', 'url': 'path'}},
+    })
+    renderer = StubRenderer(body)
+    scraper = InternshipScraper(http_client=HttpClient(cache=HttpCache(str(tmp_path / 'cache'))),
+                                renderer=renderer, site_names=['xhr-test'])
+    expected = [
+        Posting('Example', 'Analyst Intern', 'Toronto', 'https://careers.example.com/jobs/1'),
+        Posting('Example', 'Developer Intern', 'Waterloo', 'https://careers.example.com/jobs/2'),
+    ]
+    assert list(scraper.scrape_site('xhr-test')) == expected
+    # Within render_ttl the render is reused without the browser
+    assert list(scraper.scrape_site('xhr-test')) == expected
+    assert renderer.renders == 1
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import InternshipDB  # noqa: E402
+from posting import Posting  # noqa: E402
+from search import InternshipSearch  # noqa: E402
+
+
+def searched_db(tmp_path, count):
+    db = InternshipDB(str(tmp_path / 'internships.db'))
+    db.add_internships(Posting.create('Example', f'Software Intern {i}', 'Toronto, ON',
+                                      f'https://jobs.example.com/job/{i}') for i in range(count))
+    return InternshipSearch(db)
+
+
+def page_through(search, **kwargs):
+    ids, cursor = [], None
+    while True:
+        page = search.search('intern', limit=100, cursor=cursor, **kwargs)
+        ids.extend(result.id for result in page.results)
+        if page.cursor is None:
+            return ids, page
+        cursor = page.cursor
+
+
+def test_rank_window_flags_truncated_pages(tmp_path):
+    search = searched_db(tmp_path, 300)
+    ids, last = page_through(search, rank_window=200)
+    assert len(ids) == 200
+    assert last.truncated
+
+
+def test_exact_rank_pages_through_every_match(tmp_path):
+    search = searched_db(tmp_path, 300)
+    ids, last = page_through(search, rank_window=None)
+    assert len(set(ids)) == 300
+    assert not last.truncated
+
+
+def test_window_larger_than_matches_is_not_truncated(tmp_path):
+    search = searched_db(tmp_path, 150)
+    ids, last = page_through(search, rank_window=200)
+    assert len(ids) == 150
+    assert not last.truncated
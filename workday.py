@@ -0,0 +1,108 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, Optional
+
+import metrics
+from http_client import HttpClient
+from posting import Posting
+
+
+class WorkdayClient:
+    """
+    Client for a Workday tenant's `cxs` jobs API.
+    The first page is fetched alone to learn `total` (Workday only reports it
+    on the first response); the remaining pages are then fetched concurrently.
+    """
+
+    PAGE_SIZE = 20  # Workday rejects larger pages
+
+    def __init__(self, http: HttpClient, host: str, tenant: str, site: str,
+                 max_workers: int = 4):
+        self.http = http
+        self.host = host
+        self.tenant = tenant
+        self.site = site
+        self.max_workers = max_workers
+
+    @property
+    def jobs_url(self) -> str:
+        return f"https://{self.host}/wday/cxs/{self.tenant}/{self.site}/jobs"
+
+    def job_url(self, external_path: str) -> str:
+        """Public URL of a posting from its `externalPath`"""
+        return f"https://{self.host}/en-US/{self.site}{external_path}"
+
+    def _fetch_page(self, offset: int, search_text: str, applied_facets: Dict) -> Dict:
+        payload = {
+            "appliedFacets": applied_facets,
+            "limit": self.PAGE_SIZE,
+            "offset": offset,
+            "searchText": search_text,
+        }
+        response = self.http.post(self.jobs_url, json=payload)
+        response.raise_for_status()
+        with metrics.timed_parse():
+            return response.json()
+
+    def iter_jobs(self, search_text: str = '', applied_facets: Optional[Dict] = None,
+                  max_results: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yield every raw job posting matching the search, up to `max_results`.
+        Postings from each page are yielded as soon as that page arrives. If a
+        page fails, the rest are still yielded and its error is raised last.
+        """
+        applied_facets = applied_facets or {}
+        first = self._fetch_page(0, search_text, applied_facets)
+        total = first.get('total', len(first.get('jobPostings', [])))
+        if max_results is not None:
+            total = min(total, max_results)
+
+        # Postings can shift between pages while we fetch; keep the first copy of each
+        seen = set()
+        yielded = 0
+
+        def fresh(page: Dict) -> Iterator[Dict]:
+            nonlocal yielded
+            for job in page.get('jobPostings', []):
+                path = job.get('externalPath')
+                if path in seen or (max_results is not None and yielded >= max_results):
+                    continue
+                seen.add(path)
+                yielded += 1
+                yield job
+
+        yield from fresh(first)
+
+        offsets = range(self.PAGE_SIZE, total, self.PAGE_SIZE)
+        if not offsets:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Each page runs in a copy of this context so its request counts
+            # towards the site being scraped (see metrics.py)
+            futures = {pool.submit(contextvars.copy_context().run, self._fetch_page,
+                                   offset, search_text, applied_facets): offset
+                       for offset in offsets}
+            failed = []
+            for future in as_completed(futures):
+                try:
+                    page = future.result()
+                except Exception as e:
+                    print(f"Workday {self.tenant} page at offset {futures[future]} failed: {e}")
+                    failed.append(e)
+                    continue
+                yield from fresh(page)
+        # The other pages are in; fail now so the caller knows postings are missing
+        if failed:
+            raise failed[0]
+
+    def iter_internships(self, company: str, search_text: str = '',
+                         applied_facets: Optional[Dict] = None,
+                         max_results: Optional[int] = None) -> Iterator[Posting]:
+        """Yield postings converted to the scrapers' Posting records"""
+        for job in self.iter_jobs(search_text, applied_facets, max_results):
+            yield Posting.create(
+                company,
+                job.get('title', 'N/A'),
+                job.get('locationsText', 'N/A'),
+                self.job_url(job.get('externalPath', '')),
+            )